@@ -2,11 +2,12 @@
 
 pragma solidity ^0.8.0;
 
-import "./ERC20.sol";
+import "./ERC20Permit.sol";
 
-contract CayugaCoin is ERC20 {
+// ERC20 token with EIP-2612 permits, so that writers can approve OptionsDEX with a signature
+contract CayugaCoin is ERC20Permit {
 
-    constructor(string memory _name, string memory _symbol) ERC20(_name, _symbol) {
+    constructor(string memory _name, string memory _symbol) ERC20(_name, _symbol) ERC20Permit(_name) {
         // Mint 10,000 tokens to msg.sender
         uint256 _tokens = 100000;
         _mint(msg.sender, _tokens * 10**18);
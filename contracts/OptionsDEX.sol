@@ -3,6 +3,7 @@
 pragma solidity 0.8.0;
 
 import "../interfaces/IERC20.sol";
+import "../interfaces/IERC20Permit.sol";
 import "../interfaces/IOptionsDEX.sol";
 
 /*
@@ -10,107 +11,327 @@ Options DEX smart contract
 */
 contract OptionsDEX is IOptionsDEX {
 
+    // Options are packed into five storage slots, grouped by the functions that write them
     struct Option {
-        // Address of ERC20 asset
-        address asset;
-        // Right to buy token at strikePrice (in Wei)
-        uint96 strikePrice;
+        // Slot 0, written on creation and writer transfer
         // Address of option writer
         address writer;
+        // Registry ID of ERC20 asset
+        uint32 assetId;
+        // Expiration block #
+        uint64 blockExpiration;
+        // Slot 1, written on creation, partial exercise and partial holder transfer
+        // Right to buy token at strikePrice (in Wei)
+        uint96 strikePrice;
         // Premium per token (in Wei)
         uint96 premium;
+        // Number of whole tokens the option covers, each backed by 10 ** 18 units of the asset
+        uint64 quantity;
+        // Slot 2, written on purchase and holder transfer
         // Address of option holder
         address holder;
-        // Expiration block #
-        uint96 blockExpiration;
+        // Slot 3, written on holder approval and cleared on holder transfer
+        // Address of approved new holder (if existent)
+        address approvedHolder;
         // Holder's sell price (if existent) (in Wei)
-        uint128 holderSellPrice;
+        uint96 holderSellPrice;
+        // Slot 4, written on writer approval and cleared on writer transfer
+        // Address of approved new writer (if existent)
+        address approvedWriter;
         // Writer's sell price (if existent) (in Wei)
-        uint128 writerSellPrice;
+        uint96 writerSellPrice;
+    }
+
+    // ETH owed to an account that collects its proceeds through withdraw()
+    struct Payee {
+        // ETH credited and not yet withdrawn (in Wei), ETH supply fits in 128 bits
+        uint128 credit;
+        // Whether proceeds are credited instead of sent
+        bool creditMode;
     }
 
     // Hash of option to option
     mapping(bytes32 => Option) private openOptions;
     // Address to nonce
     mapping(address => uint256) private addressNonce;
-    // Hash of option to approved new holder
-    mapping(bytes32 => address) private approvedHolderAddress;
-    // Hash of option to approved new writer
-    mapping(bytes32 => address) private approvedWriterAddress;
+    // Address to credited proceeds
+    mapping(address => Payee) private payees;
+
+    // Account allowed to register assets
+    address private immutable owner;
+    // Number of registered assets, which is also the ID of the last registered asset
+    uint32 private assetCount;
+    // Asset address to asset ID (0 if the asset is not registered)
+    mapping(address => uint32) private assetIds;
+    // Asset ID to asset address
+    mapping(uint32 => address) private assetAddresses;
 
-    // Mapping of approved asset addresses
-    mapping (address => bool) private approvedAssets;
+    // Whether open options are listed per asset, writer and holder, fixed on deployment
+    bool private immutable openInterestIndexed;
+    // Asset ID to hashes of open options on the asset
+    mapping(uint32 => bytes32[]) private assetOptions;
+    // Address to hashes of open options written by the address
+    mapping(address => bytes32[]) private writerOptions;
+    // Address to hashes of open options held by the address
+    mapping(address => bytes32[]) private holderOptions;
+    // Hash of option to its positions in the asset, writer and holder lists, packed into one slot
+    mapping(bytes32 => uint64[3]) private indexPositions;
+    // Kinds of lists, used as positions in indexPositions
+    uint256 private constant ASSET_INDEX = 0;
+    uint256 private constant WRITER_INDEX = 1;
+    uint256 private constant HOLDER_INDEX = 2;
 
+    // Whole tokens covered by options created without a quantity
+    uint64 private constant DEFAULT_QUANTITY = 100;
+    // Units of an asset per whole token, every asset utilizes 18 decimals
+    uint256 private constant TOKEN_UNIT = 10 ** 18;
+
+    // Address to bitmap of used order nonces, 256 nonces per word
+    mapping(address => mapping(uint256 => uint256)) private orderNonces;
+    // EIP-712 domain separator of the chain OptionsDEX was deployed on
+    bytes32 private immutable cachedDomainSeparator;
+    uint256 private immutable cachedChainId;
+    // EIP-712 type hashes
+    bytes32 private constant DOMAIN_TYPEHASH = keccak256("EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)");
+    bytes32 private constant SELL_ORDER_TYPEHASH = keccak256("SellOrder(bytes32 optionHash,bool isWriter,uint256 price,address taker,uint256 blockExpiration,uint256 nonce,uint256 quantity)");
+
+    // Events carry every field they change, so that the state of every option can be rebuilt from the logs alone
     // Event detailing creation of new option
-    event OptionCreated(address indexed seller, bytes32 indexed optionHash);
+    event OptionCreated(address indexed seller, bytes32 indexed optionHash, address indexed asset, uint96 strikePrice, uint96 premium, uint96 blockExpiration, uint64 quantity);
+
+    // Event detailing purchase of an option by its first holder
+    event OptionExchanged(bytes32 indexed optionHash, address indexed holder, uint256 price);
+
+    // Events detailing approval of the next holder or writer of an option
+    event HolderTransferApproved(bytes32 indexed optionHash, address indexed approvedHolder, uint96 price);
+    event WriterTransferApproved(bytes32 indexed optionHash, address indexed approvedWriter, uint96 price);
+
+    // Events detailing transfer of the holder or writer side of an option, which also deletes the approved next holder or writer
+    event HolderTransferred(bytes32 indexed optionHash, address indexed from, address indexed to, uint256 price);
+    event WriterTransferred(bytes32 indexed optionHash, address indexed from, address indexed to, uint256 price);
 
-    // Event detailing purchase of an option either by a holder or writer
-    event OptionExchanged(bytes32 indexed optionHash);
+    // Event detailing sale of part of the holder position of an option, which moves quantity tokens of the option into a new option
+    event OptionSplit(bytes32 indexed optionHash, bytes32 indexed newOptionHash, uint64 quantity);
 
-    // Constructor sets the addresses of approved option assets. There are 10 approved assets that utilize 18 decimals.
-    // TO NOT BE RESTRICTED BY ASSETS, REMOVE CONSTRUCTOR AND ANY LINES OF CODE THAT CONTAINS A (*) IN THE LINE ABOVE IT
-    constructor() {
-        // Setting addresses of approved assets
+    // Events detailing exercise of quantity tokens of an option, which deletes the option once every token is exercised, and deletion of an option
+    event OptionExercised(bytes32 indexed optionHash, address indexed holder, address indexed writer, uint256 strikePayment, uint64 quantity);
+    event OptionRefunded(bytes32 indexed optionHash, address indexed writer);
+
+    // Event detailing cancellation of a sell order
+    event OrderCancelled(address indexed seller, uint256 nonce);
+
+    // Event detailing registration of an asset
+    event AssetRegistered(address indexed asset, uint32 assetId);
+
+    // Constructor registers the approved option assets. There are 10 approved assets that utilize 18 decimals. Further assets can be registered by the deployer through registerAsset()
+    // _openInterestIndexed enables the lists of open options returned by getOpenOptions(), getOpenOptionsByWriter() and getOpenOptionsByHolder(), which cost extra gas on every write (about 77,000 more storage gas per createOption()). Deployments should pass false unless another contract needs these views, off-chain clients get the same lists from the events
+    constructor(bool _openInterestIndexed) {
+        owner = msg.sender;
+        openInterestIndexed = _openInterestIndexed;
+        cachedChainId = block.chainid;
+        cachedDomainSeparator = _buildDomainSeparator();
+        // Registering addresses of approved assets
         // Wrapped AVAX
-        approvedAssets[0xB31f66AA3C1e785363F0875A1B74E27b85FD66c7] = true;
+        _registerAsset(0xB31f66AA3C1e785363F0875A1B74E27b85FD66c7);
         // Shiba Inu
-        approvedAssets[0x02D980A0D7AF3fb7Cf7Df8cB35d9eDBCF355f665] = true;
+        _registerAsset(0x02D980A0D7AF3fb7Cf7Df8cB35d9eDBCF355f665);
         // Chainlink Token
-        approvedAssets[0x5947BB275c521040051D82396192181b413227A3] = true;
+        _registerAsset(0x5947BB275c521040051D82396192181b413227A3);
         // Maker Token
-        approvedAssets[0x88128fd4b259552A9A1D457f435a6527AAb72d42] = true;
+        _registerAsset(0x88128fd4b259552A9A1D457f435a6527AAb72d42);
         // Uniswap Token
-        approvedAssets[0x8eBAf22B6F053dFFeaf46f4Dd9eFA95D89ba8580] = true;
+        _registerAsset(0x8eBAf22B6F053dFFeaf46f4Dd9eFA95D89ba8580);
         // Graph Token
-        approvedAssets[0x8a0cAc13c7da965a312f08ea4229c37869e85cB9] = true;
+        _registerAsset(0x8a0cAc13c7da965a312f08ea4229c37869e85cB9);
         // AAVE Token
-        approvedAssets[0x63a72806098Bd3D9520cC43356dD78afe5D386D9] = true;
+        _registerAsset(0x63a72806098Bd3D9520cC43356dD78afe5D386D9);
         // CurveDAO Token
-        approvedAssets[0x249848BeCA43aC405b8102Ec90Dd5F22CA513c06] = true;
+        _registerAsset(0x249848BeCA43aC405b8102Ec90Dd5F22CA513c06);
         // Sushi Token
-        approvedAssets[0x37B608519F91f70F2EeB0e5Ed9AF4061722e4F76] = true;
+        _registerAsset(0x37B608519F91f70F2EeB0e5Ed9AF4061722e4F76);
         // Spell Token
-        approvedAssets[0xCE1bFFBD5374Dac86a2893119683F4911a2F7814] = true;
+        _registerAsset(0xCE1bFFBD5374Dac86a2893119683F4911a2F7814);
     }
 
     /*
-    Function that creates an option. 
+    Function that registers an asset so that options can be written on it and returns its asset ID. Only the deployer of OptionsDEX can register assets.
+    Parameters:
+        _asset: the contract address of the asset being registered
+    */
+    function registerAsset(address _asset) public override returns (uint32) {
+        // Check that msg.sender is the deployer
+        require(msg.sender == owner, "You are not the owner!");
+        // Check that asset is not registered yet
+        require(assetIds[_asset] == 0, "Asset is already registered!");
+        return _registerAsset(_asset);
+    }
+
+    /*
+    Internal function that assigns the next asset ID to an asset
+    Parameters:
+        _asset: the contract address of the asset being registered
+    */
+    function _registerAsset(address _asset) internal returns (uint32) {
+        uint32 _assetId = assetCount + 1;
+        assetCount = _assetId;
+        assetIds[_asset] = _assetId;
+        assetAddresses[_assetId] = _asset;
+        emit AssetRegistered(_asset, _assetId);
+        return _assetId;
+    }
+
+    /*
+    Function that creates an option on 100 tokens.
 
-    Parameters: 
-        _asset: the contract address of the underlying asset, must be approved
+    Parameters:
+        _asset: the contract address of the underlying asset, must be registered
         _premium: the premium per token of the option
         _strikePrice: the assigned price of the underlying asset
-        _blockExpiration: the expiration of the option (in terms of block number), must be less than 2^96-1 and greater than the current block number
+        _blockExpiration: the expiration of the option (in terms of block number), must be less than 2^64 and greater than the current block number
     */
     function createOption(address _asset, uint96 _premium, uint96 _strikePrice, uint96 _blockExpiration) public override {
+        createOptionWithQuantity(_asset, _premium, _strikePrice, _blockExpiration, DEFAULT_QUANTITY);
+    }
+
+    /*
+    Function that creates an option on any number of tokens, which locks _quantity tokens of collateral in a single storage record and a single transfer. The premium and the strike price are paid per token.
+
+    Parameters:
+        _asset: the contract address of the underlying asset, must be registered
+        _premium: the premium per token of the option
+        _strikePrice: the assigned price of the underlying asset
+        _blockExpiration: the expiration of the option (in terms of block number), must be less than 2^64 and greater than the current block number
+        _quantity: the number of whole tokens covered by the option, must be greater than 0
+    */
+    function createOptionWithQuantity(address _asset, uint96 _premium, uint96 _strikePrice, uint96 _blockExpiration, uint64 _quantity) public override {
+        // Check that asset is registered
+        uint32 _assetId = assetIds[_asset];
+        require(_assetId != 0, "Asset is not allowed!");
+
+        // Create option and emit it
+        _writeOption(_asset, _assetId, _premium, _strikePrice, _blockExpiration, addressNonce[msg.sender], _quantity);
+        // Increment account nonce
+        addressNonce[msg.sender] += 1;
+
+        // Transfer _quantity tokens to smart contract
+        _collectCollateral(_asset, uint256(_quantity) * TOKEN_UNIT);
+    }
+
+    /*
+    Function that creates an option on any number of tokens like createOptionWithQuantity(), approving the collateral with an EIP-2612 permit of msg.sender instead of a prior approve() transaction. A permit that fails (e.g. because it was already submitted by someone else, or the asset does not support permits) is ignored, and the option is created if the allowance of OptionsDEX covers the collateral anyway.
+
+    Parameters:
+        _asset: the contract address of the underlying asset, must be registered
+        _premium: the premium per token of the option
+        _strikePrice: the assigned price of the underlying asset
+        _blockExpiration: the expiration of the option (in terms of block number), must be less than 2^64 and greater than the current block number
+        _quantity: the number of whole tokens covered by the option, must be greater than 0
+        _permit: the permit signed by msg.sender for OptionsDEX, its value must cover _quantity tokens
+    */
+    function createOptionWithPermit(address _asset, uint96 _premium, uint96 _strikePrice, uint96 _blockExpiration, uint64 _quantity, Permit calldata _permit) public override {
+        // Check that asset is registered before calling it
+        require(assetIds[_asset] != 0, "Asset is not allowed!");
+        // Approve collateral and create option
+        _usePermit(_asset, _permit);
+        createOptionWithQuantity(_asset, _premium, _strikePrice, _blockExpiration, _quantity);
+    }
+
+    /*
+    Function that creates several options on 100 tokens in a single transaction. Options are created in the order of the arrays and receive the same hashes as if they had been created one by one with createOption(). The collateral of consecutive options on the same asset is transferred at once, so callers should group options by asset.
+
+    Parameters:
+        _assets: the contract addresses of the underlying assets, must be registered
+        _premiums: the premiums per token of the options
+        _strikePrices: the assigned prices of the underlying assets
+        _blockExpirations: the expirations of the options (in terms of block number), must be less than 2^64 and greater than the current block number
+    */
+    function createOptions(address[] calldata _assets, uint96[] calldata _premiums, uint96[] calldata _strikePrices, uint96[] calldata _blockExpirations) public override {
+        // Check that every option has all of its parameters
+        require(_premiums.length == _assets.length && _strikePrices.length == _assets.length && _blockExpirations.length == _assets.length, "Array lengths do not match!");
+
+        // Read account nonce once
+        uint256 _nonce = addressNonce[msg.sender];
+        // Collateral owed for the current run of options on the same asset
+        uint256 _collateral = 0;
+        // Asset ID of the current run of options
+        uint32 _assetId = 0;
+        for (uint256 i = 0; i < _assets.length; i++) {
+            // Check that asset is registered, once per run of options on the same asset
+            if (_collateral == 0) {
+                _assetId = assetIds[_assets[i]];
+                require(_assetId != 0, "Asset is not allowed!");
+            }
+            // Create option and emit it
+            _writeOption(_assets[i], _assetId, _premiums[i], _strikePrices[i], _blockExpirations[i], _nonce + i, DEFAULT_QUANTITY);
+            _collateral += DEFAULT_QUANTITY * TOKEN_UNIT;
+            // Transfer collateral once the run of options on this asset ends
+            if (i + 1 == _assets.length || _assets[i + 1] != _assets[i]) {
+                _collectCollateral(_assets[i], _collateral);
+                _collateral = 0;
+            }
+        }
+        // Write account nonce once
+        addressNonce[msg.sender] = _nonce + _assets.length;
+    }
+
+    /*
+    Internal function that validates and stores an option written by msg.sender and emits OptionCreated. The caller is responsible for checking the asset, incrementing the nonce of msg.sender and collecting the collateral.
+
+    Parameters:
+        _asset: the contract address of the underlying asset
+        _assetId: the registry ID of the underlying asset
+        _premium: the premium per token of the option
+        _strikePrice: the assigned price of the underlying asset
+        _blockExpiration: the expiration of the option (in terms of block number), must be less than 2^64 and greater than the current block number
+        _nonce: the nonce of msg.sender used in the hash of the option
+        _quantity: the number of whole tokens covered by the option
+    */
+    function _writeOption(address _asset, uint32 _assetId, uint96 _premium, uint96 _strikePrice, uint96 _blockExpiration, uint256 _nonce, uint64 _quantity) internal returns (bytes32) {
         // Enforce preconditions
-        // Check that _blockExpiration is for future block
-        require(_blockExpiration > block.number, "Invalid block expiration!");
+        // Check that _blockExpiration is for future block and fits into storage
+        require(_blockExpiration > block.number && _blockExpiration <= type(uint64).max, "Invalid block expiration!");
         // Check that _premium is a valid number
         require(_premium > 0, "Invalid premium!");
         // Check that _strikePrice is a valid number
         require(_strikePrice > 0, "Invalid strike price!");
-        // (*) Check that asset is allowed
-        require(approvedAssets[_asset], "Asset is not allowed!");
-
-        // Create option
-        Option memory _option = Option(_asset, _strikePrice, msg.sender, _premium, address(0), _blockExpiration, 0, 0);
-        // Create hash for option
-        bytes32 _optionHash = keccak256(abi.encode(_option, addressNonce[msg.sender], msg.sender));
-        // Add option to mapping
-        openOptions[_optionHash] = _option;
-        // Increment account nonce
-        addressNonce[msg.sender] += 1;
+        // Check that _quantity is a valid number
+        require(_quantity > 0, "Invalid quantity!");
 
-        // Create interface
-        IERC20 _token = IERC20(_asset);
-        // Check that user has enough tokens to cover option
-        require(_token.balanceOf(msg.sender) >= 10 ** 20, "Not enough tokens to cover option!");
-        // Transfer 100 tokens to smart contract
-        _token.transferFrom(msg.sender, address(this), 10 ** 20);
+        // Create hash for option from the fields returned by getOptionDetails(), the account nonce and the writer. The quantity is left out so that options on 100 tokens keep their hashes, the nonce already makes every hash unique
+        bytes32 _optionHash = keccak256(abi.encode(_asset, _strikePrice, msg.sender, _premium, address(0), _blockExpiration, uint128(0), uint128(0), _nonce, msg.sender));
+        // Add option to mapping, writing only the two slots set on creation
+        Option storage _option = openOptions[_optionHash];
+        _option.writer = msg.sender;
+        _option.assetId = _assetId;
+        _option.blockExpiration = uint64(_blockExpiration);
+        _option.strikePrice = _strikePrice;
+        _option.premium = _premium;
+        _option.quantity = _quantity;
+        // List option under its asset and writer
+        if (openInterestIndexed) {
+            _indexAdd(assetOptions[_assetId], _optionHash, ASSET_INDEX);
+            _indexAdd(writerOptions[msg.sender], _optionHash, WRITER_INDEX);
+        }
 
         // Emit new option
-        emit OptionCreated(msg.sender, _optionHash);
+        emit OptionCreated(msg.sender, _optionHash, _asset, _strikePrice, _premium, _blockExpiration, _quantity);
+        return _optionHash;
+    }
+
+    /*
+    Internal function that transfers collateral from msg.sender to the smart contract
+    Parameters:
+        _asset: the contract address of the asset being transferred
+        _amount: the amount of tokens being transferred
+    The smart contract must have been approved to spend _amount tokens of msg.sender, otherwise the transaction will revert!
+    */
+    function _collectCollateral(address _asset, uint256 _amount) internal {
+        // Create interface
+        IERC20 _token = IERC20(_asset);
+        // Check that user has enough tokens to cover options
+        require(_token.balanceOf(msg.sender) >= _amount, "Not enough tokens to cover option!");
+        // Transfer tokens to smart contract
+        _token.transferFrom(msg.sender, address(this), _amount);
     }
 
     /*
@@ -121,42 +342,48 @@ contract OptionsDEX is IOptionsDEX {
     */
     function buyOption(bytes32 _optionHash) payable public override {
         // Fetch option from storage
-        Option memory _option = openOptions[_optionHash];
+        Option storage _option = openOptions[_optionHash];
         // Check that option exists
         require(_option.blockExpiration != 0, "This option does not exist!");
-        // Check premium * 100 is equal to eth sent
-        require(msg.value == _option.premium * 100, "Incorrect amount sent!");
+        // Check premium * quantity is equal to eth sent
+        require(msg.value == uint256(_option.premium) * _option.quantity, "Incorrect amount sent!");
         // Check option does not already have holder
         require(_option.holder == address(0), "This option has already been bought!");
 
-        // Set holder directly in storage
-        openOptions[_optionHash].holder = msg.sender;
-        // Send eth to writer
-        (bool sent, ) = _option.holder.call{value: msg.value}("");
-        require(sent, "Failed to send Ether");
+        // Set holder
+        _option.holder = msg.sender;
+        // List option under its holder
+        if (openInterestIndexed) {
+            _indexAdd(holderOptions[msg.sender], _optionHash, HOLDER_INDEX);
+        }
+        // Pay premium to writer
+        _pay(_option.writer, msg.value);
         // Emit option buy
-        emit OptionExchanged(_optionHash);
+        emit OptionExchanged(_optionHash, msg.sender, msg.value);
     }
 
     /*
-    Function that approves the next holder of an option
+    Function that approves the next holder of an option, who buys every token of the option with transferOptionHolder(). Part of a holder position is only sold through a signed sell order, see fillSellOrder(). The approval is deleted when the quantity of the option changes.
     Parameters:
         _optionHash: the hash of the option being purchased
         _newBuyer: the address of the approved next holder
-        _price: the price at which the next holder will purchase the option at
+        _price: the price at which the next holder will purchase the option at, must be less than 2^96
     */
     function approveOptionTransferHolder(bytes32 _optionHash, address _newBuyer, uint128 _price) public override {
         // Fetch option from storage
-        Option memory _option = openOptions[_optionHash];
+        Option storage _option = openOptions[_optionHash];
         // Check that option exists
         require(_option.blockExpiration != 0, "This option does not exist!");
         // Check that current holder is calling this option
         require(msg.sender == _option.holder, "You are not the current holder!");
+        // Check that _price fits into storage
+        require(_price <= type(uint96).max, "Invalid price!");
 
-        // Set holderSellPrice for option
-        openOptions[_optionHash].holderSellPrice = _price;
-        // Add _newBuyer to approved addresses
-        approvedHolderAddress[_optionHash] = _newBuyer;
+        // Set approved holder and holderSellPrice for option, which share a slot
+        _option.approvedHolder = _newBuyer;
+        _option.holderSellPrice = uint96(_price);
+        // Emit approval of the next holder
+        emit HolderTransferApproved(_optionHash, _newBuyer, uint96(_price));
     }
 
     /*
@@ -166,45 +393,66 @@ contract OptionsDEX is IOptionsDEX {
     The correct amount of AVAX must be sent with this transaction, otherwise the transaction will revert!
     */
     function transferOptionHolder(bytes32 _optionHash) public payable override {
-        // Check that msg.sender has permission
-        require(approvedHolderAddress[_optionHash] == msg.sender, "You are not authorized!");
         // Fetch option from storage
-        Option memory _option = openOptions[_optionHash];
+        Option storage _option = openOptions[_optionHash];
+        // Check that msg.sender has permission
+        require(_option.approvedHolder == msg.sender, "You are not authorized!");
         // Check that option exists
         require(_option.blockExpiration != 0, "This option does not exist!");
         // Check that msg.value is equal to holder's sell price
         require(_option.holderSellPrice == msg.value, "Incorrect amount sent!");
 
         // Change option holder
-        openOptions[_optionHash].holder = msg.sender;
-        // Delete approved address
-        delete approvedHolderAddress[_optionHash];
+        address _holder = _option.holder;
+        _moveHolder(_optionHash, _option, _holder);
 
-        // Send ETH to past holder
-        (bool sent, ) = _option.holder.call{value: msg.value}("");
-        require(sent, "Failed to send Ether");
+        // Pay past holder
+        _pay(_holder, msg.value);
+    }
 
+    /*
+    Internal function that makes msg.sender the holder of an option and deletes the approved next holder
+    Parameters:
+        _optionHash: the hash of the option being transferred
+        _option: the option in storage
+        _holder: the current holder of the option
+    */
+    function _moveHolder(bytes32 _optionHash, Option storage _option, address _holder) internal {
+        _option.holder = msg.sender;
+        // Delete approved address and sell price
+        _option.approvedHolder = address(0);
+        _option.holderSellPrice = 0;
+        // Move option to the list of the new holder
+        if (openInterestIndexed) {
+            _indexRemove(holderOptions[_holder], _optionHash, HOLDER_INDEX);
+            _indexAdd(holderOptions[msg.sender], _optionHash, HOLDER_INDEX);
+        }
+        // Emit holder transfer
+        emit HolderTransferred(_optionHash, _holder, msg.sender, msg.value);
     }
 
     /*
-    Function that approves the next writer of an option.
+    Function that approves the next writer of an option. The approval is deleted when the quantity of the option changes.
     Parameters:
         _optionHash: the hash of the particular option
         _newWriter: the address of the next writer
-        _price: the price whicht the next writer will purchase the option at
+        _price: the price whicht the next writer will purchase the option at, must be less than 2^96
     */
     function approveOptionTransferWriter(bytes32 _optionHash, address _newWriter, uint128 _price) public override {
          // Fetch option from storage
-        Option memory _option = openOptions[_optionHash];
+        Option storage _option = openOptions[_optionHash];
         // Check that option exists
         require(_option.blockExpiration != 0, "This option does not exist!");
         // Check that current holder is calling this option
         require(msg.sender == _option.writer, "You are not the current holder!");
+        // Check that _price fits into storage
+        require(_price <= type(uint96).max, "Invalid price!");
 
-        // Set holderSellPrice for option
-        openOptions[_optionHash].writerSellPrice = _price;
-        // Add _newBuyer to approved addresses
-        approvedWriterAddress[_optionHash] = _newWriter;
+        // Set approved writer and writerSellPrice for option, which share a slot
+        _option.approvedWriter = _newWriter;
+        _option.writerSellPrice = uint96(_price);
+        // Emit approval of the next writer
+        emit WriterTransferApproved(_optionHash, _newWriter, uint96(_price));
     }
 
     /*
@@ -214,63 +462,304 @@ contract OptionsDEX is IOptionsDEX {
     The correct amount of AVAX must be sent with this transaction, otherwise the transaction will revert! In addition, the approved next writer must have already approved for OptionsDEX to transfer their tokens to the smart contract, otherwise the transaction will revert
     */
     function transferOptionWriter(bytes32 _optionHash) public payable override {
-        // Check that msg.sender has permission
-        require(approvedWriterAddress[_optionHash] == msg.sender, "You are not authorized!");
         // Fetch option from storage
-        Option memory _option = openOptions[_optionHash];
+        Option storage _option = openOptions[_optionHash];
+        // Check that msg.sender has permission
+        require(_option.approvedWriter == msg.sender, "You are not authorized!");
         // Check that option exists
         require(_option.blockExpiration != 0, "This option does not exist!");
         // Check that msg.value is equal to holder's sell price
         require(_option.writerSellPrice == msg.value, "Incorrect amount sent!");
+
+        // Swap collateral and change option writer
+        address _writer = _option.writer;
+        _moveWriter(_optionHash, _option, _writer);
+
+        // Pay past writer
+        _pay(_writer, msg.value);
+    }
+
+    /*
+    Function that allows the approved next writer of an option to purchase the option like transferOptionWriter(), approving the collateral with an EIP-2612 permit of msg.sender instead of a prior approve() transaction. A permit that fails is ignored, as in createOptionWithPermit().
+    Parameters:
+        _optionHash: the hash of the particular option
+        _permit: the permit signed by msg.sender for OptionsDEX, its value must cover the quantity of the option
+    The correct amount of AVAX must be sent with this transaction, otherwise the transaction will revert!
+    */
+    function transferOptionWriterWithPermit(bytes32 _optionHash, Permit calldata _permit) public payable override {
+        // Fetch option from storage
+        Option storage _option = openOptions[_optionHash];
+        // Check that msg.sender has permission, which also means that the option exists
+        require(_option.approvedWriter == msg.sender, "You are not authorized!");
+        // Approve collateral and transfer option
+        _usePermit(assetAddresses[_option.assetId], _permit);
+        transferOptionWriter(_optionHash);
+    }
+
+    /*
+    Internal function that submits an EIP-2612 permit of msg.sender for OptionsDEX to an asset. Failures are ignored, since anyone can submit a permit seen in the mempool first, which would otherwise block the transaction; the transfer of the collateral reverts if the allowance does not cover it.
+    Parameters:
+        _asset: the contract address of the asset, must be a registered asset
+        _permit: the permit signed by msg.sender
+    */
+    function _usePermit(address _asset, Permit calldata _permit) internal {
+        try IERC20Permit(_asset).permit(msg.sender, address(this), _permit.value, _permit.deadline, _permit.v, _permit.r, _permit.s) {
+        } catch {
+        }
+    }
+
+    /*
+    Internal function that replaces the collateral of the current writer of an option by the collateral of msg.sender, makes msg.sender the writer and deletes the approved next writer
+    Parameters:
+        _optionHash: the hash of the option being transferred
+        _option: the option in storage
+        _writer: the current writer of the option
+    msg.sender must have approved OptionsDEX to transfer its tokens, otherwise the transaction will revert
+    */
+    function _moveWriter(bytes32 _optionHash, Option storage _option, address _writer) internal {
         // Check that msg.sender has enough assets to cover option
         // Create interface
-        IERC20 _token = IERC20(_option.asset);
+        IERC20 _token = IERC20(assetAddresses[_option.assetId]);
+        uint256 _collateral = uint256(_option.quantity) * TOKEN_UNIT;
         // Check that msg.sender has enough tokens
-        require(_token.balanceOf(msg.sender) >= 10 ** 20, "You do not have the assets necessary to cover this call");
+        require(_token.balanceOf(msg.sender) >= _collateral, "You do not have the assets necessary to cover this call");
 
         // Send tokens back to original writer
-        _token.transfer(_option.writer, 10 ** 20);
+        _token.transfer(_writer, _collateral);
         // Get tokens from msg.sender
-        _token.transferFrom(msg.sender, address(this), 10 ** 20);
+        _token.transferFrom(msg.sender, address(this), _collateral);
 
         // Change option writer
-        openOptions[_optionHash].writer = msg.sender;
-        // Delete approved address
-        delete approvedWriterAddress[_optionHash];
+        _option.writer = msg.sender;
+        // Delete approved address and sell price
+        _option.approvedWriter = address(0);
+        _option.writerSellPrice = 0;
+        // Move option to the list of the new writer
+        if (openInterestIndexed) {
+            _indexRemove(writerOptions[_writer], _optionHash, WRITER_INDEX);
+            _indexAdd(writerOptions[msg.sender], _optionHash, WRITER_INDEX);
+        }
+        // Emit writer transfer
+        emit WriterTransferred(_optionHash, _writer, msg.sender, msg.value);
+    }
 
-        // Send ETH to past writer
-        (bool sent, ) = _option.writer.call{value: msg.value}("");
-        require(sent, "Failed to send Ether");
+    /*
+    Function that lets msg.sender buy the holder or writer side of an option in a single transaction from a seller who signed a sell order off-chain (EIP-712). The signer must be the current holder (or writer) of the option. The same checks as transferOptionHolder() and transferOptionWriter() apply, and any approved next holder (or writer) is deleted.
+    An order with a quantity of 0 or of the quantity of the option sells the whole side. A holder order with a smaller quantity sells part of the position, which is split off into a new option held by msg.sender (see _splitHolder()). Writer orders always sell the whole side.
+    Parameters:
+        _order: the signed sell order
+        _v, _r, _s: the signature of the seller over hashSellOrder(_order)
+    The price of the order must be sent with this transaction, otherwise the transaction will revert! To buy the writer side, msg.sender must have approved OptionsDEX to transfer the collateral of the option.
+    */
+    function fillSellOrder(SellOrder calldata _order, uint8 _v, bytes32 _r, bytes32 _s) public payable override {
+        // Fetch option from storage
+        Option storage _option = openOptions[_order.optionHash];
+        // Check that option exists
+        require(_option.blockExpiration != 0, "This option does not exist!");
+        // Check that order has not expired
+        require(block.number <= _order.blockExpiration, "Order has expired!");
+        // Check that msg.sender may fill the order
+        require(_order.taker == address(0) || _order.taker == msg.sender, "You are not the taker of this order!");
+        // Check that msg.value is equal to the price of the order
+        require(msg.value == _order.price, "Incorrect amount sent!");
+        // Check that the order sells the whole side, or part of the holder side
+        uint64 _quantity = _option.quantity;
+        require(_order.quantity == 0 || _order.quantity == _quantity || (!_order.isWriter && _order.quantity < _quantity), "Invalid quantity!");
+        // Check that the order was signed by the current owner of the side being sold
+        address _seller = _order.isWriter ? _option.writer : _option.holder;
+        require(_seller != address(0) && _recoverSigner(hashSellOrder(_order), _v, _r, _s) == _seller, "Invalid signature!");
+        // Mark nonce as used so that the order cannot be filled again
+        _useOrderNonce(_seller, _order.nonce);
+
+        // Transfer side of option to msg.sender
+        if (_order.isWriter) {
+            _moveWriter(_order.optionHash, _option, _seller);
+        } else if (_order.quantity == 0 || _order.quantity == _quantity) {
+            _moveHolder(_order.optionHash, _option, _seller);
+        } else {
+            _splitHolder(_order.optionHash, _option, _seller, uint64(_order.quantity));
+        }
+        // Pay seller
+        _pay(_seller, msg.value);
+    }
+
+    /*
+    Internal function that moves _quantity tokens of an option into a new option held by msg.sender, with the same writer, asset, strike price, premium and expiration. The new option is hashed from the hash and the quantity of the option it was split from, which decreases with every split and exercise, so every split gives a new hash.
+    Parameters:
+        _optionHash: the hash of the option being split
+        _option: the option in storage
+        _holder: the current holder of the option
+        _quantity: the number of tokens moved, less than the quantity of the option
+    */
+    function _splitHolder(bytes32 _optionHash, Option storage _option, address _holder, uint64 _quantity) internal {
+        uint64 _remaining = _option.quantity;
+        bytes32 _newOptionHash = keccak256(abi.encode(_optionHash, _remaining));
+        // Copy the two slots set on creation, with the sold quantity
+        Option storage _newOption = openOptions[_newOptionHash];
+        _newOption.writer = _option.writer;
+        _newOption.assetId = _option.assetId;
+        _newOption.blockExpiration = _option.blockExpiration;
+        _newOption.strikePrice = _option.strikePrice;
+        _newOption.premium = _option.premium;
+        _newOption.quantity = _quantity;
+        _newOption.holder = msg.sender;
+        // Keep the rest of the position with the seller, deleting the approved next holder and writer and their sell prices, which were agreed for the whole position
+        _option.quantity = _remaining - _quantity;
+        _option.approvedHolder = address(0);
+        _option.holderSellPrice = 0;
+        _option.approvedWriter = address(0);
+        _option.writerSellPrice = 0;
+        // List new option under its asset, writer and holder
+        if (openInterestIndexed) {
+            _indexAdd(assetOptions[_newOption.assetId], _newOptionHash, ASSET_INDEX);
+            _indexAdd(writerOptions[_newOption.writer], _newOptionHash, WRITER_INDEX);
+            _indexAdd(holderOptions[msg.sender], _newOptionHash, HOLDER_INDEX);
+        }
+        // Emit split and holder transfer of the new option
+        emit OptionSplit(_optionHash, _newOptionHash, _quantity);
+        emit HolderTransferred(_newOptionHash, _holder, msg.sender, msg.value);
+    }
+
+    /*
+    Function that cancels the sell orders of msg.sender signed with the given nonces
+    Parameters:
+        _nonces: the nonces of the orders being cancelled
+    */
+    function cancelOrders(uint256[] calldata _nonces) public override {
+        for (uint256 i = 0; i < _nonces.length; i++) {
+            orderNonces[msg.sender][_nonces[i] >> 8] |= 1 << (_nonces[i] & 255);
+            // Emit order cancellation
+            emit OrderCancelled(msg.sender, _nonces[i]);
+        }
+    }
+
+    /*
+    Internal function that marks an order nonce of a seller as used, reverting if it was used or cancelled before
+    Parameters:
+        _seller: the address that signed the order
+        _nonce: the nonce of the order
+    */
+    function _useOrderNonce(address _seller, uint256 _nonce) internal {
+        uint256 _bit = 1 << (_nonce & 255);
+        uint256 _word = orderNonces[_seller][_nonce >> 8];
+        require((_word & _bit) == 0, "Order was filled or cancelled!");
+        orderNonces[_seller][_nonce >> 8] = _word | _bit;
+    }
+
+    /*
+    Internal function that returns the address that signed a digest, or the zero address if the signature is invalid
+    Parameters:
+        _digest: the signed EIP-712 digest
+        _v, _r, _s: the signature
+    */
+    function _recoverSigner(bytes32 _digest, uint8 _v, bytes32 _r, bytes32 _s) internal pure returns (address) {
+        // Reject malleable signatures (s in the upper half of the curve order)
+        if (uint256(_s) > 0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF5D576E7357A4501DDFE92F46681B20A0) {
+            return address(0);
+        }
+        return ecrecover(_digest, _v, _r, _s);
+    }
+
+    /*
+    Function that returns the EIP-712 digest a seller signs for a sell order
+    Parameters:
+        _order: the sell order
+    */
+    function hashSellOrder(SellOrder calldata _order) public view override returns (bytes32) {
+        bytes32 _structHash = keccak256(abi.encode(SELL_ORDER_TYPEHASH, _order.optionHash, _order.isWriter, _order.price, _order.taker, _order.blockExpiration, _order.nonce, _order.quantity));
+        return keccak256(abi.encodePacked("\x19\x01", DOMAIN_SEPARATOR(), _structHash));
+    }
+
+    /*
+    Function that returns the EIP-712 domain separator of OptionsDEX, recomputed if the chain ID changed since deployment
+    */
+    function DOMAIN_SEPARATOR() public view override returns (bytes32) {
+        return block.chainid == cachedChainId ? cachedDomainSeparator : _buildDomainSeparator();
+    }
+
+    /*
+    Internal function that computes the EIP-712 domain separator for the current chain
+    */
+    function _buildDomainSeparator() internal view returns (bytes32) {
+        return keccak256(abi.encode(DOMAIN_TYPEHASH, keccak256("OptionsDEX"), keccak256("1"), block.chainid, address(this)));
     }
 
     /*
-    Function that allows the current holder of an option to exercise their rights to an option
-    Parameters: 
+    Function that returns whether an order nonce of a seller was used or cancelled
+    Parameters:
+        _seller: the address that signs the orders
+        _nonce: the nonce being queried
+    */
+    function isOrderNonceUsed(address _seller, uint256 _nonce) external view override returns (bool) {
+        return (orderNonces[_seller][_nonce >> 8] & (1 << (_nonce & 255))) != 0;
+    }
+
+    /*
+    Function that allows the current holder of an option to exercise their rights to every token of an option
+    Parameters:
         _optionHash: the hash of the option being exercised
     The correct amount of AVAX must be sent with this transaction, otherwise the transaction will revert!
     */
     function exerciseOption(bytes32 _optionHash) public payable override {
+        _exercise(_optionHash, 0);
+    }
+
+    /*
+    Function that allows the current holder of an option to exercise their rights to some of the tokens of an option. The option stays open with the remaining tokens.
+    Parameters:
+        _optionHash: the hash of the option being exercised
+        _quantity: the number of tokens bought, must be greater than 0 and at most the quantity of the option
+    The correct amount of AVAX (strike price * _quantity) must be sent with this transaction, otherwise the transaction will revert!
+    */
+    function exerciseOptionPartial(bytes32 _optionHash, uint64 _quantity) public payable override {
+        // Check that _quantity is a valid number
+        require(_quantity > 0, "Invalid quantity!");
+        _exercise(_optionHash, _quantity);
+    }
+
+    /*
+    Internal function that sends _quantity tokens of an option to its holder against the strike price and deletes the option once every token is exercised. A partial exercise deletes the approved next holder and writer of the option and their sell prices, as a partial sale does.
+    Parameters:
+        _optionHash: the hash of the option being exercised
+        _quantity: the number of tokens bought, 0 for every token of the option
+    */
+    function _exercise(bytes32 _optionHash, uint64 _quantity) internal {
         // Fetch option from storage
-        Option memory _option = openOptions[_optionHash];
+        Option storage _option = openOptions[_optionHash];
         // Check that option exists
         require(_option.blockExpiration != 0, "This option does not exist!");
         // Check that msg.sender is current holder
         require(_option.holder == msg.sender, "You are not the holder!");
-        // Check that eth sent = strikePrice * 100
-        require(msg.value == _option.strikePrice * 100, "Incorrect amount sent!");
+        // Check that the option covers _quantity tokens
+        uint64 _remaining = _option.quantity;
+        if (_quantity == 0) {
+            _quantity = _remaining;
+        }
+        require(_quantity <= _remaining, "Invalid quantity!");
+        // Check that eth sent = strikePrice * _quantity
+        require(msg.value == uint256(_option.strikePrice) * _quantity, "Incorrect amount sent!");
 
         // Send tokens to msg.sender
-        IERC20 _token = IERC20(_option.asset);
-        _token.transfer(msg.sender, 10 ** 20);
+        IERC20 _token = IERC20(assetAddresses[_option.assetId]);
+        _token.transfer(msg.sender, uint256(_quantity) * TOKEN_UNIT);
 
-        // Delete option
-        delete openOptions[_optionHash];
-        // Delete approvals
-        delete approvedHolderAddress[_optionHash];
-        delete approvedWriterAddress[_optionHash];
-        // Send ETH to writer
-        (bool sent, ) = _option.holder.call{value: msg.value}("");
-        require(sent, "Failed to send Ether");
+        address _writer = _option.writer;
+        if (_quantity == _remaining) {
+            // Delete option and approvals
+            _unindexOption(_optionHash, _option);
+            delete openOptions[_optionHash];
+        } else {
+            // Keep the remaining tokens open, deleting the approved next holder and writer and their sell prices, which were agreed for the whole position
+            _option.quantity = _remaining - _quantity;
+            _option.approvedHolder = address(0);
+            _option.holderSellPrice = 0;
+            _option.approvedWriter = address(0);
+            _option.writerSellPrice = 0;
+        }
+        // Emit option exercise
+        emit OptionExercised(_optionHash, msg.sender, _writer, msg.value, _quantity);
+        // Pay strike price to writer
+        _pay(_writer, msg.value);
     }
 
     /*
@@ -279,21 +768,168 @@ contract OptionsDEX is IOptionsDEX {
         _optionHash: the hash of the particular option
     */
     function refund(bytes32 _optionHash) public override {
+        // Delete option and approvals from storage
+        (uint32 _assetId, uint256 _amount) = _closeForRefund(_optionHash);
+
+        // Send collateral back to seller
+        IERC20 _token = IERC20(assetAddresses[_assetId]);
+        _token.transfer(msg.sender, _amount);
+    }
+
+    /*
+    Function that allows the writer of many options to 'cancel' them in a single transaction, under the same conditions as refund(). The collateral of consecutive options on the same asset is sent back at once, so callers should group options by asset.
+    Parameters:
+        _optionHashes: the hashes of the options being refunded
+    */
+    function refundMany(bytes32[] calldata _optionHashes) public override {
+        // Collateral owed for the current run of options on the same asset
+        uint256 _collateral = 0;
+        for (uint256 i = 0; i < _optionHashes.length; i++) {
+            // Delete option and approvals from storage
+            (uint32 _assetId, uint256 _amount) = _closeForRefund(_optionHashes[i]);
+            _collateral += _amount;
+            // Send collateral back once the run of options on this asset ends
+            if (i + 1 == _optionHashes.length || openOptions[_optionHashes[i + 1]].assetId != _assetId) {
+                IERC20(assetAddresses[_assetId]).transfer(msg.sender, _collateral);
+                _collateral = 0;
+            }
+        }
+    }
+
+    /*
+    Internal function that checks that msg.sender may be refunded an option, deletes the option and returns the asset ID and the amount of its collateral
+    Parameters:
+        _optionHash: the hash of the particular option
+    */
+    function _closeForRefund(bytes32 _optionHash) internal returns (uint32, uint256) {
         // Fetch option from storage and check if it is valid
-        Option memory _option = openOptions[_optionHash]; 
+        Option storage _option = openOptions[_optionHash];
         // Check that option is past block expiration or that no buyer has been assigned
         require(block.number > _option.blockExpiration || _option.holder == address(0), "You are not able to be refunded!");
         // Check that msg.sender is the option writer
         require(msg.sender == _option.writer, "You are not the option writer!");
 
-        // Send 100 tokens back to seller
-        IERC20 _token = IERC20(_option.asset);
-        _token.transfer(msg.sender, 10 ** 20);
-
-        // Delete option from storage
+        uint32 _assetId = _option.assetId;
+        uint256 _amount = uint256(_option.quantity) * TOKEN_UNIT;
+        // Delete option and approvals from storage
+        _unindexOption(_optionHash, _option);
         delete openOptions[_optionHash];
-        delete approvedHolderAddress[_optionHash];
-        delete approvedWriterAddress[_optionHash];
+        // Emit option refund
+        emit OptionRefunded(_optionHash, msg.sender);
+        return (_assetId, _amount);
+    }
+
+    /*
+    Internal function that appends an option to a list of open options and records its position
+    Parameters:
+        _list: the list of open options
+        _optionHash: the hash of the option
+        _kind: ASSET_INDEX, WRITER_INDEX or HOLDER_INDEX, the kind of _list
+    */
+    function _indexAdd(bytes32[] storage _list, bytes32 _optionHash, uint256 _kind) internal {
+        indexPositions[_optionHash][_kind] = uint64(_list.length);
+        _list.push(_optionHash);
+    }
+
+    /*
+    Internal function that removes an option from a list of open options by moving the last option of the list into its position
+    Parameters:
+        _list: the list of open options, must contain the option
+        _optionHash: the hash of the option
+        _kind: ASSET_INDEX, WRITER_INDEX or HOLDER_INDEX, the kind of _list
+    */
+    function _indexRemove(bytes32[] storage _list, bytes32 _optionHash, uint256 _kind) internal {
+        uint64 _position = indexPositions[_optionHash][_kind];
+        bytes32 _last = _list[_list.length - 1];
+        // Swap last option into the position and pop
+        _list[_position] = _last;
+        indexPositions[_last][_kind] = _position;
+        _list.pop();
+    }
+
+    /*
+    Internal function that removes an option that is being deleted from every list of open options
+    Parameters:
+        _optionHash: the hash of the option
+        _option: the option in storage
+    */
+    function _unindexOption(bytes32 _optionHash, Option storage _option) internal {
+        if (!openInterestIndexed) {
+            return;
+        }
+        _indexRemove(assetOptions[_option.assetId], _optionHash, ASSET_INDEX);
+        _indexRemove(writerOptions[_option.writer], _optionHash, WRITER_INDEX);
+        // Options that were never bought have no holder list
+        if (_option.holder != address(0)) {
+            _indexRemove(holderOptions[_option.holder], _optionHash, HOLDER_INDEX);
+        }
+        delete indexPositions[_optionHash];
+    }
+
+    /*
+    Function that chooses whether the proceeds of msg.sender are credited to its balance in OptionsDEX or sent to it with every trade. Credited proceeds are collected with withdraw() or withdrawTo(), which saves the gas of an ETH transfer on every trade.
+    Parameters:
+        _enabled: true to credit proceeds, false to send them
+    */
+    function setCreditMode(bool _enabled) public override {
+        payees[msg.sender].creditMode = _enabled;
+    }
+
+    /*
+    Function that sends every credited proceed of msg.sender to msg.sender
+    */
+    function withdraw() public override {
+        // Fetch credit from storage
+        uint256 _amount = payees[msg.sender].credit;
+        require(_amount > 0, "Nothing to withdraw!");
+
+        // Clear credit before sending ETH
+        payees[msg.sender].credit = 0;
+        (bool sent, ) = msg.sender.call{value: _amount}("");
+        require(sent, "Failed to send Ether");
+    }
+
+    /*
+    Function that sends credited proceeds of msg.sender to several recipients in a single transaction
+    Parameters:
+        _recipients: the addresses receiving ETH
+        _amounts: the amount of ETH sent to each recipient (in Wei), must not add up to more than the credit of msg.sender
+    */
+    function withdrawTo(address[] calldata _recipients, uint256[] calldata _amounts) public override {
+        // Check that every recipient has an amount
+        require(_recipients.length == _amounts.length, "Array lengths do not match!");
+        uint256 _total = 0;
+        for (uint256 i = 0; i < _amounts.length; i++) {
+            _total += _amounts[i];
+        }
+        // Check that msg.sender has enough credit
+        uint256 _credit = payees[msg.sender].credit;
+        require(_total <= _credit, "Not enough credit!");
+
+        // Deduct credit before sending ETH
+        payees[msg.sender].credit = uint128(_credit - _total);
+        for (uint256 i = 0; i < _recipients.length; i++) {
+            (bool sent, ) = _recipients[i].call{value: _amounts[i]}("");
+            require(sent, "Failed to send Ether");
+        }
+    }
+
+    /*
+    Internal function that pays the proceeds of a trade, either by crediting them or by sending them, depending on the credit mode of the payee
+    Parameters:
+        _payee: the address being paid
+        _amount: the amount of ETH being paid (in Wei)
+    */
+    function _pay(address _payee, uint256 _amount) internal {
+        Payee storage _account = payees[_payee];
+        if (_account.creditMode) {
+            // Credit proceeds, which shares a slot with the credit mode
+            _account.credit += uint128(_amount);
+        } else {
+            // Send ETH
+            (bool sent, ) = _payee.call{value: _amount}("");
+            require(sent, "Failed to send Ether");
+        }
     }
 
     /*
@@ -305,7 +941,108 @@ contract OptionsDEX is IOptionsDEX {
         // Fetch option from storage
         Option memory _option = openOptions[_optionHash];
         // Return option as tuple
-        return (_option.asset, _option.strikePrice, _option.writer, _option.premium, _option.holder, _option.blockExpiration, _option.holderSellPrice, _option.writerSellPrice);
+        return (assetAddresses[_option.assetId], _option.strikePrice, _option.writer, _option.premium, _option.holder, _option.blockExpiration, _option.holderSellPrice, _option.writerSellPrice);
+    }
+
+    /*
+    Function that returns information about many options, including their approved next holder and writer and their quantity, in a single call
+    Parameters:
+        _optionHashes: the hashes of the options being queried
+    Options that do not exist are returned with every field set to zero
+    */
+    function getOptionDetailsBatch(bytes32[] calldata _optionHashes) external view override returns (OptionDetails[] memory) {
+        OptionDetails[] memory _details = new OptionDetails[](_optionHashes.length);
+        for (uint256 i = 0; i < _optionHashes.length; i++) {
+            _copyDetails(_optionHashes[i], _details[i]);
+        }
+        return _details;
+    }
+
+    /*
+    Internal function that copies an option and its approvals into an OptionDetails struct, field by field to keep the stack shallow
+    Parameters:
+        _optionHash: the hash of the option being queried
+        _detail: the struct in memory being filled
+    */
+    function _copyDetails(bytes32 _optionHash, OptionDetails memory _detail) internal view {
+        // Fetch option from storage
+        Option memory _option = openOptions[_optionHash];
+        _detail.asset = assetAddresses[_option.assetId];
+        _detail.strikePrice = _option.strikePrice;
+        _detail.writer = _option.writer;
+        _detail.premium = _option.premium;
+        _detail.holder = _option.holder;
+        _detail.blockExpiration = _option.blockExpiration;
+        _detail.holderSellPrice = _option.holderSellPrice;
+        _detail.writerSellPrice = _option.writerSellPrice;
+        _detail.approvedHolder = _option.approvedHolder;
+        _detail.approvedWriter = _option.approvedWriter;
+        _detail.quantity = _option.quantity;
+    }
+
+    /*
+    Function that returns a page of the open options on an asset, as their hashes, their details and the total number of open options on the asset. Options stay open until they are exercised or refunded, so expired options are included. The order of the list changes whenever an option is removed.
+    Parameters:
+        _asset: the address of the asset being queried
+        _offset: the position of the first option returned
+        _limit: the maximum number of options returned
+    */
+    function getOpenOptions(address _asset, uint256 _offset, uint256 _limit) external view override returns (bytes32[] memory, OptionDetails[] memory, uint256) {
+        return _page(assetOptions[assetIds[_asset]], _offset, _limit);
+    }
+
+    /*
+    Function that returns a page of the open options written by an account, in the same form as getOpenOptions()
+    Parameters:
+        _writer: the address being queried
+        _offset: the position of the first option returned
+        _limit: the maximum number of options returned
+    */
+    function getOpenOptionsByWriter(address _writer, uint256 _offset, uint256 _limit) external view override returns (bytes32[] memory, OptionDetails[] memory, uint256) {
+        return _page(writerOptions[_writer], _offset, _limit);
+    }
+
+    /*
+    Function that returns a page of the open options held by an account, in the same form as getOpenOptions()
+    Parameters:
+        _holder: the address being queried
+        _offset: the position of the first option returned
+        _limit: the maximum number of options returned
+    */
+    function getOpenOptionsByHolder(address _holder, uint256 _offset, uint256 _limit) external view override returns (bytes32[] memory, OptionDetails[] memory, uint256) {
+        return _page(holderOptions[_holder], _offset, _limit);
+    }
+
+    /*
+    Internal function that returns the hashes and details of the options at positions _offset to _offset + _limit of a list of open options, together with the length of the list
+    Parameters:
+        _list: the list of open options
+        _offset: the position of the first option returned
+        _limit: the maximum number of options returned
+    */
+    function _page(bytes32[] storage _list, uint256 _offset, uint256 _limit) internal view returns (bytes32[] memory, OptionDetails[] memory, uint256) {
+        // Check that the lists are maintained
+        require(openInterestIndexed, "Open interest index is disabled!");
+        uint256 _total = _list.length;
+        // Clamp page to the end of the list
+        uint256 _count = 0;
+        if (_offset < _total) {
+            _count = _total - _offset < _limit ? _total - _offset : _limit;
+        }
+        bytes32[] memory _hashes = new bytes32[](_count);
+        OptionDetails[] memory _details = new OptionDetails[](_count);
+        for (uint256 i = 0; i < _count; i++) {
+            _hashes[i] = _list[_offset + i];
+            _copyDetails(_hashes[i], _details[i]);
+        }
+        return (_hashes, _details, _total);
+    }
+
+    /*
+    Function that returns whether the lists of open options are maintained by this deployment
+    */
+    function isOpenInterestIndexed() external view override returns (bool) {
+        return openInterestIndexed;
     }
 
     /*
@@ -314,7 +1051,7 @@ contract OptionsDEX is IOptionsDEX {
         _optionHash: the hash of the option being queried
     */
     function viewHolderApproval(bytes32 _optionHash) external view override returns (address) {
-        return approvedHolderAddress[_optionHash];
+        return openOptions[_optionHash].approvedHolder;
     }
 
     /*
@@ -323,7 +1060,7 @@ contract OptionsDEX is IOptionsDEX {
         _optionHash: the hash of the option being queried
     */
     function viewWriterApproval(bytes32 _optionHash) external view override returns (address) {
-        return approvedWriterAddress[_optionHash];
+        return openOptions[_optionHash].approvedWriter;
     }
 
     /*
@@ -332,8 +1069,35 @@ contract OptionsDEX is IOptionsDEX {
         _asset: the address of the asset being queried
     */
     function isApprovedAsset(address _asset) external view override returns(bool) {
-        return approvedAssets[_asset];
+        return assetIds[_asset] != 0;
+    }
+
+    /*
+    Function that returns the registry ID of an asset, or 0 if the asset is not registered
+    Parameters:
+        _asset: the address of the asset being queried
+    */
+    function getAssetId(address _asset) external view override returns (uint32) {
+        return assetIds[_asset];
+    }
+
+    /*
+    Function that returns the ETH credited to an account and whether its proceeds are credited
+    Parameters:
+        _account: the address being queried
+    */
+    function viewCredit(address _account) external view override returns (uint256, bool) {
+        return (payees[_account].credit, payees[_account].creditMode);
+    }
+
+    /*
+    Function that returns the nonce that the next option written by an account is hashed with
+    Parameters:
+        _account: the address being queried
+    */
+    function getNonce(address _account) external view override returns (uint256) {
+        return addressNonce[_account];
     }
 
     receive() external payable override {}
-}
\ No newline at end of file
+}
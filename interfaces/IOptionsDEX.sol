@@ -5,8 +5,50 @@ Interface for OptionsDex
 */
 interface IOptionsDEX {
 
+    // Details of an option together with its approved next holder and writer and the number of tokens it covers
+    struct OptionDetails {
+        address asset;
+        uint96 strikePrice;
+        address writer;
+        uint96 premium;
+        address holder;
+        uint96 blockExpiration;
+        uint128 holderSellPrice;
+        uint128 writerSellPrice;
+        address approvedHolder;
+        address approvedWriter;
+        uint64 quantity;
+    }
+
+    // Order signed off-chain (EIP-712) by the holder or writer of an option to sell its side
+    struct SellOrder {
+        bytes32 optionHash;
+        bool isWriter;
+        uint256 price;
+        address taker;
+        uint256 blockExpiration;
+        uint256 nonce;
+        // Number of tokens sold, 0 for the whole side
+        uint256 quantity;
+    }
+
+    // EIP-2612 permit signed off-chain by msg.sender, which approves OptionsDEX to spend value tokens of the underlying asset
+    struct Permit {
+        uint256 value;
+        uint256 deadline;
+        uint8 v;
+        bytes32 r;
+        bytes32 s;
+    }
+
     function createOption(address _asset, uint96 _premium, uint96 _strikePrice, uint96 _blockExpiration) external;
 
+    function createOptionWithQuantity(address _asset, uint96 _premium, uint96 _strikePrice, uint96 _blockExpiration, uint64 _quantity) external;
+
+    function createOptionWithPermit(address _asset, uint96 _premium, uint96 _strikePrice, uint96 _blockExpiration, uint64 _quantity, Permit calldata _permit) external;
+
+    function createOptions(address[] calldata _assets, uint96[] calldata _premiums, uint96[] calldata _strikePrices, uint96[] calldata _blockExpirations) external;
+
     function buyOption(bytes32 _optionHash) payable external;
 
     function approveOptionTransferHolder(bytes32 _optionHash, address _newBuyer, uint128 _price) external;
@@ -17,18 +59,58 @@ interface IOptionsDEX {
 
     function transferOptionWriter(bytes32 _optionHash) payable external;
 
+    function transferOptionWriterWithPermit(bytes32 _optionHash, Permit calldata _permit) payable external;
+
+    function fillSellOrder(SellOrder calldata _order, uint8 _v, bytes32 _r, bytes32 _s) payable external;
+
+    function cancelOrders(uint256[] calldata _nonces) external;
+
+    function hashSellOrder(SellOrder calldata _order) external view returns (bytes32);
+
+    function DOMAIN_SEPARATOR() external view returns (bytes32);
+
+    function isOrderNonceUsed(address _seller, uint256 _nonce) external view returns (bool);
+
     function exerciseOption(bytes32 _optionHash) payable external;
 
+    function exerciseOptionPartial(bytes32 _optionHash, uint64 _quantity) payable external;
+
     function refund(bytes32 _optionHash) external;
 
+    function refundMany(bytes32[] calldata _optionHashes) external;
+
+    function setCreditMode(bool _enabled) external;
+
+    function withdraw() external;
+
+    function withdrawTo(address[] calldata _recipients, uint256[] calldata _amounts) external;
+
     function getOptionDetails(bytes32) external view returns (address, uint96, address, uint96, address, uint96, uint128, uint128);
 
+    function getOptionDetailsBatch(bytes32[] calldata _optionHashes) external view returns (OptionDetails[] memory);
+
+    function getOpenOptions(address _asset, uint256 _offset, uint256 _limit) external view returns (bytes32[] memory, OptionDetails[] memory, uint256);
+
+    function getOpenOptionsByWriter(address _writer, uint256 _offset, uint256 _limit) external view returns (bytes32[] memory, OptionDetails[] memory, uint256);
+
+    function getOpenOptionsByHolder(address _holder, uint256 _offset, uint256 _limit) external view returns (bytes32[] memory, OptionDetails[] memory, uint256);
+
+    function isOpenInterestIndexed() external view returns (bool);
+
     function viewHolderApproval(bytes32 _optionHash) external view returns (address);
 
     function viewWriterApproval(bytes32 _optionHash) external view returns (address);
 
     function isApprovedAsset(address _asset) external view returns(bool); 
 
+    function registerAsset(address _asset) external returns (uint32);
+
+    function getAssetId(address _asset) external view returns (uint32);
+
+    function viewCredit(address _account) external view returns (uint256, bool);
+
+    function getNonce(address _account) external view returns (uint256);
+
     receive() external payable;
 
 }
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Benchmark of the read latency of OptionsDEX with and without OptionsCache
+
+Creates a book of options on the local development chain and replays the same random query mix twice: once with direct calls to OptionsDEX, and once through an OptionsCache synced after every write. Option popularity follows a Zipf law (a few options of the book take most queries), and queries are split as:
+
+70% getOptionDetails()
+10% viewHolderApproval()
+10% viewWriterApproval()
+10% isApprovedAsset()
+
+Every write_every queries, the writer approves a writer transfer of a popular option, which mines a block and invalidates the option in the cache. Reports the mean, median and 99th percentile latency of the reads, and the metrics of the cache.
+
+Usage:
+
+    brownie run scripts/benchmark_cache.py main 2000 20000
+"""
+
+import random
+import time
+
+from brownie import accounts, OptionsDEX
+from scripts.benchmark_reads import create_book
+from scripts.cache import OptionsCache
+from scripts.client import OptionsDEXClient
+
+# Share of the queries per view
+QUERY_MIX = (("details", 70), ("holder", 10), ("writer", 10), ("asset", 10))
+# Exponent of the Zipf law of option popularity
+ZIPF_EXPONENT = 1.1
+
+
+def make_queries(hashes, assets, count, write_every, seed=0):
+    """
+    Function that returns a reproducible list of count (kind, argument) queries, with a ("write", option hash) query every write_every queries
+    """
+    rng = random.Random(seed)
+    popularity = [1 / (rank + 1) ** ZIPF_EXPONENT for rank in range(len(hashes))]
+    kinds, weights = zip(*QUERY_MIX)
+    queries = []
+    for i in range(count):
+        if write_every and i % write_every == write_every - 1:
+            queries.append(("write", rng.choices(hashes, popularity)[0]))
+        kind = rng.choices(kinds, weights)[0]
+        queries.append((kind, rng.choice(assets) if kind == "asset" else rng.choices(hashes, popularity)[0]))
+    return queries
+
+
+def run(dex, queries, cache=None):
+    """
+    Function that replays queries against OptionsDEX, or through cache if given, and returns the latency in seconds of every read
+    """
+    if cache is None:
+        views = {"details": dex.getOptionDetails, "holder": dex.viewHolderApproval, "writer": dex.viewWriterApproval, "asset": dex.isApprovedAsset}
+    else:
+        cache.sync()
+        views = {"details": cache.get_option_details, "holder": cache.view_holder_approval, "writer": cache.view_writer_approval, "asset": cache.is_approved_asset}
+    latencies = []
+    for i, (kind, argument) in enumerate(queries):
+        if kind == "write":
+            dex.approveOptionTransferWriter(argument, accounts[1 + i % 3], i, {"from": accounts[0]})
+            if cache is not None:
+                cache.sync()
+            continue
+        start = time.perf_counter()
+        views[kind](argument)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summary(latencies):
+    """
+    Function that returns the mean, median and 99th percentile of latencies, in milliseconds
+    """
+    ordered = sorted(latencies)
+    return (1000 * sum(ordered) / len(ordered), 1000 * ordered[len(ordered) // 2], 1000 * ordered[int(len(ordered) * 0.99)])
+
+
+def main(size=2000, count=20000, max_size=1000, write_every=50):
+    size, count, max_size, write_every = int(size), int(count), int(max_size), int(write_every)
+    dex = accounts[0].deploy(OptionsDEX, False)
+    hashes = create_book(dex, size)
+    assets = [dex.getOptionDetails(option_hash)[0] for option_hash in hashes[::1000]] + [accounts[5].address]
+    queries = make_queries(hashes, assets, count, write_every)
+
+    direct = run(dex, queries)
+    cache = OptionsCache(OptionsDEXClient(dex, accounts[0]), max_size)
+    cached = run(dex, queries, cache)
+
+    print("{} options, {} reads, a write every {} reads, cache of {} options".format(size, len(direct), write_every, max_size))
+    print("{:<12}{:>12}{:>12}{:>12}".format("ms", "mean", "p50", "p99"))
+    print("{:<12}{:>12.3f}{:>12.3f}{:>12.3f}".format("direct", *summary(direct)))
+    print("{:<12}{:>12.3f}{:>12.3f}{:>12.3f}".format("cached", *summary(cached)))
+    stats = cache.stats()
+    print("hit rate {:.1%}, {} misses, {} RPC calls, {} evictions, {} invalidations".format(
+        stats["hit_rate"], stats["misses"], stats["calls"], stats["evictions"], stats["invalidations"]))
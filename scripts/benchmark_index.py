@@ -0,0 +1,80 @@
+"""
+Benchmark of the gas cost of the open interest index of OptionsDEX
+
+Deploys OptionsDEX with and without its open interest index on the local development chain, drives every write path of an option through both deployments (creation one by one and in a batch, purchase, approvals and transfers of both sides, partial and full exercise, partial sale through a signed sell order and refunds) and reports the gas used by each function and the overhead of the index, as a table that can be pasted into README.md.
+
+Usage:
+
+    brownie run scripts/benchmark_index.py
+"""
+
+from brownie import accounts, chain, CayugaCoin, OptionsDEX
+from scripts.orders import OrderBook
+
+PREMIUM = 10 ** 17
+STRIKE_PRICE = 10 ** 18
+# Tokens, premium and strike price per token of the option split and exercised in parts
+QUANTITY = 1000
+UNIT_PRICE = 10 ** 12
+# Options created by the createOptions() batch
+BATCH_SIZE = 10
+
+
+def measure(dex, token):
+    """
+    Function that runs every write path of an option on dex and returns a dictionary of function name to gas used
+    """
+    writer, holder, new_holder, new_writer = accounts[0], accounts[1], accounts[2], accounts[3]
+    expiration = chain.height + 100
+    gas = {}
+
+    def create():
+        tx = dex.createOption(token.address, PREMIUM, STRIKE_PRICE, expiration, {"from": writer})
+        gas["createOption"] = tx.gas_used
+        return tx.events["OptionCreated"]["optionHash"]
+
+    # Create, buy, transfer both sides and exercise an option
+    option_hash = create()
+    tx = dex.createOptions([token.address] * BATCH_SIZE, [PREMIUM] * BATCH_SIZE, [STRIKE_PRICE] * BATCH_SIZE, [expiration] * BATCH_SIZE, {"from": writer})
+    gas["createOptions (per option)"] = tx.gas_used // BATCH_SIZE
+    gas["buyOption"] = dex.buyOption(option_hash, {"from": holder, "value": PREMIUM * 100}).gas_used
+    gas["approveOptionTransferHolder"] = dex.approveOptionTransferHolder(option_hash, new_holder, 1, {"from": holder}).gas_used
+    gas["transferOptionHolder"] = dex.transferOptionHolder(option_hash, {"from": new_holder, "value": 1}).gas_used
+    gas["approveOptionTransferWriter"] = dex.approveOptionTransferWriter(option_hash, new_writer, 1, {"from": writer}).gas_used
+    gas["transferOptionWriter"] = dex.transferOptionWriter(option_hash, {"from": new_writer, "value": 1}).gas_used
+    gas["exerciseOption"] = dex.exerciseOption(option_hash, {"from": new_holder, "value": STRIKE_PRICE * 100}).gas_used
+    # Sell part of a position through a signed order, which splits the option, and exercise part of the rest
+    seller = accounts.add()
+    accounts[0].transfer(seller, 10 ** 18)
+    tx = dex.createOptionWithQuantity(token.address, UNIT_PRICE, UNIT_PRICE, expiration, QUANTITY, {"from": writer})
+    option_hash = tx.events["OptionCreated"]["optionHash"]
+    dex.buyOption(option_hash, {"from": seller, "value": UNIT_PRICE * QUANTITY})
+    book = OrderBook(dex)
+    gas["fillSellOrder (partial)"] = book.fill(book.sign(seller, option_hash, False, 0, chain.height + 10, quantity=QUANTITY // 2), new_holder).gas_used
+    gas["exerciseOptionPartial"] = dex.exerciseOptionPartial(option_hash, QUANTITY // 4, {"from": seller, "value": UNIT_PRICE * (QUANTITY // 4)}).gas_used
+    # Refund an option that was never bought
+    gas["refund (unsold)"] = dex.refund(create(), {"from": writer}).gas_used
+    # Refund a bought option after its expiration
+    option_hash = create()
+    dex.buyOption(option_hash, {"from": holder, "value": PREMIUM * 100})
+    chain.mine(expiration - chain.height + 1)
+    gas["refund (expired)"] = dex.refund(option_hash, {"from": writer}).gas_used
+    return gas
+
+
+def main():
+    token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+    token.transfer(accounts[3], 1000 * 10 ** 18, {"from": accounts[0]})
+    results = []
+    for indexed in (False, True):
+        dex = accounts[0].deploy(OptionsDEX, indexed)
+        dex.registerAsset(token.address, {"from": accounts[0]})
+        token.approve(dex.address, 2 ** 256 - 1, {"from": accounts[0]})
+        token.approve(dex.address, 2 ** 256 - 1, {"from": accounts[3]})
+        results.append(measure(dex, token))
+
+    plain, indexed = results
+    print("| function | no index | index | overhead |")
+    print("|---|---:|---:|---:|")
+    for name in plain:
+        print("| {} | {:,} | {:,} | {:+,} ({:+.0%}) |".format(name, plain[name], indexed[name], indexed[name] - plain[name], indexed[name] / plain[name] - 1))
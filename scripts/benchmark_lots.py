@@ -0,0 +1,75 @@
+"""
+Benchmark of the gas per token of notional of fixed 100-token lots against a single option of any quantity
+
+Deploys OptionsDEX without its open interest index on the local development chain and writes, buys and exercises a position of 10,000 tokens twice: once as 100 options of 100 tokens (createOptions() in batches, then one buyOption() and one exerciseOption() per option), and once as a single option created with createOptionWithQuantity() and exercised with exerciseOptionPartial() in ten parts and exerciseOption(). Reports the total gas of every step and its gas per token of notional, as a table that can be pasted into README.md.
+
+Usage:
+
+    brownie run scripts/benchmark_lots.py main 10000
+"""
+
+from brownie import accounts, chain, CayugaCoin, OptionsDEX
+
+PREMIUM = 10 ** 15
+STRIKE_PRICE = 10 ** 16
+# Tokens per option created without a quantity
+LOT = 100
+# Options created per createOptions() transaction
+BATCH_SIZE = 50
+
+
+def fixed_lots(dex, token, notional):
+    """
+    Function that writes, buys and exercises notional tokens as options of LOT tokens and returns a dictionary of step to total gas used
+    """
+    writer, holder = accounts[0], accounts[1]
+    count = notional // LOT
+    expiration = chain.height + 1000
+    gas = {"create": 0, "buy": 0, "exercise": 0}
+    hashes = []
+    for start in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        tx = dex.createOptions([token.address] * size, [PREMIUM] * size, [STRIKE_PRICE] * size, [expiration] * size, {"from": writer})
+        gas["create"] += tx.gas_used
+        hashes += [event["optionHash"] for event in tx.events["OptionCreated"]]
+    for option_hash in hashes:
+        gas["buy"] += dex.buyOption(option_hash, {"from": holder, "value": PREMIUM * LOT}).gas_used
+    for option_hash in hashes:
+        gas["exercise"] += dex.exerciseOption(option_hash, {"from": holder, "value": STRIKE_PRICE * LOT}).gas_used
+    return gas
+
+
+def single_option(dex, token, notional, parts=10):
+    """
+    Function that writes and buys notional tokens as one option, exercises parts - 1 slices with exerciseOptionPartial() and the rest with exerciseOption(), and returns a dictionary of step to total gas used
+    """
+    writer, holder = accounts[0], accounts[1]
+    tx = dex.createOptionWithQuantity(token.address, PREMIUM, STRIKE_PRICE, chain.height + 1000, notional, {"from": writer})
+    option_hash = tx.events["OptionCreated"]["optionHash"]
+    gas = {"create": tx.gas_used}
+    gas["buy"] = dex.buyOption(option_hash, {"from": holder, "value": PREMIUM * notional}).gas_used
+    # Exercise the position in equal slices, the last one closing the option
+    size = notional // parts
+    gas["exercise"] = 0
+    for _ in range(parts - 1):
+        gas["exercise"] += dex.exerciseOptionPartial(option_hash, size, {"from": holder, "value": STRIKE_PRICE * size}).gas_used
+    gas["exercise"] += dex.exerciseOption(option_hash, {"from": holder, "value": STRIKE_PRICE * (notional - size * (parts - 1))}).gas_used
+    return gas
+
+
+def main(notional=10000):
+    notional = int(notional)
+    token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+    dex = accounts[0].deploy(OptionsDEX, False)
+    dex.registerAsset(token.address, {"from": accounts[0]})
+    token.approve(dex.address, 2 ** 256 - 1, {"from": accounts[0]})
+
+    fixed = fixed_lots(dex, token, notional)
+    single = single_option(dex, token, notional)
+    print("Position of {} tokens: {} options of {} tokens against 1 option exercised in 10 parts".format(notional, notional // LOT, LOT))
+    print("| step | {0}x{1} gas | gas/token | 1x{2} gas | gas/token | ratio |".format(notional // LOT, LOT, notional))
+    print("|---|---:|---:|---:|---:|---:|")
+    fixed["total"], single["total"] = sum(fixed.values()), sum(single.values())
+    for step in ("create", "buy", "exercise", "total"):
+        print("| {} | {:,} | {:,.1f} | {:,} | {:,.1f} | {:.1f}x |".format(
+            step, fixed[step], fixed[step] / notional, single[step], single[step] / notional, fixed[step] / single[step]))
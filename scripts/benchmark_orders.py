@@ -0,0 +1,97 @@
+"""
+Benchmark of secondary sales through signed sell orders against the approve/transfer handshake
+
+Sells the holder and the writer side of a number of options on the local development chain, once with approveOptionTransferHolder() / approveOptionTransferWriter() followed by transferOptionHolder() / transferOptionWriter(), and once with a sell order signed off-chain and settled by fillSellOrder(). Reports the transactions, the average gas and the wall-clock time per sale, including the time taken to sign.
+
+On the development chain every transaction is mined as soon as it is received. On a network with real block times the handshake waits for two confirmations per sale and a signed order for one.
+
+Usage:
+
+    brownie run scripts/benchmark_orders.py main 50
+"""
+
+import time
+
+from brownie import accounts, chain, CayugaCoin, OptionsDEX
+from scripts.orders import OrderBook
+
+PREMIUM = 10 ** 15
+STRIKE_PRICE = 10 ** 16
+PRICE = 10 ** 15
+
+
+def setup(count):
+    """
+    Function that deploys OptionsDEX and CayugaCoin, and returns them with two sellers with private keys holding and writing count options each
+    """
+    token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+    dex = accounts[0].deploy(OptionsDEX, False)
+    dex.registerAsset(token.address, {"from": accounts[0]})
+    sellers = [accounts.add(), accounts.add()]
+    # The sellers pay premiums and gas, the second seller and writer B (the buyer of writer sides) need collateral
+    for account in sellers:
+        accounts[0].transfer(account, 10 ** 20)
+    for account in sellers[1:] + [accounts[3]]:
+        token.transfer(account, 2 * count * 10 ** 20, {"from": accounts[0]})
+    for account in sellers[1:] + [accounts[0], accounts[3]]:
+        token.approve(dex.address, 2 ** 256 - 1, {"from": account})
+    return dex, token, sellers
+
+
+def create(dex, token, writer, holder, count):
+    """
+    Function that creates count options written by writer and bought by holder, and returns their hashes
+    """
+    expiration = chain.height + 10 ** 6
+    tx = dex.createOptions([token.address] * count, [PREMIUM] * count, [STRIKE_PRICE] * count, [expiration] * count, {"from": writer})
+    hashes = [event["optionHash"] for event in tx.events["OptionCreated"]]
+    for option_hash in hashes:
+        dex.buyOption(option_hash, {"from": holder, "value": PREMIUM * 100})
+    return hashes
+
+
+def handshake(dex, hashes, seller, buyer, is_writer):
+    """
+    Function that sells one side of every option with the approve/transfer handshake and returns the gas used and the seconds taken
+    """
+    approve = dex.approveOptionTransferWriter if is_writer else dex.approveOptionTransferHolder
+    transfer = dex.transferOptionWriter if is_writer else dex.transferOptionHolder
+    gas = 0
+    start = time.perf_counter()
+    for option_hash in hashes:
+        gas += approve(option_hash, buyer, PRICE, {"from": seller}).gas_used
+        gas += transfer(option_hash, {"from": buyer, "value": PRICE}).gas_used
+    return gas, time.perf_counter() - start
+
+
+def signed_orders(dex, hashes, seller, buyer, is_writer):
+    """
+    Function that sells one side of every option with signed sell orders and returns the gas used and the seconds taken
+    """
+    book = OrderBook(dex)
+    gas = 0
+    start = time.perf_counter()
+    for option_hash in hashes:
+        signed = book.sign(seller, option_hash, is_writer, PRICE, chain.height + 100, taker=buyer)
+        gas += book.fill(signed, buyer).gas_used
+    return gas, time.perf_counter() - start
+
+
+def main(count=50):
+    count = int(count)
+    dex, token, sellers = setup(count)
+    holder_seller, writer_seller = sellers
+    rows = []
+    for is_writer, seller, buyer in ((False, holder_seller, accounts[2]), (True, writer_seller, accounts[3])):
+        side = "writer" if is_writer else "holder"
+        # Options in which the seller owns the side being sold
+        writer, holder = (seller, accounts[1]) if is_writer else (accounts[0], seller)
+        gas, seconds = handshake(dex, create(dex, token, writer, holder, count), seller, buyer, is_writer)
+        rows.append(("{} handshake".format(side), 2, gas / count, seconds / count))
+        gas, seconds = signed_orders(dex, create(dex, token, writer, holder, count), seller, buyer, is_writer)
+        rows.append(("{} signed order".format(side), 1, gas / count, seconds / count))
+
+    print("{} sales per row".format(count))
+    print("{:<24}{:>8}{:>12}{:>12}".format("", "txs", "gas", "ms"))
+    for name, txs, gas, seconds in rows:
+        print("{:<24}{:>8}{:>12.0f}{:>12.1f}".format(name, txs, gas, 1000 * seconds))
@@ -0,0 +1,64 @@
+"""
+Benchmark of the vectorized pricing engine in scripts/pricing.py
+
+Builds synthetic books of 10,000 and 100,000 options on 20 assets with random strike prices and block expirations, and prices every book with PricingEngine.price() and with a Python loop over math.erf. Reports the wall-clock time of both and the largest difference between their premiums relative to the strike price. No chain is needed.
+
+Usage:
+
+    brownie run scripts/benchmark_pricing.py main 10000 100000
+"""
+
+import math
+import random
+import time
+
+from scripts.pricing import SECONDS_PER_YEAR, ZERO_ADDRESS, OptionBook, PricingEngine
+
+ASSETS = ["0x{:040x}".format(i + 1) for i in range(20)]
+HEIGHT = 1000
+
+
+def build_book(engine, size, seed=0):
+    """
+    Function that caches the market inputs of ASSETS in engine and returns a synthetic book of size options on them
+    """
+    rng = random.Random(seed)
+    for asset in ASSETS:
+        engine.set_market(asset, spot=rng.uniform(0.5, 5) * 10 ** 18, volatility=rng.uniform(0.3, 1.5))
+    assets = [rng.choice(ASSETS) for _ in range(size)]
+    strikes = [int(engine.markets[asset][0] * rng.uniform(0.5, 1.5)) for asset in assets]
+    expirations = [HEIGHT + rng.randrange(1, 2 * 10 ** 7) for _ in range(size)]
+    return OptionBook(["0x{:064x}".format(i) for i in range(size)], assets, strikes, [10 ** 17] * size, expirations, [ZERO_ADDRESS] * size)
+
+
+def price_loop(engine, book):
+    """
+    Function that prices a book option by option with the math module and returns the premiums
+    """
+    premiums = []
+    for i in range(len(book)):
+        spot, sigma = engine.markets[book.assets[book.asset_index[i]]]
+        strike = book.strike_wei[i]
+        years = max(book.block_expiration_numbers[i] - HEIGHT, 0) * engine.block_time / SECONDS_PER_YEAR
+        d1 = (math.log(spot / strike) + (engine.rate + 0.5 * sigma * sigma) * years) / (sigma * math.sqrt(years))
+        d2 = d1 - sigma * math.sqrt(years)
+        cdf1 = 0.5 * (1 + math.erf(d1 / math.sqrt(2)))
+        cdf2 = 0.5 * (1 + math.erf(d2 / math.sqrt(2)))
+        premiums.append(spot * cdf1 - strike * math.exp(-engine.rate * years) * cdf2)
+    return premiums
+
+
+def main(*sizes):
+    sizes = [int(size) for size in sizes] or [10000, 100000]
+    engine = PricingEngine(block_time=2.0)
+    print("{:>10}{:>14}{:>14}{:>10}{:>16}".format("options", "vectorized ms", "loop ms", "speedup", "max diff/strike"))
+    for size in sizes:
+        book = build_book(engine, size)
+        start = time.perf_counter()
+        premiums = engine.price(book, HEIGHT)["premium"]
+        vectorized = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = price_loop(engine, book)
+        loop = time.perf_counter() - start
+        diff = max(abs(p - e) / k for p, e, k in zip(premiums, expected, book.strike_wei))
+        print("{:>10}{:>14.1f}{:>14.1f}{:>9.1f}x{:>16.2e}".format(size, 1000 * vectorized, 1000 * loop, loop / vectorized, diff))
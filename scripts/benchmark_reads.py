@@ -0,0 +1,60 @@
+"""
+Benchmark of reading a book of options from OptionsDEX
+
+Creates a book of options on the local development chain and refreshes it twice: once with getOptionDetails(), viewHolderApproval() and viewWriterApproval() per option, and once with OptionsDEXClient.get_option_details_batch(). Reports the number of RPC round trips and the wall-clock time of both.
+
+Usage:
+
+    brownie run scripts/benchmark_reads.py main 5000
+"""
+
+import time
+
+from brownie import accounts, CayugaCoin, OptionsDEX, chain
+from scripts.client import OptionsDEXClient
+
+# Options written per CayugaCoin deployment (100,000 minted tokens, 100 tokens per option)
+OPTIONS_PER_TOKEN = 1000
+
+
+def create_book(dex, size):
+    """
+    Function that creates size options written by accounts[0], spread over as many CayugaCoin deployments as needed, and returns their hashes
+    """
+    client = OptionsDEXClient(dex, accounts[0])
+    options = []
+    for start in range(0, size, OPTIONS_PER_TOKEN):
+        token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+        dex.registerAsset(token.address, {"from": accounts[0]})
+        token.approve(dex.address, 2 ** 256 - 1, {"from": accounts[0]})
+        count = min(OPTIONS_PER_TOKEN, size - start)
+        options += [(token.address, 10 ** 17, (i + 1) * 10 ** 15, chain.height + 10 ** 6) for i in range(count)]
+    return client.create_options(options)
+
+
+def main(size=5000):
+    size = int(size)
+    dex = accounts[0].deploy(OptionsDEX, False)
+    hashes = create_book(dex, size)
+    client = OptionsDEXClient(dex, accounts[0])
+
+    # Refresh the book with one call per option and view
+    start = time.perf_counter()
+    for option_hash in hashes:
+        dex.getOptionDetails(option_hash)
+        dex.viewHolderApproval(option_hash)
+        dex.viewWriterApproval(option_hash)
+    single = time.perf_counter() - start
+
+    # Refresh the book with batched calls
+    gas_cap = chain.block_gas_limit
+    start = time.perf_counter()
+    details = client.get_option_details_batch(hashes, gas_cap)
+    batched = time.perf_counter() - start
+    assert len(details) == size
+
+    calls = -(-size // client.batch_read_size(gas_cap))
+    print("{} options".format(size))
+    print("{:<24}{:>12}{:>12}".format("", "round trips", "seconds"))
+    print("{:<24}{:>12}{:>12.2f}".format("per option", 3 * size, single))
+    print("{:<24}{:>12}{:>12.2f}".format("getOptionDetailsBatch", calls, batched))
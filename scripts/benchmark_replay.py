@@ -0,0 +1,76 @@
+"""
+Benchmark of rebuilding the state of OptionsDEX from its logs
+
+Builds a synthetic stream of raw logs in which options go through the lifecycles of OptionsDEX (creation, purchase, approvals, transfers of both sides, exercise or refund), then decodes and folds it with OptionsState and reports the events replayed per second and the options left open. No chain is needed, so the benchmark measures the decoder alone.
+
+Usage:
+
+    brownie run scripts/benchmark_replay.py main 100000
+"""
+
+import random
+import time
+
+from eth_utils import keccak, to_hex
+from scripts.events import OptionsState, encode_log
+
+PREMIUM = 10 ** 17
+STRIKE_PRICE = 2 * 10 ** 18
+
+
+def _address(seed):
+    """
+    Function that returns a synthetic address derived from seed
+    """
+    return to_hex(keccak(text="account {}".format(seed))[12:])
+
+
+def build_logs(count, seed=0):
+    """
+    Function that returns at least count raw logs of synthetic option lifecycles in chain order
+    """
+    rng = random.Random(seed)
+    accounts = [_address(i) for i in range(100)]
+    asset = _address("asset")
+    logs = []
+    block = 0
+
+    def emit(name, **fields):
+        logs.append(encode_log(name, block, len(logs), **fields))
+
+    n = 0
+    while len(logs) < count:
+        block += 1
+        option_hash = to_hex(keccak(text="option {}".format(n)))
+        n += 1
+        writer, holder, new_holder, new_writer = rng.sample(accounts, 4)
+        emit("OptionCreated", seller=writer, optionHash=option_hash, asset=asset, strikePrice=STRIKE_PRICE, premium=PREMIUM, blockExpiration=block + 1000, quantity=100)
+        # A third of the options is never bought and refunded
+        if rng.random() < 1 / 3:
+            emit("OptionRefunded", optionHash=option_hash, writer=writer)
+            continue
+        emit("OptionExchanged", optionHash=option_hash, holder=holder, price=PREMIUM * 100)
+        if rng.random() < 0.5:
+            emit("HolderTransferApproved", optionHash=option_hash, approvedHolder=new_holder, price=10 ** 18)
+            emit("HolderTransferred", optionHash=option_hash, **{"from": holder, "to": new_holder, "price": 10 ** 18})
+            holder = new_holder
+        if rng.random() < 0.5:
+            emit("WriterTransferApproved", optionHash=option_hash, approvedWriter=new_writer, price=10 ** 18)
+            emit("WriterTransferred", optionHash=option_hash, **{"from": writer, "to": new_writer, "price": 10 ** 18})
+            writer = new_writer
+        # Half of the bought options is exercised, the rest stays open
+        if rng.random() < 0.5:
+            emit("OptionExercised", optionHash=option_hash, holder=holder, writer=writer, strikePayment=STRIKE_PRICE * 100, quantity=100)
+    return logs
+
+
+def main(count=100000):
+    count = int(count)
+    logs = build_logs(count)
+    state = OptionsState()
+    start = time.perf_counter()
+    state.replay(logs)
+    seconds = time.perf_counter() - start
+
+    print("{} events replayed in {:.2f}s ({:.0f} events/s, {:.1f} us/event)".format(state.events, seconds, state.events / seconds, 1e6 * seconds / state.events))
+    print("{} options open after replay".format(len(state.options)))
@@ -0,0 +1,70 @@
+"""
+Benchmark of transaction throughput through OptionsDEXClient
+
+Sends a number of createOption(), buyOption() and exerciseOption() transactions on the local development chain, first one blocking call at a time and then through a TransactionPipeline, and reports the transactions per second submitted and confirmed for both.
+
+On the development chain every transaction is mined as soon as it is received, so the pipeline mostly saves the round trips of waiting for receipts. On a network with real block times the difference is much larger.
+
+Usage:
+
+    brownie run scripts/benchmark_throughput.py main 200
+"""
+
+import time
+
+from brownie import accounts, chain, CayugaCoin, OptionsDEX
+from scripts.client import OptionsDEXClient, TransactionPipeline
+
+PREMIUM = 10 ** 15
+STRIKE_PRICE = 10 ** 16
+
+
+def blocking(dex, token, count):
+    """
+    Function that creates, buys and exercises count options with one blocking call at a time and returns the seconds taken
+    """
+    start = time.perf_counter()
+    expiration = chain.height + 10 ** 6
+    for _ in range(count):
+        tx = dex.createOption(token.address, PREMIUM, STRIKE_PRICE, expiration, {"from": accounts[0]})
+        option_hash = tx.events["OptionCreated"]["optionHash"]
+        dex.buyOption(option_hash, {"from": accounts[1], "value": PREMIUM * 100})
+        dex.exerciseOption(option_hash, {"from": accounts[1], "value": STRIKE_PRICE * 100})
+    return time.perf_counter() - start
+
+
+def pipelined(dex, token, count):
+    """
+    Function that creates, buys and exercises count options through a TransactionPipeline and returns the seconds taken to submit and to confirm every transaction
+    """
+    pipeline = TransactionPipeline()
+    writer = OptionsDEXClient(dex, accounts[0], pipeline)
+    holder = OptionsDEXClient(dex, accounts[1], pipeline)
+    start = time.perf_counter()
+    expiration = chain.height + 10 ** 6
+    # Option hashes are computed before sending, so no phase waits for the previous one. The buy and the exercise of an option are sent by the same account, so the nonces of holder keep them in order
+    futures = []
+    for _ in range(count):
+        option_hash, future = writer.submit_create_option(token.address, PREMIUM, STRIKE_PRICE, expiration)
+        futures += [future, holder.submit_buy_option(option_hash, PREMIUM), holder.submit_exercise_option(option_hash, STRIKE_PRICE)]
+    submitted = time.perf_counter() - start
+    [f.result() for f in futures]
+    confirmed = time.perf_counter() - start
+    pipeline.shutdown()
+    return submitted, confirmed
+
+
+def main(count=200):
+    count = int(count)
+    token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+    dex = accounts[0].deploy(OptionsDEX, False)
+    dex.registerAsset(token.address, {"from": accounts[0]})
+    token.approve(dex.address, 2 ** 256 - 1, {"from": accounts[0]})
+
+    txs = 3 * count
+    seconds = blocking(dex, token, count)
+    submitted, confirmed = pipelined(dex, token, count)
+    print("{} transactions".format(txs))
+    print("{:<12}{:>16}{:>16}".format("", "submitted tx/s", "confirmed tx/s"))
+    print("{:<12}{:>16.1f}{:>16.1f}".format("blocking", txs / seconds, txs / seconds))
+    print("{:<12}{:>16.1f}{:>16.1f}".format("pipelined", txs / submitted, txs / confirmed))
@@ -0,0 +1,219 @@
+"""
+Client-side read cache of the options and assets of OptionsDEX
+
+OptionsCache answers getOptionDetails(), viewHolderApproval(), viewWriterApproval(), getOptionDetailsBatch() and isApprovedAsset() from memory. It keeps the OptionDetails of at most max_size options with least recently used eviction, and reads every missing option of a query with a single OptionsDEXClient.get_option_details_batch() call.
+
+Entries have no time to live. They are invalidated by the chain instead:
+
+- sync() reads the logs of OptionsDEX since the last synced block and evicts every option named by an event (created, bought, approved, transferred, split, exercised or refunded), so an entry stays cached for as long as the option does not change
+- options are evicted once the synced block passes their block expiration, to free the memory of options that mostly wait for their refund. OptionsDEX does not check the expiration in buyOption() or exerciseOption(), so expired options can still change, and eviction is only safe because every change emits an event that sync() invalidates: an evicted option is read again from the chain on its next lookup, and a cached one is never served past the event that changed it
+- registered assets stay cached for good, since assets cannot be unregistered, and unregistered ones until their AssetRegistered event
+- if the last synced block was reorganised away, every entry is dropped
+
+Reads made between two calls of sync() can return details up to one sync interval old, so sync() is called once per block, e.g. from the loop that polls for new blocks. hits, misses, evictions, invalidations and calls count the work of the cache, see stats().
+
+Usage:
+
+    cache = OptionsCache(OptionsDEXClient(OptionsDEX[-1], account), max_size=50000)
+    cache.sync()
+    cache.get_option_details(option_hash)
+
+    brownie run scripts/benchmark_cache.py main 2000 20000
+"""
+
+import heapq
+import threading
+from collections import OrderedDict
+
+from brownie import web3
+from eth_utils import to_hex
+from scripts.events import APPROVED_HOLDER, APPROVED_WRITER, BLOCK_EXPIRATION, EVENTS, TOPIC_OF, decode_log
+
+# Topics of the events that change an option or register an asset
+INVALIDATING_TOPICS = [to_hex(TOPIC_OF[name]) for name in EVENTS if name != "OrderCancelled"]
+
+
+class OptionsCache:
+    """
+    Class that caches the OptionDetails of options and the registration of assets of a deployed OptionsDEX contract, invalidated by its events and by block expirations
+    """
+
+    def __init__(self, client, max_size=10000, chunk_size=2000, gas_cap=None):
+        """
+        Parameters:
+            client: the OptionsDEXClient of the deployed OptionsDEX, used for batched reads on misses
+            max_size: the maximum number of options cached
+            chunk_size: the maximum number of blocks requested per eth_getLogs call
+            gas_cap: the maximum gas of an eth_call, defaults to the gas limit of the latest block
+        """
+        self.client = client
+        self.dex = client.dex
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.gas_cap = gas_cap
+        # Option hash to OptionDetails tuple, the least recently used first
+        self.options = OrderedDict()
+        # Min-heap of (block expiration, option hash) of cached options
+        self._expirations = []
+        # Asset address (lowercased) to whether it is registered
+        self.assets = {}
+        # Last synced block and its hash, None before the first sync
+        self.block = None
+        self._block_hash = None
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.calls = 0
+        self._lock = threading.RLock()
+
+    def sync(self, to_block=None):
+        """
+        Function that applies the events of OptionsDEX between the last synced block and to_block (the chain head by default) to the cache and evicts the options that expired, and returns the number of entries invalidated. The first sync drops the entries read before it, since the events that changed them are unknown.
+        """
+        if to_block is None:
+            to_block = web3.eth.block_number
+        with self._lock:
+            invalidated = 0
+            if self.block is None or to_hex(web3.eth.get_block(self.block)["hash"]) != self._block_hash:
+                # First sync, or the last synced block is no longer part of the chain
+                self.clear()
+            else:
+                start = self.block + 1
+                while start <= to_block:
+                    end = min(start + self.chunk_size - 1, to_block)
+                    logs = web3.eth.get_logs({"address": self.dex.address, "fromBlock": start, "toBlock": end, "topics": [INVALIDATING_TOPICS]})
+                    for log in logs:
+                        invalidated += self._invalidate(decode_log(log))
+                    start = end + 1
+            invalidated += self._expire(to_block)
+            self.invalidations += invalidated
+            self.block = to_block
+            self._block_hash = to_hex(web3.eth.get_block(to_block)["hash"])
+        return invalidated
+
+    def _invalidate(self, event):
+        """
+        Function that evicts the entries named by a decoded event and returns how many were cached
+        """
+        if event["event"] == "AssetRegistered":
+            self.assets[event["asset"]] = True
+            return 0
+        count = 0
+        for field in ("optionHash", "newOptionHash"):
+            if field in event and self.options.pop(event[field], None) is not None:
+                count += 1
+        return count
+
+    def _expire(self, height):
+        """
+        Function that evicts the cached options whose block expiration is at most height and returns how many were evicted. Expired options can still be bought and exercised, which sync() picks up from their events, so this only bounds the memory held by options waiting for their refund
+        """
+        count = 0
+        while self._expirations and self._expirations[0][0] <= height:
+            expiration, option_hash = heapq.heappop(self._expirations)
+            # Entries evicted or fetched again since they were pushed are skipped
+            details = self.options.get(option_hash)
+            if details is not None and details[BLOCK_EXPIRATION] == expiration:
+                del self.options[option_hash]
+                count += 1
+        return count
+
+    def clear(self):
+        """
+        Function that drops every entry of the cache, keeping its metrics
+        """
+        with self._lock:
+            self.options.clear()
+            self._expirations = []
+            self.assets.clear()
+
+    def get_option_details_batch(self, hashes):
+        """
+        Function that returns the OptionDetails of many options in the order of hashes, reading every option that is not cached with batched getOptionDetailsBatch() calls
+        """
+        with self._lock:
+            hashes = [to_hex(h) if isinstance(h, bytes) else str(h).lower() for h in hashes]
+            result = {}
+            missing = []
+            for option_hash in hashes:
+                if option_hash in self.options:
+                    self.options.move_to_end(option_hash)
+                    result[option_hash] = self.options[option_hash]
+                    self.hits += 1
+                elif option_hash not in result:
+                    # Lookups of the same missing hash in one query count as one miss
+                    result[option_hash] = None
+                    missing.append(option_hash)
+            self.misses += len(missing)
+            if missing:
+                self.calls += 1
+                fetched = self.client.get_option_details_batch(missing, self.gas_cap)
+                for option_hash, details in zip(missing, fetched):
+                    result[option_hash] = tuple(details)
+                    self._store(option_hash, result[option_hash])
+        return [result[option_hash] for option_hash in hashes]
+
+    def _store(self, option_hash, details):
+        """
+        Function that caches the OptionDetails of an option, evicting the least recently used options beyond max_size
+        """
+        self.options[option_hash] = details
+        if details[BLOCK_EXPIRATION] != 0:
+            heapq.heappush(self._expirations, (details[BLOCK_EXPIRATION], option_hash))
+        while len(self.options) > self.max_size:
+            self.options.popitem(last=False)
+            self.evictions += 1
+        # Drop heap entries of evicted options once the heap outgrows the cache
+        if len(self._expirations) > 2 * self.max_size:
+            self._expirations = [(e, h) for e, h in self._expirations if h in self.options]
+            heapq.heapify(self._expirations)
+
+    def get_option_details(self, option_hash):
+        """
+        Function that returns the fields of getOptionDetails() of an option
+        """
+        return self.get_option_details_batch([option_hash])[0][:8]
+
+    def view_holder_approval(self, option_hash):
+        """
+        Function that returns the approved next holder of an option, as viewHolderApproval()
+        """
+        return self.get_option_details_batch([option_hash])[0][APPROVED_HOLDER]
+
+    def view_writer_approval(self, option_hash):
+        """
+        Function that returns the approved next writer of an option, as viewWriterApproval()
+        """
+        return self.get_option_details_batch([option_hash])[0][APPROVED_WRITER]
+
+    def is_approved_asset(self, asset):
+        """
+        Function that returns whether an asset is registered, as isApprovedAsset()
+        """
+        asset = str(asset).lower()
+        with self._lock:
+            if asset in self.assets:
+                self.hits += 1
+                return self.assets[asset]
+            self.misses += 1
+            self.calls += 1
+            self.assets[asset] = self.dex.isApprovedAsset(asset)
+            return self.assets[asset]
+
+    def stats(self):
+        """
+        Function that returns the metrics of the cache as a dictionary
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.options),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "calls": self.calls,
+            "block": self.block,
+        }
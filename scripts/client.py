@@ -0,0 +1,287 @@
+"""
+Python client for the smart contract OptionsDEX
+
+OptionsDEXClient wraps a deployed OptionsDEX contract and the account that trades through it, and groups the calls that are made in bulk by market makers and services.
+
+TransactionPipeline sends transactions without waiting for the previous ones to be mined. It hands out nonces locally per account, awaits confirmations concurrently in a thread pool, caps the number of transactions in flight and replaces transactions that stay unmined with the same transaction at the same nonce and a higher gas price. The submit_* methods of OptionsDEXClient send through a pipeline and return futures of the mined transactions.
+
+option_hash(), from scripts/hashes.py, computes the hash OptionsDEX gives an option from its parameters, its writer and the nonce of the writer (see getNonce()). OptionsDEXClient uses it to know the hash of an option before createOption() is mined, so that transactions acting on the option can be sent right after it.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from scripts.hashes import option_hash
+
+# Tokens covered by options created without a quantity, and units of an asset per token (18 decimals)
+DEFAULT_QUANTITY = 100
+TOKEN_UNIT = 10 ** 18
+# Collateral locked by every option created without a quantity (100 tokens with 18 decimals)
+OPTION_COLLATERAL = DEFAULT_QUANTITY * TOKEN_UNIT
+
+# Estimated gas of getOptionDetailsBatch() per option (cold storage reads) and per call
+GAS_PER_OPTION_READ = 16000
+GAS_PER_BATCH_CALL = 50000
+# Words of memory used per option by getOptionDetailsBatch() (result struct, array slot and return data)
+WORDS_PER_OPTION_READ = 22
+
+# Gas limits of pipelined transactions. Gas cannot be estimated for a transaction that depends on one that is not mined yet
+CREATE_GAS_LIMIT = 250000
+BUY_GAS_LIMIT = 120000
+EXERCISE_GAS_LIMIT = 150000
+# Factor by which the gas price of a stuck transaction is raised to replace it, nodes require at least 10%
+GAS_PRICE_BUMP = 1.125
+
+
+class NonceManager:
+    """
+    Class that hands out consecutive nonces per account without asking the node for every transaction
+    """
+
+    def __init__(self):
+        # Address to next nonce
+        self._nonces = {}
+        self._lock = threading.Lock()
+
+    def next(self, account):
+        """
+        Function that returns the next nonce of account, reading the transaction count of the account from the node the first time
+        """
+        with self._lock:
+            nonce = self._nonces.get(account.address)
+            if nonce is None:
+                nonce = web3.eth.get_transaction_count(account.address, "pending")
+            self._nonces[account.address] = nonce + 1
+            return nonce
+
+    def reset(self, account):
+        """
+        Function that forgets the local nonce of account, so that the next one is read from the node again. Used after a transaction failed to be sent.
+        """
+        with self._lock:
+            self._nonces.pop(account.address, None)
+
+
+class TransactionPipeline:
+    """
+    Class that sends contract transactions without waiting between them and awaits their confirmations concurrently
+    """
+
+    def __init__(self, max_in_flight=64, workers=16, timeout=120, retries=3, gas_price_bump=GAS_PRICE_BUMP):
+        """
+        Parameters:
+            max_in_flight: the maximum number of sent transactions that are not confirmed yet, submit() blocks once it is reached
+            workers: the number of threads awaiting confirmations
+            timeout: the number of seconds a transaction may stay unmined before it is considered stuck
+            retries: the number of times a stuck transaction is replaced
+            gas_price_bump: the factor by which the gas price of a stuck transaction is raised to replace it, at least the 10% nodes require
+        """
+        self.nonces = NonceManager()
+        self.timeout = timeout
+        self.retries = retries
+        self.gas_price_bump = gas_price_bump
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._pool = ThreadPoolExecutor(workers)
+
+    def submit(self, fn, *args, account, gas_limit, value=0):
+        """
+        Function that sends the contract transaction fn(*args) from account with the next local nonce of account and returns a future of the mined transaction
+        """
+        self._slots.acquire()
+        try:
+            params = {"from": account, "value": value, "gas_limit": gas_limit, "nonce": self.nonces.next(account), "required_confs": 0, "allow_revert": True}
+            tx = fn(*args, params)
+        except Exception:
+            # The nonce was not used, so it must be read from the node again
+            self.nonces.reset(account)
+            self._slots.release()
+            raise
+        return self._pool.submit(self._confirm, tx, fn, args, params)
+
+    def _confirm(self, tx, fn, args, params):
+        """
+        Function that waits until tx is mined. Whenever it is not mined within the timeout, it is replaced by the same transaction with the same nonce and a gas price raised by gas_price_bump, since nodes drop a resend at the same price as already known. Returns whichever of the sent transactions was mined.
+        """
+        sent = [tx]
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    web3.eth.wait_for_transaction_receipt(sent[-1].txid, timeout=self.timeout)
+                    return sent[-1]
+                except TimeExhausted:
+                    # A transaction replaced before may have been mined in the meantime
+                    for previous in sent[:-1]:
+                        try:
+                            web3.eth.get_transaction_receipt(previous.txid)
+                            return previous
+                        except TransactionNotFound:
+                            pass
+                    if attempt == self.retries:
+                        raise
+                    params = self._bump_gas_price(params, sent[-1])
+                    try:
+                        sent.append(fn(*args, params))
+                    except ValueError:
+                        # The node rejected the replacement, e.g. because the nonce was used by a mined transaction, keep waiting
+                        pass
+        finally:
+            self._slots.release()
+
+    def _bump_gas_price(self, params, tx):
+        """
+        Function that returns a copy of the transaction parameters params, with the gas price (or the EIP-1559 fees) of the sent transaction tx raised by gas_price_bump
+        """
+        params = dict(params)
+        if getattr(tx, "max_fee", None):
+            params["max_fee"] = int(tx.max_fee * self.gas_price_bump) + 1
+            params["priority_fee"] = int(tx.priority_fee * self.gas_price_bump) + 1
+        else:
+            # The gas price of a transaction the node already dropped is unknown, so the current one is raised
+            params["gas_price"] = int((tx.gas_price or web3.eth.gas_price) * self.gas_price_bump) + 1
+        return params
+
+    def shutdown(self):
+        """
+        Function that waits for every submitted transaction to be confirmed and stops the worker threads
+        """
+        self._pool.shutdown(wait=True)
+
+
+class OptionsDEXClient:
+    """
+    Class that sends transactions to and reads from a deployed OptionsDEX contract on behalf of a single account
+    """
+
+    def __init__(self, dex, account, pipeline=None):
+        """
+        Parameters:
+            dex: the brownie contract object of the deployed OptionsDEX
+            account: the brownie account that signs transactions
+            pipeline: the TransactionPipeline used by the submit_* methods, clients of different accounts may share one
+        """
+        self.dex = dex
+        self.account = account
+        self.pipeline = pipeline or TransactionPipeline()
+        # Nonce of the next option written by the account, read from OptionsDEX on first use
+        self._option_nonce = None
+        self._lock = threading.RLock()
+
+    def next_option_hash(self, asset, premium, strike_price, block_expiration):
+        """
+        Function that reserves the next option nonce of the account and returns the hash the option with these parameters gets when the account creates it with that nonce.
+
+        Options must be created in the order their hashes were reserved. If a createOption() sent after reserving reverts, the reserved hashes are wrong and reset_option_nonce() must be called.
+        """
+        with self._lock:
+            if self._option_nonce is None:
+                self._option_nonce = self.dex.getNonce(self.account.address)
+            nonce = self._option_nonce
+            self._option_nonce += 1
+        return option_hash(asset, premium, strike_price, block_expiration, self.account.address, nonce)
+
+    def reset_option_nonce(self):
+        """
+        Function that forgets the local option nonce of the account, so that the next one is read from OptionsDEX again
+        """
+        with self._lock:
+            self._option_nonce = None
+
+    def submit_create_option(self, asset, premium, strike_price, block_expiration):
+        """
+        Function that sends createOption() through the pipeline and returns the hash of the option together with a future of the mined transaction.
+
+        The hash is computed before sending, so transactions acting on the option can be submitted without waiting for the future. Transactions of other accounts are not ordered by the pipeline, so they only succeed if the node includes them after the createOption() transaction, which nodes that mine in arrival order do.
+        """
+        # Reserve the hash and send under the same lock so that options are sent in the order of their nonces
+        with self._lock:
+            option_hash = self.next_option_hash(asset, premium, strike_price, block_expiration)
+            try:
+                future = self.pipeline.submit(self.dex.createOption, asset, premium, strike_price, block_expiration, account=self.account, gas_limit=CREATE_GAS_LIMIT)
+            except Exception:
+                self.reset_option_nonce()
+                raise
+        return option_hash, future
+
+    def submit_buy_option(self, option_hash, premium, quantity=DEFAULT_QUANTITY):
+        """
+        Function that sends buyOption() through the pipeline and returns a future of the mined transaction
+        Parameters:
+            option_hash: the hash of the option being bought
+            premium: the premium per token of the option, quantity times which is sent
+            quantity: the number of tokens covered by the option
+        """
+        return self.pipeline.submit(self.dex.buyOption, option_hash, account=self.account, gas_limit=BUY_GAS_LIMIT, value=premium * quantity)
+
+    def submit_exercise_option(self, option_hash, strike_price, quantity=DEFAULT_QUANTITY):
+        """
+        Function that sends exerciseOption() through the pipeline and returns a future of the mined transaction
+        Parameters:
+            option_hash: the hash of the option being exercised
+            strike_price: the strike price of the option, quantity times which is sent
+            quantity: the number of tokens covered by the option
+        """
+        return self.pipeline.submit(self.dex.exerciseOption, option_hash, account=self.account, gas_limit=EXERCISE_GAS_LIMIT, value=strike_price * quantity)
+
+    def create_options(self, options, batch_size=100):
+        """
+        Function that creates many options through createOptions() and returns their hashes in the order of options.
+
+        Options are sorted by asset before being sent, so that each transaction transfers the collateral of every asset once. Options are sent in transactions of at most batch_size options to stay below the block gas limit. The account must have approved OptionsDEX to spend OPTION_COLLATERAL tokens per option.
+
+        Parameters:
+            options: list of (asset, premium, strike price, block expiration) tuples
+            batch_size: the maximum number of options created per transaction
+        """
+        # Sort indices of options by asset, keeping the order of options on the same asset
+        order = sorted(range(len(options)), key=lambda i: str(options[i][0]).lower())
+        hashes = [None] * len(options)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            # Split options into one array per parameter
+            assets, premiums, strikes, expirations = zip(*(options[i] for i in batch))
+            tx = self.dex.createOptions(assets, premiums, strikes, expirations, {"from": self.account})
+            # OptionCreated events are emitted in the order of the arrays
+            for i, event in zip(batch, tx.events["OptionCreated"]):
+                hashes[i] = event["optionHash"]
+        return hashes
+
+    @staticmethod
+    def collateral_by_asset(options):
+        """
+        Function that returns a dictionary of asset to the amount of tokens that creating options locks in OptionsDEX
+        """
+        totals = {}
+        for asset, _, _, _ in options:
+            totals[asset] = totals.get(asset, 0) + OPTION_COLLATERAL
+        return totals
+
+    def get_option_details_batch(self, hashes, gas_cap=None):
+        """
+        Function that returns the details of many options as a list of OptionDetails tuples (the fields of getOptionDetails() followed by the approved next holder and writer and the quantity) in the order of hashes.
+
+        Hashes are split into as few getOptionDetailsBatch() calls as the gas cap of the node allows.
+
+        Parameters:
+            hashes: the hashes of the options being queried
+            gas_cap: the maximum gas of an eth_call, defaults to the gas limit of the latest block
+        """
+        if gas_cap is None:
+            gas_cap = web3.eth.get_block("latest")["gasLimit"]
+        size = self.batch_read_size(gas_cap)
+        details = []
+        for start in range(0, len(hashes), size):
+            details.extend(self.dex.getOptionDetailsBatch(hashes[start:start + size]))
+        return details
+
+    @staticmethod
+    def batch_read_size(gas_cap):
+        """
+        Function that returns the largest number of options a single getOptionDetailsBatch() call can read within gas_cap, accounting for the quadratic cost of memory
+        """
+        # Solve a * n^2 + b * n + c = 0 for the gas of n options
+        a = WORDS_PER_OPTION_READ ** 2 / 512
+        b = GAS_PER_OPTION_READ + 3 * WORDS_PER_OPTION_READ
+        c = GAS_PER_BATCH_CALL - gas_cap
+        return max(1, int(((b * b - 4 * a * c) ** 0.5 - b) / (2 * a)))
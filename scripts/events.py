@@ -0,0 +1,215 @@
+"""
+Decoder of the events emitted by OptionsDEX and fold of an event stream into the state of every open option
+
+Every state transition of an option emits an event that carries the fields it changes, so the state of OptionsDEX can be rebuilt from its logs alone, without calling getOptionDetails():
+
+OptionCreated = asset, strike price, writer, premium, block expiration and quantity of a new option
+OptionExchanged = first holder and the premium paid
+HolderTransferApproved / WriterTransferApproved = approved next holder (or writer) and its price
+HolderTransferred / WriterTransferred = previous and new holder (or writer) and the price paid, the approval is deleted
+OptionSplit = part of the holder position of an option moves into a new option, followed by the HolderTransferred event of the new option
+OptionExercised = tokens of the option are exercised, the option is deleted once none are left and otherwise loses its approved next holder and writer
+OptionRefunded = the option is deleted
+OrderCancelled = a sell order nonce of a seller is cancelled
+AssetRegistered = a new asset and its registry ID
+
+decode_log() decodes a raw log as returned by eth_getLogs without an ABI, encode_log() builds one (for tests and benchmarks), and OptionsState folds a stream of logs into a map of option hash to OptionDetails.
+
+Usage:
+
+    state = OptionsState()
+    state.replay(web3.eth.get_logs({"address": dex.address, "fromBlock": 0}))
+    state.details(option_hash)
+"""
+
+from eth_utils import keccak, to_bytes
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+# Event name to (indexed fields, data fields), every field being a (name, ABI type) pair, as declared in OptionsDEX
+EVENTS = {
+    "OptionCreated": (
+        (("seller", "address"), ("optionHash", "bytes32"), ("asset", "address")),
+        (("strikePrice", "uint96"), ("premium", "uint96"), ("blockExpiration", "uint96"), ("quantity", "uint64")),
+    ),
+    "OptionExchanged": ((("optionHash", "bytes32"), ("holder", "address")), (("price", "uint256"),)),
+    "HolderTransferApproved": ((("optionHash", "bytes32"), ("approvedHolder", "address")), (("price", "uint96"),)),
+    "WriterTransferApproved": ((("optionHash", "bytes32"), ("approvedWriter", "address")), (("price", "uint96"),)),
+    "HolderTransferred": ((("optionHash", "bytes32"), ("from", "address"), ("to", "address")), (("price", "uint256"),)),
+    "WriterTransferred": ((("optionHash", "bytes32"), ("from", "address"), ("to", "address")), (("price", "uint256"),)),
+    "OptionSplit": ((("optionHash", "bytes32"), ("newOptionHash", "bytes32")), (("quantity", "uint64"),)),
+    "OptionExercised": ((("optionHash", "bytes32"), ("holder", "address"), ("writer", "address")), (("strikePayment", "uint256"), ("quantity", "uint64"))),
+    "OptionRefunded": ((("optionHash", "bytes32"), ("writer", "address")), ()),
+    "OrderCancelled": ((("seller", "address"),), (("nonce", "uint256"),)),
+    "AssetRegistered": ((("asset", "address"),), (("assetId", "uint32"),)),
+}
+
+
+def _signature(name):
+    """
+    Function that returns the canonical signature of an event, such as "OptionRefunded(bytes32,address)"
+    """
+    indexed, data = EVENTS[name]
+    return "{}({})".format(name, ",".join(kind for _, kind in indexed + data))
+
+
+# Topic (as bytes) to event name
+TOPICS = {keccak(text=_signature(name)): name for name in EVENTS}
+# Event name to topic (as bytes)
+TOPIC_OF = {name: topic for topic, name in TOPICS.items()}
+
+# Positions of the fields of OptionDetails, see IOptionsDEX
+ASSET, STRIKE_PRICE, WRITER, PREMIUM, HOLDER, BLOCK_EXPIRATION, HOLDER_SELL_PRICE, WRITER_SELL_PRICE, APPROVED_HOLDER, APPROVED_WRITER, QUANTITY = range(11)
+# OptionDetails of an option that does not exist
+MISSING_DETAILS = (ZERO_ADDRESS, 0, ZERO_ADDRESS, 0, ZERO_ADDRESS, 0, 0, 0, ZERO_ADDRESS, ZERO_ADDRESS, 0)
+
+
+def _bytes(value):
+    """
+    Function that converts a topic or log data given as bytes (or HexBytes) or as a hex string to bytes
+    """
+    if isinstance(value, str):
+        return to_bytes(hexstr=value)
+    return bytes(value)
+
+
+def _decode_word(word, kind):
+    """
+    Function that decodes a 32 byte word of an ABI type. Addresses are returned lowercased and bytes32 as a hex string.
+    """
+    if kind == "address":
+        return "0x" + word[12:].hex()
+    if kind == "bytes32":
+        return "0x" + word.hex()
+    return int.from_bytes(word, "big")
+
+
+def _encode_word(value, kind):
+    """
+    Function that encodes a value of an ABI type as a 32 byte word
+    """
+    if kind in ("address", "bytes32"):
+        return _bytes(str(value)).rjust(32, b"\0")
+    return int(value).to_bytes(32, "big")
+
+
+def decode_log(log):
+    """
+    Function that decodes a log of OptionsDEX and returns a dictionary of its fields, together with the keys "event", "blockNumber" and "logIndex", or None if the log is not an event of OptionsDEX
+    Parameters:
+        log: a log with the keys "topics", "data" and optionally "blockNumber" and "logIndex", as returned by eth_getLogs
+    """
+    topics = log["topics"]
+    if not topics:
+        return None
+    name = TOPICS.get(_bytes(topics[0]))
+    if name is None:
+        return None
+    indexed, data = EVENTS[name]
+    event = {"event": name, "blockNumber": log.get("blockNumber"), "logIndex": log.get("logIndex")}
+    for (field, kind), topic in zip(indexed, topics[1:]):
+        event[field] = _decode_word(_bytes(topic), kind)
+    raw = _bytes(log["data"])
+    for i, (field, kind) in enumerate(data):
+        event[field] = _decode_word(raw[32 * i:32 * i + 32], kind)
+    return event
+
+
+def encode_log(name, block_number=0, log_index=0, **fields):
+    """
+    Function that encodes an event of OptionsDEX as a raw log, the inverse of decode_log()
+    Parameters:
+        name: the name of the event
+        block_number, log_index: the position of the log in the chain
+        fields: the value of every field of the event
+    """
+    indexed, data = EVENTS[name]
+    return {
+        "topics": [TOPIC_OF[name]] + [_encode_word(fields[field], kind) for field, kind in indexed],
+        "data": b"".join(_encode_word(fields[field], kind) for field, kind in data),
+        "blockNumber": block_number,
+        "logIndex": log_index,
+    }
+
+
+class OptionsState:
+    """
+    Class that folds decoded events of OptionsDEX into the state of its open options, cancelled sell orders and registered assets
+    """
+
+    def __init__(self):
+        # Option hash to OptionDetails as a list, with lowercased addresses
+        self.options = {}
+        # (seller, nonce) pairs of cancelled sell orders
+        self.cancelled_orders = set()
+        # Asset address to registry ID
+        self.assets = {}
+        # Number of events applied
+        self.events = 0
+
+    def apply(self, event):
+        """
+        Function that applies a decoded event to the state
+        """
+        name = event["event"]
+        self.events += 1
+        if name == "OptionCreated":
+            self.options[event["optionHash"]] = [
+                event["asset"], event["strikePrice"], event["seller"], event["premium"], ZERO_ADDRESS,
+                event["blockExpiration"], 0, 0, ZERO_ADDRESS, ZERO_ADDRESS, event["quantity"],
+            ]
+        elif name == "OptionExchanged":
+            self.options[event["optionHash"]][HOLDER] = event["holder"]
+        elif name == "HolderTransferApproved":
+            option = self.options[event["optionHash"]]
+            option[APPROVED_HOLDER], option[HOLDER_SELL_PRICE] = event["approvedHolder"], event["price"]
+        elif name == "WriterTransferApproved":
+            option = self.options[event["optionHash"]]
+            option[APPROVED_WRITER], option[WRITER_SELL_PRICE] = event["approvedWriter"], event["price"]
+        elif name == "HolderTransferred":
+            option = self.options[event["optionHash"]]
+            option[HOLDER], option[APPROVED_HOLDER], option[HOLDER_SELL_PRICE] = event["to"], ZERO_ADDRESS, 0
+        elif name == "WriterTransferred":
+            option = self.options[event["optionHash"]]
+            option[WRITER], option[APPROVED_WRITER], option[WRITER_SELL_PRICE] = event["to"], ZERO_ADDRESS, 0
+        elif name == "OptionSplit":
+            option = self.options[event["optionHash"]]
+            # The new option gets its holder from the HolderTransferred event that follows
+            split = list(option)
+            split[HOLDER_SELL_PRICE], split[WRITER_SELL_PRICE], split[APPROVED_HOLDER], split[APPROVED_WRITER] = 0, 0, ZERO_ADDRESS, ZERO_ADDRESS
+            split[QUANTITY] = event["quantity"]
+            self.options[event["newOptionHash"]] = split
+            option[QUANTITY] -= event["quantity"]
+            option[APPROVED_HOLDER], option[HOLDER_SELL_PRICE], option[APPROVED_WRITER], option[WRITER_SELL_PRICE] = ZERO_ADDRESS, 0, ZERO_ADDRESS, 0
+        elif name == "OptionExercised":
+            option = self.options[event["optionHash"]]
+            option[QUANTITY] -= event["quantity"]
+            if option[QUANTITY] == 0:
+                del self.options[event["optionHash"]]
+            else:
+                option[APPROVED_HOLDER], option[HOLDER_SELL_PRICE], option[APPROVED_WRITER], option[WRITER_SELL_PRICE] = ZERO_ADDRESS, 0, ZERO_ADDRESS, 0
+        elif name == "OptionRefunded":
+            del self.options[event["optionHash"]]
+        elif name == "OrderCancelled":
+            self.cancelled_orders.add((event["seller"], event["nonce"]))
+        elif name == "AssetRegistered":
+            self.assets[event["asset"]] = event["assetId"]
+
+    def replay(self, logs):
+        """
+        Function that decodes and applies raw logs in chain order, skipping logs that are not events of OptionsDEX, and returns the number of events applied
+        """
+        applied = 0
+        for log in logs:
+            event = decode_log(log)
+            if event is not None:
+                self.apply(event)
+                applied += 1
+        return applied
+
+    def details(self, option_hash):
+        """
+        Function that returns the OptionDetails of an option as a tuple, in the order of getOptionDetailsBatch(), with zeros for an option that does not exist
+        """
+        option = self.options.get(option_hash)
+        return tuple(option) if option is not None else MISSING_DETAILS
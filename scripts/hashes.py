@@ -0,0 +1,53 @@
+"""
+Hashes OptionsDEX gives its options, computed off-chain
+
+option_hash() computes the hash OptionsDEX gives an option from its parameters, its writer and the nonce of the writer (see getNonce()), and split_option_hash() the hash of the option split off an option by a partial sale (see _splitHolder()). They only depend on eth_hash, which eth_utils installs, so that they can be used without brownie or a connection to a node, e.g. by the reference model in scripts/simulator.py. scripts/client.py uses option_hash() to know the hash of an option before createOption() is mined.
+
+Both functions hash millions of options in backtests, so they call the keccak backend directly instead of eth_utils.keccak(), which validates its arguments on every call, and keep the ABI encoding of addresses once per address.
+
+Usage:
+
+    option_hash(token, 10 ** 17, 2 * 10 ** 18, 200, writer, nonce)
+"""
+
+from functools import lru_cache
+
+from eth_hash.auto import keccak
+
+# abi.encode() of the fields of a new option that are always 0
+ZERO_WORD = bytes(32)
+
+
+@lru_cache(maxsize=65536)
+def _address_word(address):
+    """
+    Function that returns the ABI encoding of an address, a 32 byte word
+    """
+    return int(str(address), 16).to_bytes(32, "big")
+
+
+def option_hash(asset, premium, strike_price, block_expiration, writer, nonce):
+    """
+    Function that returns the hash OptionsDEX gives an option, i.e. keccak256(abi.encode(asset, strikePrice, writer, premium, holder, blockExpiration, holderSellPrice, writerSellPrice, nonce, writer)) with the fields of a new option
+    Parameters:
+        asset: the address of the underlying asset
+        premium: the premium per token of the option
+        strike_price: the strike price of the option
+        block_expiration: the block expiration of the option
+        writer: the address of the account creating the option
+        nonce: the nonce of the writer when the option is created, see getNonce()
+    """
+    # Every field is a static type, so abi.encode() pads each to a 32 byte word
+    writer_word = _address_word(writer)
+    encoded = b"".join((
+        _address_word(asset), int(strike_price).to_bytes(32, "big"), writer_word, int(premium).to_bytes(32, "big"), ZERO_WORD,
+        int(block_expiration).to_bytes(32, "big"), ZERO_WORD, ZERO_WORD, int(nonce).to_bytes(32, "big"), writer_word,
+    ))
+    return "0x" + keccak(encoded).hex()
+
+
+def split_option_hash(option_hash, quantity):
+    """
+    Function that returns the hash of the option split off an option by a partial sale, i.e. keccak256(abi.encode(optionHash, quantity)) with the quantity of the option before the sale
+    """
+    return "0x" + keccak(bytes.fromhex(str(option_hash)[2:]) + int(quantity).to_bytes(32, "big")).hex()
@@ -0,0 +1,279 @@
+"""
+Incremental off-chain indexer for the state of the smart contract OptionsDEX
+
+OptionsDEX keeps its options in a private mapping, so the only way to list them is to follow its logs. OptionsIndexer reads the logs of a deployed OptionsDEX in chunks of blocks, decodes them with scripts/events.py and applies the fields they carry to a local SQLite database, without calling getOptionDetails(). Exercised and refunded options are deleted, partially exercised options keep their remaining quantity and options split by a partial sale of their holder position are added. The last indexed block is checkpointed, so a restarted indexer resumes where it stopped, and the hashes of recently indexed blocks are kept so that reorganisations of the chain are detected and rolled back: the options touched by the blocks reorganised away are read again at the last block that is still part of the chain, and the blocks after it are indexed again from their events.
+
+Queries such as "all unexpired options on asset X held by Y" are then answered by open_options() from the database instead of RPC calls.
+
+Usage:
+
+    indexer = OptionsIndexer(OptionsDEX[-1], "options.db")
+    indexer.sync()
+    indexer.open_options(asset=token, holder=account, unexpired_at=chain.height)
+"""
+
+import sqlite3
+
+from brownie import web3
+from eth_utils import to_hex
+from scripts.events import TOPIC_OF, decode_log
+
+# Topics of the events that change an option
+OPTION_TOPICS = [to_hex(TOPIC_OF[name]) for name in (
+    "OptionCreated", "OptionExchanged", "HolderTransferApproved", "WriterTransferApproved",
+    "HolderTransferred", "WriterTransferred", "OptionSplit", "OptionExercised", "OptionRefunded",
+)]
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+# Largest value stored in an INTEGER column of SQLite
+SQLITE_MAX_INTEGER = 2 ** 63 - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS options (
+    option_hash TEXT PRIMARY KEY,
+    asset TEXT NOT NULL,
+    strike_price TEXT NOT NULL,
+    writer TEXT NOT NULL,
+    premium TEXT NOT NULL,
+    holder TEXT NOT NULL,
+    block_expiration INTEGER NOT NULL,
+    holder_sell_price TEXT NOT NULL,
+    writer_sell_price TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    created_block INTEGER NOT NULL,
+    updated_block INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS options_asset ON options (asset);
+CREATE INDEX IF NOT EXISTS options_writer ON options (writer);
+CREATE INDEX IF NOT EXISTS options_holder ON options (holder);
+CREATE INDEX IF NOT EXISTS options_block_expiration ON options (block_expiration);
+CREATE TABLE IF NOT EXISTS blocks (
+    number INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS touches (
+    option_hash TEXT PRIMARY KEY,
+    block INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS touches_block ON touches (block);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    contract TEXT PRIMARY KEY,
+    block INTEGER NOT NULL
+);
+"""
+
+
+class OptionsIndexer:
+    """
+    Class that indexes the options of a deployed OptionsDEX contract into a SQLite database
+    """
+
+    def __init__(self, dex, path, from_block=0, chunk_size=2000, confirmations=0, reorg_depth=64):
+        """
+        Parameters:
+            dex: the brownie contract object of the deployed OptionsDEX
+            path: the path of the SQLite database (":memory:" for an in-memory database)
+            from_block: the first block indexed when the database has no checkpoint, usually the deployment block of dex
+            chunk_size: the maximum number of blocks requested per eth_getLogs call
+            confirmations: the number of blocks behind the chain head that are left unindexed
+            reorg_depth: the number of recent block hashes kept to detect reorganisations
+        """
+        self.dex = dex
+        self.address = dex.address
+        self.from_block = from_block
+        self.chunk_size = chunk_size
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        # Databases written before options had a quantity are indexed again from from_block
+        if "quantity" not in [column[1] for column in self.db.execute("PRAGMA table_info(options)")]:
+            self.db.executescript("DROP TABLE options; DROP TABLE blocks; DROP TABLE checkpoint;" + SCHEMA)
+
+    def checkpoint(self):
+        """
+        Function that returns the last indexed block, or from_block - 1 if nothing was indexed yet
+        """
+        row = self.db.execute("SELECT block FROM checkpoint WHERE contract = ?", (self.address,)).fetchone()
+        return row[0] if row else self.from_block - 1
+
+    def sync(self):
+        """
+        Function that indexes every block between the checkpoint and the chain head (minus confirmations), rolling back first if the chain was reorganised. Returns the number of options whose details were updated.
+        """
+        self._handle_reorg()
+        head = web3.eth.block_number - self.confirmations
+        updated = 0
+        start = self.checkpoint() + 1
+        while start <= head:
+            end = min(start + self.chunk_size - 1, head)
+            updated += self._index_range(start, end)
+            start = end + 1
+        return updated
+
+    def refresh(self, hashes=None):
+        """
+        Function that reads the details of options from the chain again and returns the number of options refreshed. By default every indexed option that has not expired is refreshed.
+
+        Every change of an option is picked up by sync() from the events of OptionsDEX, so refresh() is only needed to repair a database, e.g. one written by an older version of the indexer.
+        """
+        if hashes is None:
+            height = web3.eth.block_number
+            hashes = [row[0] for row in self.db.execute("SELECT option_hash FROM options WHERE block_expiration >= ?", (height,))]
+        block = web3.eth.block_number
+        with self.db:
+            for option_hash in hashes:
+                self._store(option_hash, block)
+        return len(hashes)
+
+    def open_options(self, asset=None, writer=None, holder=None, unexpired_at=None):
+        """
+        Function that returns the indexed options matching every given filter as a list of dictionaries
+        Parameters:
+            asset: the address of the underlying asset
+            writer: the address of the option writer
+            holder: the address of the option holder (the zero address for options that were not bought)
+            unexpired_at: a block number, only options expiring at or after this block are returned
+        """
+        clauses, params = [], []
+        for column, value in (("asset", asset), ("writer", writer), ("holder", holder)):
+            if value is not None:
+                clauses.append("{} = ?".format(column))
+                params.append(str(value).lower())
+        if unexpired_at is not None:
+            clauses.append("block_expiration >= ?")
+            params.append(unexpired_at)
+        query = "SELECT * FROM options"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        cursor = self.db.execute(query + " ORDER BY block_expiration", params)
+        columns = [column[0] for column in cursor.description]
+        return [self._decode(dict(zip(columns, row))) for row in cursor]
+
+    def _index_range(self, start, end):
+        """
+        Function that indexes the logs of blocks start to end (inclusive) and moves the checkpoint to end
+        """
+        logs = web3.eth.get_logs({
+            "address": self.address,
+            "fromBlock": start,
+            "toBlock": end,
+            "topics": [OPTION_TOPICS],
+        })
+        # Latest block of every option touched by the logs
+        touched = {}
+        with self.db:
+            for log in logs:
+                event = decode_log(log)
+                self._apply(event)
+                touched[event["optionHash"]] = event["blockNumber"]
+                # Options split off are touched as well
+                if "newOptionHash" in event:
+                    touched[event["newOptionHash"]] = event["blockNumber"]
+            # Remember block hashes to detect reorganisations, and the options they touched to roll them back, deleted ones included
+            self.db.executemany("INSERT OR REPLACE INTO touches (option_hash, block) VALUES (?, ?)", touched.items())
+            for block in set(touched.values()) | {end}:
+                self.db.execute("INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)", (block, to_hex(web3.eth.get_block(block)["hash"])))
+            self.db.execute("DELETE FROM blocks WHERE number < ?", (end - self.reorg_depth,))
+            self.db.execute("DELETE FROM touches WHERE block < ?", (end - self.reorg_depth,))
+            self.db.execute("INSERT OR REPLACE INTO checkpoint (contract, block) VALUES (?, ?)", (self.address, end))
+        return len(touched)
+
+    def _apply(self, event):
+        """
+        Function that applies a decoded event of OptionsDEX to the database
+        """
+        option_hash, block, name = event["optionHash"], event["blockNumber"], event["event"]
+        if name == "OptionCreated":
+            self.db.execute(
+                "INSERT OR REPLACE INTO options VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (option_hash, event["asset"], str(event["strikePrice"]), event["seller"], str(event["premium"]), ZERO_ADDRESS,
+                 min(event["blockExpiration"], SQLITE_MAX_INTEGER), "0", "0", event["quantity"], block, block),
+            )
+        elif name == "OptionSplit":
+            # Copy the option with the sold quantity, the HolderTransferred event that follows sets its holder
+            self.db.execute(
+                "INSERT OR REPLACE INTO options SELECT ?, asset, strike_price, writer, premium, holder, block_expiration, '0', '0', ?, ?, ? "
+                "FROM options WHERE option_hash = ?",
+                (event["newOptionHash"], event["quantity"], block, block, option_hash),
+            )
+            self.db.execute(
+                "UPDATE options SET quantity = quantity - ?, holder_sell_price = '0', writer_sell_price = '0', updated_block = ? WHERE option_hash = ?",
+                (event["quantity"], block, option_hash),
+            )
+        elif name == "OptionExercised":
+            self.db.execute("UPDATE options SET quantity = quantity - ?, holder_sell_price = '0', writer_sell_price = '0', updated_block = ? WHERE option_hash = ?", (event["quantity"], block, option_hash))
+            self.db.execute("DELETE FROM options WHERE option_hash = ? AND quantity = 0", (option_hash,))
+        elif name == "OptionRefunded":
+            self.db.execute("DELETE FROM options WHERE option_hash = ?", (option_hash,))
+        else:
+            # Column to value of the fields changed by the event
+            if name == "OptionExchanged":
+                changes = {"holder": event["holder"]}
+            elif name == "HolderTransferApproved":
+                changes = {"holder_sell_price": str(event["price"])}
+            elif name == "WriterTransferApproved":
+                changes = {"writer_sell_price": str(event["price"])}
+            elif name == "HolderTransferred":
+                changes = {"holder": event["to"], "holder_sell_price": "0"}
+            else:
+                changes = {"writer": event["to"], "writer_sell_price": "0"}
+            assignments = ", ".join("{} = ?".format(column) for column in changes)
+            self.db.execute(
+                "UPDATE options SET {}, updated_block = ? WHERE option_hash = ?".format(assignments),
+                list(changes.values()) + [block, option_hash],
+            )
+
+    def _store(self, option_hash, block):
+        """
+        Function that reads the details of an option from the chain as of block and stores them, or deletes the option if it did not exist at block
+        """
+        asset, strike, writer, premium, holder, expiration, holder_price, writer_price, _, _, quantity = self.dex.getOptionDetailsBatch([option_hash], block_identifier=block)[0]
+        # Exercised and refunded options are deleted by OptionsDEX, and options created after block do not exist yet
+        if expiration == 0:
+            self.db.execute("DELETE FROM options WHERE option_hash = ?", (option_hash,))
+            return
+        self.db.execute(
+            "INSERT INTO options VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (option_hash) DO UPDATE SET writer = excluded.writer, holder = excluded.holder, "
+            "holder_sell_price = excluded.holder_sell_price, writer_sell_price = excluded.writer_sell_price, quantity = excluded.quantity, updated_block = excluded.updated_block",
+            (option_hash, str(asset).lower(), str(strike), str(writer).lower(), str(premium), str(holder).lower(),
+             min(expiration, SQLITE_MAX_INTEGER), str(holder_price), str(writer_price), quantity, block, block),
+        )
+
+    def _handle_reorg(self):
+        """
+        Function that compares the stored hashes of recently indexed blocks with the chain. If they differ, every option touched after the last matching block is read again as of that block and the checkpoint is moved back to it.
+
+        Exercises and splits are applied as changes of the quantity, so the options are restored to their state at the last matching block, not at the chain head, before the blocks after it are indexed again. Options deleted by an exercise or refund after that block are restored as well, and options created after it are deleted.
+        """
+        stored = self.db.execute("SELECT number, hash FROM blocks ORDER BY number DESC").fetchall()
+        safe = None
+        for number, block_hash in stored:
+            block = web3.eth.get_block(number) if number <= web3.eth.block_number else None
+            if block is not None and to_hex(block["hash"]) == block_hash:
+                safe = number
+                break
+        if not stored or safe == stored[0][0]:
+            return
+        # No stored block matches, so roll back past every stored block
+        if safe is None:
+            safe = stored[-1][0] - 1
+        with self.db:
+            stale = {row[0] for row in self.db.execute("SELECT option_hash FROM touches WHERE block > ?", (safe,))}
+            stale.update(row[0] for row in self.db.execute("SELECT option_hash FROM options WHERE updated_block > ?", (safe,)))
+            for option_hash in stale:
+                self._store(option_hash, safe)
+            self.db.execute("DELETE FROM touches WHERE block > ?", (safe,))
+            self.db.execute("DELETE FROM blocks WHERE number > ?", (safe,))
+            self.db.execute("INSERT OR REPLACE INTO checkpoint (contract, block) VALUES (?, ?)", (self.address, safe))
+
+    @staticmethod
+    def _decode(row):
+        """
+        Function that converts the amounts of a database row back to integers
+        """
+        for column in ("strike_price", "premium", "holder_sell_price", "writer_sell_price"):
+            row[column] = int(row[column])
+        return row
@@ -0,0 +1,116 @@
+"""
+Keeper that refunds the expired options of a writer in bulk
+
+ExpiryKeeper keeps the options of a writer in a min-heap ordered by block expiration. On every new block it pops the options the chain has passed, checks them with a single getOptionDetailsBatch() call, and refunds the ones still open through refundMany(), sorted by asset so that each asset is transferred back once. Options can still be exercised after their expiration, so a batch can revert when one of its options is exercised between the check and the refund; its options are then checked again and refunded one by one, and the ones whose refund still reverts are tracked again. Only the options at the top of the heap are looked at, so no option is polled before it expires.
+
+Usage:
+
+    brownie run scripts/keeper.py --network <network>
+
+The keeper signs with the account 'main' (see scripts/deploy.py) and discovers the options of that account with the indexer in scripts/indexer.py.
+"""
+
+import heapq
+import time
+
+from brownie import accounts, chain, OptionsDEX
+from brownie.exceptions import VirtualMachineError
+from scripts.client import OptionsDEXClient
+from scripts.indexer import OptionsIndexer
+
+
+class ExpiryKeeper:
+    """
+    Class that refunds the options of a writer as soon as the chain passes their block expiration
+    """
+
+    def __init__(self, dex, account, batch_size=100):
+        """
+        Parameters:
+            dex: the brownie contract object of the deployed OptionsDEX
+            account: the brownie account of the writer, which signs the refunds
+            batch_size: the maximum number of options refunded per transaction
+        """
+        self.client = OptionsDEXClient(dex, account)
+        self.batch_size = batch_size
+        # Min-heap of (block expiration, option hash)
+        self.heap = []
+        # Hashes that were ever added to the heap
+        self.seen = set()
+
+    def track(self, option_hash, block_expiration):
+        """
+        Function that adds an option to the heap, unless it was added before
+        """
+        if option_hash not in self.seen:
+            self.seen.add(option_hash)
+            heapq.heappush(self.heap, (block_expiration, option_hash))
+
+    def due(self, height):
+        """
+        Function that pops and returns the hashes of every tracked option that can be refunded in the block after height
+        """
+        hashes = []
+        # refund() requires block.number > blockExpiration
+        while self.heap and self.heap[0][0] <= height:
+            hashes.append(heapq.heappop(self.heap)[1])
+        return hashes
+
+    def refundable(self, hashes):
+        """
+        Function that returns (asset, option hash, block expiration) of every option of hashes that is still open and written by the account, read with a single getOptionDetailsBatch() call
+        """
+        # Drop options that were exercised, refunded or transferred to another writer since they were tracked
+        writer = self.client.account.address
+        details = self.client.get_option_details_batch(hashes)
+        return [(d[0], h, d[5]) for h, d in zip(hashes, details) if d[5] != 0 and d[2] == writer]
+
+    def sweep(self, height):
+        """
+        Function that refunds every due option that is still open and written by the account, and returns the transactions sent
+        """
+        hashes = self.due(height)
+        if not hashes:
+            return []
+        refundable = self.refundable(hashes)
+        # Sort by asset so that refundMany() transfers each asset once per transaction
+        refundable.sort(key=lambda item: str(item[0]).lower())
+        txs = []
+        for start in range(0, len(refundable), self.batch_size):
+            batch = [h for _, h, _ in refundable[start:start + self.batch_size]]
+            try:
+                txs.append(self.client.dex.refundMany(batch, {"from": self.client.account}))
+            except (VirtualMachineError, ValueError):
+                # Options can still be exercised after their expiration, so an option exercised since the check reverts the whole batch
+                txs += self._refund_each(self.refundable(batch))
+        return txs
+
+    def _refund_each(self, refundable):
+        """
+        Function that refunds options one by one with refund() and returns the transactions sent. Options whose refund reverts are tracked again, so that the next sweep checks and retries them.
+        """
+        txs = []
+        for _, option_hash, block_expiration in refundable:
+            try:
+                txs.append(self.client.dex.refund(option_hash, {"from": self.client.account}))
+            except (VirtualMachineError, ValueError):
+                heapq.heappush(self.heap, (block_expiration, option_hash))
+        return txs
+
+
+def main(db_path="options.db", poll_interval=1):
+    account = accounts.load('main')
+    dex = OptionsDEX[-1]
+    indexer = OptionsIndexer(dex, db_path, from_block=dex.tx.block_number if dex.tx else 0)
+    keeper = ExpiryKeeper(dex, account)
+    height = None
+    while True:
+        if chain.height != height:
+            height = chain.height
+            # Track options written by the account since the last block
+            indexer.sync()
+            for option in indexer.open_options(writer=account.address):
+                keeper.track(option["option_hash"], option["block_expiration"])
+            for tx in keeper.sweep(height):
+                print("Sent refund {}".format(tx.txid))
+        time.sleep(float(poll_interval))
@@ -0,0 +1,249 @@
+"""
+Load test of OptionsDEX through the full option lifecycle
+
+Creates a number of fresh accounts funded with ETH and CayugaCoin, then drives a randomized mix of createOption(), buyOption(), holder and writer transfers, exerciseOption() and refund() against the local development chain. Operations are only picked when the current state allows them, e.g. only bought and unexpired options are exercised.
+
+The report is written as JSON with the throughput of the run and, for every function, the number of calls and failures and the percentiles of latency and gas. The hash of the deployed OptionsDEX bytecode is included so that runs against different contract versions can be told apart.
+
+Usage:
+
+    brownie run scripts/load_test.py main 1000 10000 0 load_test.json
+
+The arguments are the number of accounts, the number of operations, the random seed and the path of the report.
+"""
+
+import json
+import random
+import time
+
+from brownie import accounts, chain, web3, CayugaCoin, OptionsDEX
+from eth_utils import keccak, to_hex
+
+# Relative frequency of every operation
+DEFAULT_MIX = {
+    "create": 4,
+    "buy": 4,
+    "transferHolder": 1,
+    "transferWriter": 1,
+    "exercise": 2,
+    "refund": 2,
+}
+# Options each account can write with its CayugaCoin
+LOTS_PER_ACCOUNT = 5
+# Tokens minted per CayugaCoin deployment
+TOKEN_SUPPLY = 100000 * 10 ** 18
+LOT = 10 ** 20
+# ETH given to every account
+ETH_PER_ACCOUNT = 100 * 10 ** 18
+
+
+def percentiles(values):
+    """
+    Function that returns the 50th, 90th and 99th percentiles (nearest rank) and the maximum of values
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+    rank = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+    return {"p50": rank(0.5), "p90": rank(0.9), "p99": rank(0.99), "max": ordered[-1]}
+
+
+class LoadTest:
+    """
+    Class that drives random option lifecycles from many accounts and records latency and gas per function
+    """
+
+    def __init__(self, num_accounts, seed=0, mix=None):
+        """
+        Parameters:
+            num_accounts: the number of fresh accounts acting as writers and holders
+            seed: the seed of the random operation mix
+            mix: dictionary of operation name to relative frequency, defaults to DEFAULT_MIX
+        """
+        self.random = random.Random(seed)
+        self.mix = mix or DEFAULT_MIX
+        self.num_accounts = num_accounts
+        # Function name to list of (seconds, gas used), and to number of failed calls
+        self.samples = {}
+        self.failures = {}
+        # Hash of open option to its state
+        self.options = {}
+        # Address to number of lots of collateral the account can still write
+        self.lots = {}
+
+    def setup(self):
+        """
+        Function that deploys OptionsDEX and as many CayugaCoin tokens as needed, then creates and funds the accounts
+        """
+        self.dex = accounts[0].deploy(OptionsDEX, False)
+        self.traders = [accounts.add() for _ in range(self.num_accounts)]
+        per_token = TOKEN_SUPPLY // (LOTS_PER_ACCOUNT * LOT)
+        self.tokens = {}
+        token = None
+        for i, trader in enumerate(self.traders):
+            # Deploy a new token once the previous one is handed out
+            if i % per_token == 0:
+                token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+                self.dex.registerAsset(token.address, {"from": accounts[0]})
+            accounts[i % 10].transfer(trader, ETH_PER_ACCOUNT)
+            token.transfer(trader, LOTS_PER_ACCOUNT * LOT, {"from": accounts[0]})
+            token.approve(self.dex.address, 2 ** 256 - 1, {"from": trader})
+            self.tokens[trader.address] = token
+            self.lots[trader.address] = LOTS_PER_ACCOUNT
+
+    def run(self, operations):
+        """
+        Function that performs operations random operations and returns the seconds taken
+        """
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        start = time.perf_counter()
+        for _ in range(operations):
+            operation = self.random.choices(names, weights)[0]
+            # Fall back to creating an option when the state does not allow the operation
+            if not getattr(self, "_" + operation)():
+                self._create()
+        return time.perf_counter() - start
+
+    def report(self, seconds):
+        """
+        Function that returns the machine-readable report of the run
+        """
+        calls = sum(len(samples) for samples in self.samples.values())
+        return {
+            "contract": to_hex(keccak(web3.eth.get_code(self.dex.address))),
+            "accounts": self.num_accounts,
+            "mix": self.mix,
+            "seconds": seconds,
+            "transactions": calls,
+            "throughput_tx_per_s": calls / seconds if seconds else 0,
+            "functions": {
+                name: {
+                    "calls": len(samples),
+                    "failures": self.failures.get(name, 0),
+                    "latency_ms": percentiles([1000 * t for t, _ in samples]),
+                    "gas": percentiles([gas for _, gas in samples]),
+                }
+                for name, samples in sorted(self.samples.items())
+            },
+        }
+
+    def _send(self, name, fn, *args):
+        """
+        Function that sends a transaction, records its latency and gas under name and returns it, or returns None if it reverted
+        """
+        start = time.perf_counter()
+        try:
+            tx = fn(*args)
+        except Exception:
+            self.failures[name] = self.failures.get(name, 0) + 1
+            return None
+        self.samples.setdefault(name, []).append((time.perf_counter() - start, tx.gas_used))
+        return tx
+
+    def _pick(self, condition):
+        """
+        Function that returns a random open option hash satisfying condition, or None
+        """
+        candidates = [h for h, option in self.options.items() if condition(option)]
+        return self.random.choice(candidates) if candidates else None
+
+    def _other(self, *addresses):
+        """
+        Function that returns a random account that is none of addresses
+        """
+        while True:
+            trader = self.random.choice(self.traders)
+            if trader.address not in addresses:
+                return trader
+
+    def _create(self):
+        writers = [t for t in self.traders if self.lots[t.address] > 0]
+        if not writers:
+            return False
+        writer = self.random.choice(writers)
+        premium = self.random.randint(1, 10) * 10 ** 14
+        strike = self.random.randint(1, 10) * 10 ** 15
+        expiration = chain.height + self.random.randint(5, 200)
+        tx = self._send("createOption", self.dex.createOption, self.tokens[writer.address].address, premium, strike, expiration, {"from": writer})
+        if tx is None:
+            return True
+        self.lots[writer.address] -= 1
+        self.options[tx.events["OptionCreated"]["optionHash"]] = {"writer": writer, "holder": None, "premium": premium, "strike": strike, "expiration": expiration}
+        return True
+
+    def _buy(self):
+        height = chain.height
+        option_hash = self._pick(lambda o: o["holder"] is None and o["expiration"] > height)
+        if option_hash is None:
+            return False
+        option = self.options[option_hash]
+        buyer = self._other(option["writer"].address)
+        if self._send("buyOption", self.dex.buyOption, option_hash, {"from": buyer, "value": option["premium"] * 100}):
+            option["holder"] = buyer
+        return True
+
+    def _transferHolder(self):
+        height = chain.height
+        option_hash = self._pick(lambda o: o["holder"] is not None and o["expiration"] > height)
+        if option_hash is None:
+            return False
+        option = self.options[option_hash]
+        buyer = self._other(option["writer"].address, option["holder"].address)
+        price = self.random.randint(1, 10) * 10 ** 15
+        if self._send("approveOptionTransferHolder", self.dex.approveOptionTransferHolder, option_hash, buyer, price, {"from": option["holder"]}):
+            if self._send("transferOptionHolder", self.dex.transferOptionHolder, option_hash, {"from": buyer, "value": price}):
+                option["holder"] = buyer
+        return True
+
+    def _transferWriter(self):
+        height = chain.height
+        option_hash = self._pick(lambda o: o["expiration"] > height)
+        if option_hash is None:
+            return False
+        option = self.options[option_hash]
+        # The new writer needs a free lot of the same token
+        token = self.tokens[option["writer"].address]
+        writers = [t for t in self.traders if self.lots[t.address] > 0 and self.tokens[t.address] == token and t != option["writer"] and t != option["holder"]]
+        if not writers:
+            return False
+        writer = self.random.choice(writers)
+        price = self.random.randint(1, 10) * 10 ** 15
+        if self._send("approveOptionTransferWriter", self.dex.approveOptionTransferWriter, option_hash, writer, price, {"from": option["writer"]}):
+            if self._send("transferOptionWriter", self.dex.transferOptionWriter, option_hash, {"from": writer, "value": price}):
+                self.lots[writer.address] -= 1
+                self.lots[option["writer"].address] += 1
+                option["writer"] = writer
+        return True
+
+    def _exercise(self):
+        height = chain.height
+        option_hash = self._pick(lambda o: o["holder"] is not None and o["expiration"] > height)
+        if option_hash is None:
+            return False
+        option = self.options[option_hash]
+        if self._send("exerciseOption", self.dex.exerciseOption, option_hash, {"from": option["holder"], "value": option["strike"] * 100}):
+            # The collateral went to the holder, so the writer cannot write again
+            del self.options[option_hash]
+        return True
+
+    def _refund(self):
+        height = chain.height
+        option_hash = self._pick(lambda o: o["holder"] is None or o["expiration"] < height)
+        if option_hash is None:
+            return False
+        option = self.options[option_hash]
+        if self._send("refund", self.dex.refund, option_hash, {"from": option["writer"]}):
+            self.lots[option["writer"].address] += 1
+            del self.options[option_hash]
+        return True
+
+
+def main(num_accounts=100, operations=1000, seed=0, output="load_test.json"):
+    load_test = LoadTest(int(num_accounts), int(seed))
+    load_test.setup()
+    seconds = load_test.run(int(operations))
+    report = load_test.report(seconds)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print("{} transactions in {:.1f}s ({:.1f} tx/s), report written to {}".format(report["transactions"], seconds, report["throughput_tx_per_s"], output))
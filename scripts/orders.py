@@ -0,0 +1,151 @@
+"""
+Signed sell orders for the holder and writer sides of OptionsDEX options
+
+The holder or writer of an option signs a sell order off-chain (EIP-712) with a price, an optional taker, a block expiration, a nonce and a quantity. The buyer settles it with a single fillSellOrder() transaction, instead of the seller sending approveOptionTransferHolder() / approveOptionTransferWriter() and the buyer sending transferOptionHolder() / transferOptionWriter(). A seller cancels unfilled orders with cancelOrders(). A holder order with a quantity below the quantity of the option sells only that part of the position, which OptionsDEX splits off into a new option (see the OptionSplit event).
+
+sell_order_digest() reproduces OptionsDEX.hashSellOrder() and sign_sell_order() signs it with a private key. OrderBook keeps signed orders, picks the cheapest order that can still be filled and fills it.
+
+Usage:
+
+    book = OrderBook(OptionsDEX[-1])
+    book.add(book.sign(seller, option_hash, False, 10 ** 18, chain.height + 100))
+    book.fill(book.best(option_hash, False, buyer), buyer)
+"""
+
+from brownie import chain
+from eth_keys import keys
+from eth_utils import keccak, to_bytes, to_hex
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+# EIP-712 type hashes, see OptionsDEX
+DOMAIN_TYPEHASH = keccak(text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+SELL_ORDER_TYPEHASH = keccak(text="SellOrder(bytes32 optionHash,bool isWriter,uint256 price,address taker,uint256 blockExpiration,uint256 nonce,uint256 quantity)")
+
+
+def _word(value):
+    """
+    Function that ABI-encodes an integer, a boolean or an address as a 32 byte word
+    """
+    if isinstance(value, (bool, int)):
+        return int(value).to_bytes(32, "big")
+    return to_bytes(hexstr=str(value)).rjust(32, b"\0")
+
+
+def domain_separator(chain_id, verifying_contract):
+    """
+    Function that returns the EIP-712 domain separator of the OptionsDEX deployed at verifying_contract on the chain chain_id
+    """
+    return keccak(DOMAIN_TYPEHASH + keccak(text="OptionsDEX") + keccak(text="1") + _word(chain_id) + _word(verifying_contract))
+
+
+def sell_order_digest(domain, order):
+    """
+    Function that returns the EIP-712 digest of a sell order, equal to OptionsDEX.hashSellOrder(order)
+    Parameters:
+        domain: the domain separator of OptionsDEX as bytes
+        order: (option hash, is writer side, price, taker, block expiration, nonce, quantity) tuple
+    """
+    struct_hash = keccak(SELL_ORDER_TYPEHASH + b"".join(_word(field) for field in order))
+    return keccak(b"\x19\x01" + domain + struct_hash)
+
+
+def sign_sell_order(domain, private_key, order):
+    """
+    Function that signs a sell order and returns its (v, r, s) signature as accepted by OptionsDEX.fillSellOrder()
+    """
+    signature = keys.PrivateKey(to_bytes(hexstr=str(private_key))).sign_msg_hash(sell_order_digest(domain, order))
+    return signature.v + 27, to_hex(signature.r.to_bytes(32, "big")), to_hex(signature.s.to_bytes(32, "big"))
+
+
+class OrderBook:
+    """
+    Class that signs, stores, matches and fills sell orders of a deployed OptionsDEX contract
+    """
+
+    def __init__(self, dex):
+        """
+        Parameters:
+            dex: the brownie contract object of the deployed OptionsDEX
+        """
+        self.dex = dex
+        self.domain = bytes(dex.DOMAIN_SEPARATOR())
+        # Signed orders as dictionaries with the keys "order", "signature" and "seller"
+        self.orders = []
+        # Address to next order nonce handed out by sign()
+        self._nonces = {}
+
+    def next_nonce(self, seller):
+        """
+        Function that returns the lowest order nonce of seller, from the last one handed out, that was not used or cancelled
+        """
+        nonce = self._nonces.get(seller.address, 0)
+        while self.dex.isOrderNonceUsed(seller.address, nonce):
+            nonce += 1
+        self._nonces[seller.address] = nonce + 1
+        return nonce
+
+    def sign(self, seller, option_hash, is_writer, price, block_expiration, taker=ZERO_ADDRESS, nonce=None, quantity=0):
+        """
+        Function that signs a sell order with the private key of seller and returns it
+        Parameters:
+            seller: the brownie LocalAccount of the current holder (or writer) of the option
+            option_hash: the hash of the option
+            is_writer: True to sell the writer side, False to sell the holder side
+            price: the price of the side (in Wei)
+            block_expiration: the last block in which the order can be filled
+            taker: the only address allowed to fill the order, anyone by default
+            nonce: the nonce of the order, by default the next unused nonce of seller
+            quantity: the number of tokens of the holder side sold, the whole side by default
+        """
+        if nonce is None:
+            nonce = self.next_nonce(seller)
+        order = (option_hash, is_writer, price, str(taker), block_expiration, nonce, quantity)
+        return {"order": order, "signature": sign_sell_order(self.domain, seller.private_key, order), "seller": seller.address}
+
+    def add(self, signed):
+        """
+        Function that adds a signed order to the book
+        """
+        self.orders.append(signed)
+
+    def best(self, option_hash, is_writer, taker, height=None):
+        """
+        Function that returns the cheapest order of the book for one side of an option that taker can fill in the block after height (the current block by default), or None. Orders whose nonce was used or whose seller no longer owns the side are dropped from the book.
+        """
+        if height is None:
+            height = chain.height
+        details = self.dex.getOptionDetails(option_hash)
+        owner = details[2] if is_writer else details[4]
+        best = None
+        for signed in list(self.orders):
+            order = signed["order"]
+            if order[0] != option_hash or order[1] != is_writer:
+                continue
+            # Drop orders that can never be filled
+            if signed["seller"] != owner or self.dex.isOrderNonceUsed(signed["seller"], order[5]):
+                self.orders.remove(signed)
+                continue
+            if order[4] <= height or order[3].lower() not in (ZERO_ADDRESS, str(taker).lower()):
+                continue
+            if best is None or order[2] < best["order"][2]:
+                best = signed
+        return best
+
+    def fill(self, signed, account, **params):
+        """
+        Function that fills a signed order from account, sending its price, and removes it from the book
+        """
+        v, r, s = signed["signature"]
+        tx = self.dex.fillSellOrder(signed["order"], v, r, s, dict({"from": account, "value": signed["order"][2]}, **params))
+        if signed in self.orders:
+            self.orders.remove(signed)
+        return tx
+
+    def cancel(self, seller, nonces):
+        """
+        Function that cancels the orders of seller signed with nonces and removes them from the book
+        """
+        tx = self.dex.cancelOrders(nonces, {"from": seller})
+        self.orders = [o for o in self.orders if not (o["seller"] == seller.address and o["order"][5] in nonces)]
+        return tx
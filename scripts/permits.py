@@ -0,0 +1,69 @@
+"""
+EIP-2612 permits for the collateral of OptionsDEX options
+
+A writer signs a permit off-chain that approves OptionsDEX to spend its tokens, and sends it with createOptionWithPermit() or transferOptionWriterWithPermit(), so that writing or taking over an option takes a single transaction instead of an approve() transaction followed by the write. The asset must support permits, as CayugaCoin does.
+
+permit_digest() reproduces the EIP-712 digest of a permit and sign_permit() signs it with a private key. sign_collateral_permit() reads the domain separator and the permit nonce of the writer from the token and returns the Permit struct expected by OptionsDEX.
+
+Usage:
+
+    permit = sign_collateral_permit(CayugaCoin[-1], writer, OptionsDEX[-1], 1000 * 10 ** 18)
+    OptionsDEX[-1].createOptionWithPermit(CayugaCoin[-1], premium, strike_price, expiration, 1000, permit, {"from": writer})
+"""
+
+from brownie import chain
+from eth_keys import keys
+from eth_utils import keccak, to_bytes, to_hex
+from scripts.orders import DOMAIN_TYPEHASH, _word
+
+# EIP-2612 type hash, see ERC20Permit
+PERMIT_TYPEHASH = keccak(text="Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)")
+# Seconds for which permits signed by sign_collateral_permit() stay valid by default
+PERMIT_LIFETIME = 3600
+
+
+def token_domain_separator(name, chain_id, token):
+    """
+    Function that returns the EIP-712 domain separator of an ERC20Permit token called name, deployed at token on the chain chain_id
+    """
+    return keccak(DOMAIN_TYPEHASH + keccak(text=name) + keccak(text="1") + _word(chain_id) + _word(token))
+
+
+def permit_digest(domain, owner, spender, value, nonce, deadline):
+    """
+    Function that returns the EIP-712 digest of a permit, which the token recovers the owner from
+    Parameters:
+        domain: the domain separator of the token as bytes
+        owner: the address whose tokens are approved
+        spender: the address approved, OptionsDEX
+        value: the allowance granted
+        nonce: the permit nonce of owner, see nonces()
+        deadline: the last timestamp at which the permit can be used
+    """
+    struct_hash = keccak(PERMIT_TYPEHASH + b"".join(_word(field) for field in (owner, spender, value, nonce, deadline)))
+    return keccak(b"\x19\x01" + domain + struct_hash)
+
+
+def sign_permit(domain, private_key, owner, spender, value, nonce, deadline):
+    """
+    Function that signs a permit and returns its (v, r, s) signature as accepted by permit()
+    """
+    signature = keys.PrivateKey(to_bytes(hexstr=str(private_key))).sign_msg_hash(permit_digest(domain, owner, spender, value, nonce, deadline))
+    return signature.v + 27, to_hex(signature.r.to_bytes(32, "big")), to_hex(signature.s.to_bytes(32, "big"))
+
+
+def sign_collateral_permit(token, owner, dex, value, deadline=None):
+    """
+    Function that signs a permit of owner for dex over value tokens and returns it as the (value, deadline, v, r, s) Permit struct of OptionsDEX
+    Parameters:
+        token: the brownie contract object of the asset, which must support permits
+        owner: the brownie LocalAccount of the writer
+        dex: the deployed OptionsDEX, or its address
+        value: the allowance granted, at least the collateral of the option (quantity * 10 ** 18)
+        deadline: the last timestamp at which the permit can be used, PERMIT_LIFETIME seconds from now by default
+    """
+    if deadline is None:
+        deadline = chain.time() + PERMIT_LIFETIME
+    spender = getattr(dex, "address", dex)
+    v, r, s = sign_permit(bytes(token.DOMAIN_SEPARATOR()), owner.private_key, owner.address, spender, value, token.nonces(owner.address), deadline)
+    return (value, deadline, v, r, s)
@@ -0,0 +1,237 @@
+"""
+Vectorized Black-Scholes pricing of OptionsDEX options
+
+OptionsDEX options are calls on a quantity of tokens of an asset (100 unless created with createOptionWithQuantity()): the holder pays the strike price per token in Wei to receive the tokens at any block up to the block expiration. An American call on an asset without dividends is worth the European call, so the Black-Scholes formula gives its fair premium.
+
+OptionBook is a columnar snapshot of options (strike price, premium and block expiration as stored by OptionsDEX, in Wei and blocks), built from getOptionDetailsBatch() results or indexer rows. PricingEngine caches the spot price and volatility of every asset and prices a whole book in one vectorized NumPy pass, turning block expirations into years with a configurable block time. Its results feed createOptions() (quote()), the repricing of unsold options through refundMany() and createOptions() (repricing_plan()), and the prices of holder sell orders (holder_sell_prices()).
+
+Usage:
+
+    engine = PricingEngine(block_time=2.0)
+    engine.set_market(token, spot=10 ** 18, volatility=0.8)
+    client.create_options(engine.quote(token, strikes, expirations, chain.height))
+
+    book = OptionBook.from_details(hashes, client.get_option_details_batch(hashes))
+    greeks = engine.price(book, chain.height)
+"""
+
+import math
+
+import numpy as np
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+# Tokens per option created without a quantity, see OptionsDEX
+TOKENS_PER_OPTION = 100
+# Largest premium OptionsDEX stores
+MAX_PREMIUM = 2 ** 96 - 1
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+def norm_cdf(x):
+    """
+    Function that returns the standard normal cumulative distribution of an array, with a relative error below 1.2e-7 (Chebyshev fit of erfc, Numerical Recipes 6.2)
+    """
+    z = np.abs(x) / math.sqrt(2)
+    t = 1 / (1 + 0.5 * z)
+    poly = -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (-0.18628806 + t * (
+        0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277))))))))
+    # Tail probability 0.5 * erfc(|x| / sqrt(2))
+    tail = 0.5 * t * np.exp(poly)
+    return np.where(x >= 0, 1 - tail, tail)
+
+
+def norm_pdf(x):
+    """
+    Function that returns the standard normal density of an array
+    """
+    return np.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+
+
+class OptionBook:
+    """
+    Class that holds a snapshot of options as one NumPy array per field
+    """
+
+    def __init__(self, hashes, assets, strike_prices, premiums, block_expirations, holders, quantities=None):
+        """
+        Parameters:
+            hashes: the hashes of the options
+            assets: the addresses of the underlying assets
+            strike_prices: the strike prices per token (in Wei)
+            premiums: the premiums per token (in Wei)
+            block_expirations: the block expirations
+            holders: the addresses of the holders, the zero address for options that were not bought
+            quantities: the numbers of tokens covered by the options, TOKENS_PER_OPTION each by default
+        """
+        self.hashes = list(hashes)
+        assets = [str(asset).lower() for asset in assets]
+        # Distinct assets and the position of the asset of every option among them
+        self.assets = sorted(set(assets))
+        position = {asset: i for i, asset in enumerate(self.assets)}
+        self.asset_index = np.array([position[asset] for asset in assets], dtype=np.int64)
+        # Exact integers as stored by OptionsDEX, float arrays lose precision above 2^53
+        self.strike_wei = [int(strike) for strike in strike_prices]
+        self.block_expiration_numbers = [int(expiration) for expiration in block_expirations]
+        self.strike_prices = np.array(self.strike_wei, dtype=np.float64)
+        self.premiums = np.array(premiums, dtype=np.float64)
+        self.block_expirations = np.array(self.block_expiration_numbers, dtype=np.float64)
+        self.unsold = np.array([str(holder).lower() == ZERO_ADDRESS for holder in holders], dtype=bool)
+        self.quantities = [int(q) for q in quantities] if quantities is not None else [TOKENS_PER_OPTION] * len(self.hashes)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @classmethod
+    def from_details(cls, hashes, details):
+        """
+        Function that builds a book from OptionDetails tuples, as returned by getOptionDetailsBatch() or OptionsDEXClient.get_option_details_batch(). Options that no longer exist are left out.
+        """
+        rows = [(h, d) for h, d in zip(hashes, details) if d[5] != 0]
+        return cls(
+            [h for h, _ in rows], [d[0] for _, d in rows], [d[1] for _, d in rows],
+            [d[3] for _, d in rows], [d[5] for _, d in rows], [d[4] for _, d in rows], [d[10] for _, d in rows],
+        )
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Function that builds a book from the rows returned by OptionsIndexer.open_options()
+        """
+        return cls(
+            [r["option_hash"] for r in rows], [r["asset"] for r in rows], [r["strike_price"] for r in rows],
+            [r["premium"] for r in rows], [r["block_expiration"] for r in rows], [r["holder"] for r in rows], [r["quantity"] for r in rows],
+        )
+
+
+class PricingEngine:
+    """
+    Class that caches the market inputs of every asset and prices books of options with Black-Scholes
+    """
+
+    def __init__(self, block_time=2.0, rate=0.0):
+        """
+        Parameters:
+            block_time: the average number of seconds between blocks, used to turn block expirations into time to expiry
+            rate: the continuously compounded risk-free rate per year
+        """
+        self.block_time = block_time
+        self.rate = rate
+        # Asset address to (spot price per token in Wei, annualised volatility)
+        self.markets = {}
+
+    def set_market(self, asset, spot=None, volatility=None):
+        """
+        Function that updates the cached spot price per token (in Wei) and the annualised volatility of an asset. Inputs left as None keep their cached value.
+        """
+        asset = str(asset).lower()
+        cached_spot, cached_volatility = self.markets.get(asset, (None, None))
+        self.markets[asset] = (cached_spot if spot is None else float(spot), cached_volatility if volatility is None else float(volatility))
+
+    def fit_volatility(self, asset, prices, blocks_between=1):
+        """
+        Function that sets the volatility of an asset to the annualised realised volatility of a series of prices sampled every blocks_between blocks, caches the last price as its spot price and returns the volatility
+        """
+        returns = np.diff(np.log(np.asarray(prices, dtype=np.float64)))
+        volatility = float(np.std(returns, ddof=1) * math.sqrt(SECONDS_PER_YEAR / (self.block_time * blocks_between)))
+        self.set_market(asset, prices[-1], volatility)
+        return volatility
+
+    def years_to_expiry(self, block_expirations, height):
+        """
+        Function that returns the time from block height to the block expirations in years, zero for expired options
+        """
+        return np.maximum(np.asarray(block_expirations, dtype=np.float64) - height, 0) * self.block_time / SECONDS_PER_YEAR
+
+    def _inputs(self, assets):
+        """
+        Function that returns the cached spot prices and volatilities of assets as arrays
+        """
+        missing = [asset for asset in assets if None in self.markets.get(asset, (None, None))]
+        if missing:
+            raise ValueError("No spot price or volatility cached for assets {}".format(missing))
+        spots, volatilities = zip(*(self.markets[asset] for asset in assets)) if assets else ((), ())
+        return np.array(spots, dtype=np.float64), np.array(volatilities, dtype=np.float64)
+
+    def price(self, book, height):
+        """
+        Function that prices every option of a book at block height and returns a dictionary of arrays in the order of the book:
+            premium: the fair premium per token (in Wei)
+            delta: the change of the premium per Wei of spot price
+            gamma: the change of delta per Wei of spot price
+            vega: the change of the premium per 1.0 of volatility (in Wei)
+            theta: the change of the premium per block (in Wei)
+            rho: the change of the premium per 1.0 of rate (in Wei)
+        """
+        spots, volatilities = self._inputs(book.assets)
+        # Gather the inputs of the asset of every option
+        spot = spots[book.asset_index]
+        sigma = volatilities[book.asset_index]
+        return self._black_scholes(spot, book.strike_prices, self.years_to_expiry(book.block_expirations, height), sigma)
+
+    def _black_scholes(self, spot, strike, years, sigma):
+        """
+        Function that returns the Black-Scholes premium and Greeks of calls as arrays, see price()
+        """
+        r = self.rate
+        # Expired options and options without volatility are worth their intrinsic value
+        live = (years > 0) & (sigma > 0)
+        t = np.where(live, years, 1.0)
+        sigma = np.where(live, sigma, 1.0)
+        sqrt_t = np.sqrt(t)
+        sigma_sqrt_t = sigma * sqrt_t
+        d1 = (np.log(spot / strike) + (r + 0.5 * sigma * sigma) * t) / sigma_sqrt_t
+        d2 = d1 - sigma_sqrt_t
+        discount = np.exp(-r * t)
+        nd1, nd2, pdf = norm_cdf(d1), norm_cdf(d2), norm_pdf(d1)
+
+        intrinsic = spot > strike * np.exp(-r * years)
+        premium = np.where(live, spot * nd1 - strike * discount * nd2, np.maximum(spot - strike * np.exp(-r * years), 0))
+        theta_year = -spot * pdf * sigma / (2 * sqrt_t) - r * strike * discount * nd2
+        return {
+            "premium": premium,
+            "delta": np.where(live, nd1, intrinsic.astype(np.float64)),
+            "gamma": np.where(live, pdf / (spot * sigma_sqrt_t), 0.0),
+            "vega": np.where(live, spot * pdf * sqrt_t, 0.0),
+            "theta": np.where(live, theta_year * self.block_time / SECONDS_PER_YEAR, 0.0),
+            "rho": np.where(live, strike * t * discount * nd2, 0.0),
+        }
+
+    def quote(self, asset, strike_prices, block_expirations, height):
+        """
+        Function that prices new options on an asset at block height and returns them as (asset, premium, strike price, block expiration) tuples, ready for OptionsDEXClient.create_options(). Premiums are rounded to Wei and kept between 1 Wei and the largest premium OptionsDEX stores.
+        """
+        strikes = np.asarray(strike_prices, dtype=np.float64)
+        spots, volatilities = self._inputs([str(asset).lower()])
+        premiums = self._black_scholes(
+            np.full(len(strikes), spots[0]), strikes, self.years_to_expiry(block_expirations, height), np.full(len(strikes), volatilities[0]),
+        )["premium"]
+        return [(asset, p, int(k), int(e)) for p, k, e in zip(to_wei(premiums), strike_prices, block_expirations)]
+
+    def repricing_plan(self, book, height, tolerance=0.05):
+        """
+        Function that returns the options on TOKENS_PER_OPTION tokens of a book that were not bought and whose premium is more than tolerance away from their fair premium, as the hashes to pass to refundMany() and the (asset, premium, strike price, block expiration) tuples to pass to OptionsDEXClient.create_options() to write them again at the fair premium
+        """
+        fair = self.price(book, height)["premium"]
+        # Options that expire before the next block cannot be written again
+        stale = book.unsold & (np.abs(book.premiums - fair) > tolerance * fair) & (book.block_expirations > height + 1)
+        # createOptions() only writes options on TOKENS_PER_OPTION tokens
+        stale &= np.array(book.quantities) == TOKENS_PER_OPTION
+        rows = np.flatnonzero(stale)
+        premiums = to_wei(fair[rows])
+        hashes = [book.hashes[i] for i in rows]
+        options = [(book.assets[book.asset_index[i]], p, book.strike_wei[i], book.block_expiration_numbers[i]) for i, p in zip(rows, premiums)]
+        return hashes, options
+
+    def holder_sell_prices(self, book, height):
+        """
+        Function that returns the fair price (in Wei) of the holder side of every option of a book, for approveOptionTransferHolder() or a signed sell order
+        """
+        return [q * p for q, p in zip(book.quantities, to_wei(self.price(book, height)["premium"]))]
+
+
+def to_wei(premiums):
+    """
+    Function that rounds an array of premiums to integers between 1 Wei and the largest premium OptionsDEX stores
+    """
+    return [min(max(int(p), 1), MAX_PREMIUM) for p in np.rint(premiums)]
@@ -0,0 +1,230 @@
+"""
+Storage access and call trace profiler of OptionsDEX transactions
+
+Replays a scenario of OptionsDEX calls on the local development chain and breaks the gas of every transaction down from its debug trace (tx.trace):
+
+storage reads / writes = number and gas of the SLOAD and SSTORE opcodes
+calls = number and gas of every external call, by callee (e.g. CayugaCoin.transfer, or an ETH transfer to an account), including the gas used by the callee
+functions = gas per internal function of OptionsDEX
+lines = gas, storage accesses and calls per source line of contracts/OptionsDEX.sol
+
+Only the steps of the contract called by the transaction are attributed, the steps of its callees are counted in the line of the call. The gas of a step is the gas left before it minus the gas left before the next step of the same frame, so SSTORE refunds (which are only credited at the end of the transaction) are not subtracted.
+
+Usage:
+
+    brownie run scripts/profiler.py main lifecycle
+    brownie run scripts/profiler.py main transfers profile.json
+
+The first argument is a scenario of SCENARIOS, the second an optional path to which the report is written as JSON.
+"""
+
+import bisect
+import json
+
+from brownie import accounts, chain, CayugaCoin, OptionsDEX
+from scripts.orders import OrderBook
+
+PREMIUM = 10 ** 17
+STRIKE_PRICE = 2 * 10 ** 18
+
+# Opcodes that call another account
+CALL_OPS = ("CALL", "STATICCALL", "DELEGATECALL", "CALLCODE")
+# Highest address of the precompiled contracts (ecrecover is 0x01)
+MAX_PRECOMPILE = 9
+
+# Source path to the offsets at which its lines start
+_line_starts = {}
+
+
+def _line(filename, offset):
+    """
+    Function that returns the line number and the text of the line holding a byte offset of a source file
+    """
+    if filename not in _line_starts:
+        with open(filename, "rb") as f:
+            text = f.read()
+        starts = [0] + [i + 1 for i, byte in enumerate(text) if byte == ord("\n")]
+        _line_starts[filename] = (starts, text.split(b"\n"))
+    starts, lines = _line_starts[filename]
+    number = bisect.bisect_right(starts, offset)
+    return number, lines[number - 1].decode().strip()
+
+
+def _step_gas(trace, i):
+    """
+    Function that returns the gas used by step i of a trace, including the gas used by the frames it calls
+    """
+    depth = trace[i]["depth"]
+    for step in trace[i + 1:]:
+        if step["depth"] == depth:
+            return trace[i]["gas"] - step["gas"]
+        if step["depth"] < depth:
+            break
+    # Last step of the frame
+    return trace[i]["gasCost"]
+
+
+def _callee(trace, i):
+    """
+    Function that returns the name of the account called by step i of a trace, e.g. "CayugaCoin.transfer"
+    """
+    if i + 1 < len(trace) and trace[i + 1]["depth"] > trace[i]["depth"]:
+        return trace[i + 1]["fn"]
+    # Calls to precompiles and to accounts without code never enter a new frame
+    address = int(trace[i]["stack"][-2], 16)
+    if address <= MAX_PRECOMPILE:
+        return "precompile {:#04x}".format(address)
+    return "ETH transfer" if trace[i]["op"] == "CALL" else "{} without code".format(trace[i]["op"])
+
+
+def profile_transaction(tx, label=None):
+    """
+    Function that returns the profile of a transaction as a dictionary, see the docstring of this module
+    Parameters:
+        tx: the brownie TransactionReceipt of the transaction
+        label: the name of the transaction in the report, by default the function it called
+    """
+    trace = tx.trace
+    depth = trace[0]["depth"]
+    profile = {
+        "label": label or tx.fn_name,
+        "function": tx.fn_name,
+        "gas_used": tx.gas_used,
+        "execution_gas": 0,
+        "storage_reads": {"count": 0, "gas": 0},
+        "storage_writes": {"count": 0, "gas": 0},
+        "calls": {},
+        "functions": {},
+        "lines": {},
+    }
+    for i, step in enumerate(trace):
+        if step["depth"] != depth:
+            continue
+        gas = _step_gas(trace, i)
+        profile["execution_gas"] += gas
+        profile["functions"][step["fn"]] = profile["functions"].get(step["fn"], 0) + gas
+        # Compiler generated steps have no source
+        if step["source"]:
+            number, text = _line(step["source"]["filename"], step["source"]["offset"][0])
+            key = "{}:{}".format(step["source"]["filename"], number)
+        else:
+            key, number, text = "<no source>", None, ""
+        line = profile["lines"].setdefault(key, {"line": number, "source": text, "gas": 0, "storage_reads": 0, "storage_writes": 0, "calls": 0})
+        line["gas"] += gas
+        if step["op"] == "SLOAD":
+            profile["storage_reads"]["count"] += 1
+            profile["storage_reads"]["gas"] += gas
+            line["storage_reads"] += 1
+        elif step["op"] == "SSTORE":
+            profile["storage_writes"]["count"] += 1
+            profile["storage_writes"]["gas"] += gas
+            line["storage_writes"] += 1
+        elif step["op"] in CALL_OPS:
+            call = profile["calls"].setdefault(_callee(trace, i), {"count": 0, "gas": 0})
+            call["count"] += 1
+            call["gas"] += gas
+            line["calls"] += 1
+    # Lines sorted by gas, the most expensive first
+    profile["lines"] = sorted(profile["lines"].values(), key=lambda line: -line["gas"])
+    return profile
+
+
+def format_profile(profile, top=15):
+    """
+    Function that formats the profile of a transaction as text, listing the top most expensive lines
+    """
+    out = ["{} ({}): {} gas used, {} gas in OptionsDEX".format(profile["label"], profile["function"], profile["gas_used"], profile["execution_gas"])]
+    out.append("  {:<40}{:>8}{:>10}".format("source", "count", "gas"))
+    for name in ("storage_reads", "storage_writes"):
+        out.append("  {:<40}{:>8}{:>10}".format(name.replace("_", " "), profile[name]["count"], profile[name]["gas"]))
+    for name, call in sorted(profile["calls"].items(), key=lambda item: -item[1]["gas"]):
+        out.append("  {:<40}{:>8}{:>10}".format("call " + name, call["count"], call["gas"]))
+    out.append("  {:<40}{:>18}".format("function", "gas"))
+    for name, gas in sorted(profile["functions"].items(), key=lambda item: -item[1]):
+        out.append("  {:<40}{:>18}".format(name, gas))
+    out.append("  {:>6}{:>8}{:>7}{:>8}{:>7}  {}".format("line", "gas", "sload", "sstore", "calls", "source"))
+    for line in profile["lines"][:top]:
+        out.append("  {:>6}{:>8}{:>7}{:>8}{:>7}  {}".format(
+            line["line"] or "-", line["gas"], line["storage_reads"], line["storage_writes"], line["calls"], line["source"][:80]))
+    return "\n".join(out)
+
+
+def _deploy():
+    """
+    Function that deploys CayugaCoin and OptionsDEX, registers CayugaCoin and gives writer B tokens, and returns both contracts
+    """
+    token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+    dex = accounts[0].deploy(OptionsDEX, False)
+    dex.registerAsset(token.address, {"from": accounts[0]})
+    token.transfer(accounts[3], 1000 * 10 ** 18, {"from": accounts[0]})
+    for account in (accounts[0], accounts[3]):
+        token.approve(dex.address, 2 ** 256 - 1, {"from": account})
+    return dex, token
+
+
+def _create(dex, token, txs):
+    """
+    Function that creates an option written by writer A, records the transaction and returns the hash of the option
+    """
+    tx = dex.createOption(token.address, PREMIUM, STRIKE_PRICE, chain.height + 100, {"from": accounts[0]})
+    txs.append(("createOption", tx))
+    return tx.events["OptionCreated"]["optionHash"]
+
+
+def lifecycle(dex, token):
+    """
+    Scenario of Test_exerciseOption: writer A creates an option, holder A buys and exercises it
+    """
+    txs = []
+    option_hash = _create(dex, token, txs)
+    txs.append(("buyOption", dex.buyOption(option_hash, {"from": accounts[1], "value": PREMIUM * 100})))
+    txs.append(("exerciseOption", dex.exerciseOption(option_hash, {"from": accounts[1], "value": STRIKE_PRICE * 100})))
+    return txs
+
+
+def transfers(dex, token):
+    """
+    Scenario in which both sides of a bought option are sold, once with the approve/transfer handshake and once with signed sell orders
+    """
+    txs = []
+    option_hash = _create(dex, token, txs)
+    dex.buyOption(option_hash, {"from": accounts[1], "value": PREMIUM * 100})
+    txs.append(("approveOptionTransferHolder", dex.approveOptionTransferHolder(option_hash, accounts[2], 10 ** 18, {"from": accounts[1]})))
+    txs.append(("transferOptionHolder", dex.transferOptionHolder(option_hash, {"from": accounts[2], "value": 10 ** 18})))
+    txs.append(("approveOptionTransferWriter", dex.approveOptionTransferWriter(option_hash, accounts[3], 10 ** 18, {"from": accounts[0]})))
+    txs.append(("transferOptionWriter", dex.transferOptionWriter(option_hash, {"from": accounts[3], "value": 10 ** 18})))
+    # Sell the holder side back with a signed order
+    seller = accounts.add()
+    accounts[0].transfer(seller, 10 ** 18)
+    dex.approveOptionTransferHolder(option_hash, seller, 1, {"from": accounts[2]})
+    dex.transferOptionHolder(option_hash, {"from": seller, "value": 1})
+    book = OrderBook(dex)
+    txs.append(("fillSellOrder (holder)", book.fill(book.sign(seller, option_hash, False, 10 ** 18, chain.height + 10), accounts[1])))
+    return txs
+
+
+def refunds(dex, token):
+    """
+    Scenario in which writer A refunds an unsold option with refund() and ten with refundMany()
+    """
+    txs = []
+    txs.append(("refund", dex.refund(_create(dex, token, txs), {"from": accounts[0]})))
+    hashes = [_create(dex, token, []) for _ in range(10)]
+    txs.append(("refundMany (10)", dex.refundMany(hashes, {"from": accounts[0]})))
+    return txs
+
+
+# Scenario name to function that runs it on a fresh deployment and returns (label, transaction) pairs
+SCENARIOS = {"lifecycle": lifecycle, "transfers": transfers, "refunds": refunds}
+
+
+def main(scenario="lifecycle", json_path=None, top=15):
+    dex, token = _deploy()
+    profiles = [profile_transaction(tx, label) for label, tx in SCENARIOS[scenario](dex, token)]
+    for profile in profiles:
+        print(format_profile(profile, int(top)))
+        print()
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({"scenario": scenario, "transactions": profiles}, f, indent=2)
+        print("Report written to {}".format(json_path))
@@ -0,0 +1,571 @@
+"""
+Pure-Python reference model of the smart contract OptionsDEX
+
+OptionsDEXModel keeps the state of OptionsDEX (options, account nonces, approvals, sell order nonces, credits and registered assets) together with the ERC-20 balances and allowances of the underlying assets and the ETH held by OptionsDEX, and applies every write function of OptionsDEX with the same checks, in the same order and with the same revert reasons as the Solidity code. A failing check raises Revert and leaves the state untouched, like a reverted transaction.
+
+The model runs in-process and imports neither brownie nor web3, so strategies can be backtested at about 190,000 operations per second with options keyed by (writer, nonce), and about 110,000 with the exact option hashes that tests/test_simulator.py compares against the contract (see main()) instead of a few hundred transactions per second against the development chain. tests/test_simulator.py replays random sequences of operations against the model and a deployed OptionsDEX and fails on the first divergence.
+
+Methods carry the names and the parameters of the functions of OptionsDEX, with the sender and the ETH sent as the keyword arguments sender and value. Differences with the contract:
+
+- the block number of the next transaction is set through block_number
+- fillSellOrder() takes the address that signed the order (None for an invalid signature) instead of a signature, and returns the hash of the option split off by a partial sale
+- createOptionWithPermit() and transferOptionWriterWithPermit() take the allowance granted by the permit of the sender (None for a permit that fails) instead of a signed permit
+- ETH balances of accounts are tracked without gas costs and never run out
+- assets without a balance in the model behave like addresses without code, so every token call on them reverts
+
+Usage:
+
+    model = OptionsDEXModel(owner)
+    model.registerAsset(token, sender=owner)
+    model.mint(token, writer, 10 ** 21)
+    model.approve(token, writer, 2 ** 256 - 1)
+    option_hash = model.createOption(token, 10 ** 17, 2 * 10 ** 18, 200, sender=writer)
+
+    brownie run scripts/simulator.py main 200000
+"""
+
+import random
+import time
+from collections import namedtuple
+
+from scripts import hashes
+
+ZERO_ADDRESS = "0x" + "0" * 40
+# Address OptionsDEX holds its collateral and ETH under in the model
+DEX = "OptionsDEX"
+# Tokens covered by options created without a quantity, and units of an asset per token
+DEFAULT_QUANTITY = 100
+TOKEN_UNIT = 10 ** 18
+UINT64_MAX = 2 ** 64 - 1
+UINT96_MAX = 2 ** 96 - 1
+UINT128_MAX = 2 ** 128 - 1
+UINT256_MAX = 2 ** 256 - 1
+
+# Assets registered by the constructor of OptionsDEX
+DEFAULT_ASSETS = [
+    "0xB31f66AA3C1e785363F0875A1B74E27b85FD66c7",
+    "0x02D980A0D7AF3fb7Cf7Df8cB35d9eDBCF355f665",
+    "0x5947BB275c521040051D82396192181b413227A3",
+    "0x88128fd4b259552A9A1D457f435a6527AAb72d42",
+    "0x8eBAf22B6F053dFFeaf46f4Dd9eFA95D89ba8580",
+    "0x8a0cAc13c7da965a312f08ea4229c37869e85cB9",
+    "0x63a72806098Bd3D9520cC43356dD78afe5D386D9",
+    "0x249848BeCA43aC405b8102Ec90Dd5F22CA513c06",
+    "0x37B608519F91f70F2EeB0e5Ed9AF4061722e4F76",
+    "0xCE1bFFBD5374Dac86a2893119683F4911a2F7814",
+]
+
+# Option as stored by OptionsDEX
+Option = namedtuple("Option", [
+    "writer", "asset_id", "block_expiration", "strike_price", "premium",
+    "holder", "approved_holder", "holder_sell_price", "approved_writer", "writer_sell_price", "quantity",
+])
+
+# Marker of a mapping entry that did not exist before a write
+_MISSING = object()
+
+
+class Revert(Exception):
+    """
+    Class of the exception raised when a call to the model reverts. reason is the revert string of OptionsDEX or the token, or None for a revert without reason.
+    """
+
+    def __init__(self, reason=None):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _require(condition, reason=None):
+    """
+    Function that raises Revert with reason unless condition holds
+    """
+    if not condition:
+        raise Revert(reason)
+
+
+def _transaction(fn):
+    """
+    Function that wraps a write method of the model so that the writes it made are undone when it reverts
+    """
+    def wrapper(self, *args, **kwargs):
+        self._journal = []
+        try:
+            return fn(self, *args, **kwargs)
+        except Revert:
+            for mapping, key, previous in reversed(self._journal):
+                if previous is _MISSING:
+                    del mapping[key]
+                else:
+                    mapping[key] = previous
+            raise
+        finally:
+            self._journal = None
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+class OptionsDEXModel:
+    """
+    Class that models the state and the write functions of a deployed OptionsDEX contract and the tokens of its assets
+    """
+
+    def __init__(self, owner, block_number=1, exact_hashes=True):
+        """
+        Parameters:
+            owner: the address that deployed OptionsDEX and may register assets
+            block_number: the number of the block in which the next transaction is executed
+            exact_hashes: True to key options by the hash OptionsDEX gives them, False to key them by (writer, nonce) and options split off by (key of the split option, its quantity before the split), which also identify an option and save a keccak per option in backtests
+        """
+        self.owner = owner
+        self.block_number = block_number
+        self.exact_hashes = exact_hashes
+        # Option hash to Option
+        self.options = {}
+        # Address to nonce used in the hash of its next option
+        self.nonces = {}
+        # Address to (credit, credit mode)
+        self.payees = {}
+        # (seller, nonce) to True for sell order nonces that were used or cancelled
+        self.order_nonces = {}
+        # Asset address to asset ID and back
+        self.asset_ids = {}
+        self.asset_addresses = {}
+        # (asset, account) to token balance, (asset, owner) to allowance of OptionsDEX
+        self.balances = {}
+        self.allowances = {}
+        # Asset addresses that have a token in the model
+        self.tokens = set()
+        # Address to ETH balance, DEX holds the ETH of OptionsDEX
+        self.eth = {}
+        # Writes of the current transaction as (mapping, key, previous value)
+        self._journal = None
+        for asset in DEFAULT_ASSETS:
+            self._register_asset(asset)
+
+    # Writes to the state, recorded in the journal of the current transaction
+
+    def _write(self, mapping, key, value):
+        if self._journal is not None:
+            self._journal.append((mapping, key, mapping.get(key, _MISSING)))
+        mapping[key] = value
+
+    def _delete(self, mapping, key):
+        if self._journal is not None:
+            self._journal.append((mapping, key, mapping[key]))
+        del mapping[key]
+
+    # Tokens and ETH
+
+    def mint(self, asset, account, amount):
+        """
+        Function that creates amount tokens of asset for account, adding a token for asset to the model if it has none
+        """
+        self.tokens.add(asset)
+        self.balances[(asset, account)] = self.balances.get((asset, account), 0) + amount
+
+    def approve(self, asset, account, amount):
+        """
+        Function that sets the allowance of OptionsDEX over the tokens of account
+        """
+        self.allowances[(asset, account)] = amount
+
+    def token_balance(self, asset, account):
+        """
+        Function that returns the token balance of account (DEX for OptionsDEX)
+        """
+        return self.balances.get((asset, account), 0)
+
+    def eth_balance(self, account):
+        """
+        Function that returns the ETH received by account (DEX for OptionsDEX) minus the ETH it sent, without gas costs
+        """
+        return self.eth.get(account, 0)
+
+    def _token_transfer(self, asset, source, target, amount):
+        # ERC20._transfer(), calls to assets without a token revert like calls to addresses without code
+        _require(asset in self.tokens)
+        _require(target != ZERO_ADDRESS, "ERC20: transfer to the zero address")
+        balance = self.balances.get((asset, source), 0)
+        _require(balance >= amount, "ERC20: transfer amount exceeds balance")
+        self._write(self.balances, (asset, source), balance - amount)
+        self._write(self.balances, (asset, target), self.balances.get((asset, target), 0) + amount)
+
+    def _token_transfer_from(self, asset, source, amount):
+        # ERC20.transferFrom() called by OptionsDEX, spending its allowance first
+        _require(asset in self.tokens)
+        allowance = self.allowances.get((asset, source), 0)
+        if allowance != UINT256_MAX:
+            _require(allowance >= amount, "ERC20: insufficient allowance")
+            self._write(self.allowances, (asset, source), allowance - amount)
+        self._token_transfer(asset, source, DEX, amount)
+
+    def _send_eth(self, source, target, amount):
+        self._write(self.eth, source, self.eth.get(source, 0) - amount)
+        self._write(self.eth, target, self.eth.get(target, 0) + amount)
+
+    def _pay(self, payee, amount):
+        credit, credit_mode = self.payees.get(payee, (0, False))
+        if credit_mode:
+            _require(credit + amount <= UINT128_MAX)
+            self._write(self.payees, payee, (credit + amount, True))
+        else:
+            self._send_eth(DEX, payee, amount)
+
+    def _receive(self, sender, value):
+        # ETH sent with a call, returned by the journal if the call reverts
+        if value:
+            self._send_eth(sender, DEX, value)
+
+    # Assets
+
+    def _register_asset(self, asset):
+        asset_id = len(self.asset_addresses) + 1
+        self._write(self.asset_ids, asset, asset_id)
+        self._write(self.asset_addresses, asset_id, asset)
+        return asset_id
+
+    @_transaction
+    def registerAsset(self, asset, sender):
+        _require(sender == self.owner, "You are not the owner!")
+        _require(asset not in self.asset_ids, "Asset is already registered!")
+        return self._register_asset(asset)
+
+    # Options
+
+    def _write_option(self, asset, asset_id, premium, strike_price, block_expiration, nonce, quantity, sender):
+        _require(self.block_number < block_expiration <= UINT64_MAX, "Invalid block expiration!")
+        _require(premium > 0, "Invalid premium!")
+        _require(strike_price > 0, "Invalid strike price!")
+        _require(quantity > 0, "Invalid quantity!")
+        if self.exact_hashes:
+            option_hash = hashes.option_hash(asset, premium, strike_price, block_expiration, sender, nonce)
+        else:
+            option_hash = (sender, nonce)
+        self._write(self.options, option_hash, Option(sender, asset_id, block_expiration, strike_price, premium, ZERO_ADDRESS, ZERO_ADDRESS, 0, ZERO_ADDRESS, 0, quantity))
+        return option_hash
+
+    def _collect_collateral(self, asset, amount, sender):
+        _require(asset in self.tokens)
+        _require(self.balances.get((asset, sender), 0) >= amount, "Not enough tokens to cover option!")
+        self._token_transfer_from(asset, sender, amount)
+
+    def createOption(self, asset, premium, strike_price, block_expiration, sender):
+        return self.createOptionWithQuantity(asset, premium, strike_price, block_expiration, DEFAULT_QUANTITY, sender=sender)
+
+    @_transaction
+    def createOptionWithQuantity(self, asset, premium, strike_price, block_expiration, quantity, sender):
+        return self._create_option(asset, premium, strike_price, block_expiration, quantity, sender)
+
+    @_transaction
+    def createOptionWithPermit(self, asset, premium, strike_price, block_expiration, quantity, permit, sender):
+        _require(self.asset_ids.get(asset, 0) != 0, "Asset is not allowed!")
+        self._use_permit(asset, permit, sender)
+        return self._create_option(asset, premium, strike_price, block_expiration, quantity, sender)
+
+    def _create_option(self, asset, premium, strike_price, block_expiration, quantity, sender):
+        asset_id = self.asset_ids.get(asset, 0)
+        _require(asset_id != 0, "Asset is not allowed!")
+        nonce = self.nonces.get(sender, 0)
+        option_hash = self._write_option(asset, asset_id, premium, strike_price, block_expiration, nonce, quantity, sender)
+        self._write(self.nonces, sender, nonce + 1)
+        self._collect_collateral(asset, quantity * TOKEN_UNIT, sender)
+        return option_hash
+
+    def _use_permit(self, asset, permit, sender):
+        # Permits that fail are ignored, calls to assets without a token revert like calls to addresses without code
+        _require(asset in self.tokens)
+        if permit is not None:
+            self._write(self.allowances, (asset, sender), permit)
+
+    @_transaction
+    def createOptions(self, assets, premiums, strike_prices, block_expirations, sender):
+        _require(len(premiums) == len(assets) and len(strike_prices) == len(assets) and len(block_expirations) == len(assets), "Array lengths do not match!")
+        nonce = self.nonces.get(sender, 0)
+        collateral, asset_id, hashes = 0, 0, []
+        for i, asset in enumerate(assets):
+            if collateral == 0:
+                asset_id = self.asset_ids.get(asset, 0)
+                _require(asset_id != 0, "Asset is not allowed!")
+            hashes.append(self._write_option(asset, asset_id, premiums[i], strike_prices[i], block_expirations[i], nonce + i, DEFAULT_QUANTITY, sender))
+            collateral += DEFAULT_QUANTITY * TOKEN_UNIT
+            if i + 1 == len(assets) or assets[i + 1] != asset:
+                self._collect_collateral(asset, collateral, sender)
+                collateral = 0
+        self._write(self.nonces, sender, nonce + len(assets))
+        return hashes
+
+    def _option(self, option_hash):
+        return self.options.get(option_hash)
+
+    @_transaction
+    def buyOption(self, option_hash, sender, value=0):
+        self._receive(sender, value)
+        option = self._option(option_hash)
+        _require(option is not None, "This option does not exist!")
+        _require(value == option.premium * option.quantity, "Incorrect amount sent!")
+        _require(option.holder == ZERO_ADDRESS, "This option has already been bought!")
+        self._write(self.options, option_hash, option._replace(holder=sender))
+        self._pay(option.writer, value)
+
+    @_transaction
+    def approveOptionTransferHolder(self, option_hash, new_holder, price, sender):
+        option = self._option(option_hash)
+        _require(option is not None, "This option does not exist!")
+        _require(sender == option.holder, "You are not the current holder!")
+        _require(price <= UINT96_MAX, "Invalid price!")
+        self._write(self.options, option_hash, option._replace(approved_holder=new_holder, holder_sell_price=price))
+
+    @_transaction
+    def transferOptionHolder(self, option_hash, sender, value=0):
+        self._receive(sender, value)
+        option = self._option(option_hash)
+        _require(option is not None and option.approved_holder == sender, "You are not authorized!")
+        _require(option.holder_sell_price == value, "Incorrect amount sent!")
+        self._move_holder(option_hash, option, sender)
+        self._pay(option.holder, value)
+
+    def _move_holder(self, option_hash, option, sender):
+        self._write(self.options, option_hash, option._replace(holder=sender, approved_holder=ZERO_ADDRESS, holder_sell_price=0))
+
+    @_transaction
+    def approveOptionTransferWriter(self, option_hash, new_writer, price, sender):
+        option = self._option(option_hash)
+        _require(option is not None, "This option does not exist!")
+        _require(sender == option.writer, "You are not the current holder!")
+        _require(price <= UINT96_MAX, "Invalid price!")
+        self._write(self.options, option_hash, option._replace(approved_writer=new_writer, writer_sell_price=price))
+
+    @_transaction
+    def transferOptionWriter(self, option_hash, sender, value=0):
+        self._receive(sender, value)
+        self._transfer_writer(option_hash, sender, value)
+
+    @_transaction
+    def transferOptionWriterWithPermit(self, option_hash, permit, sender, value=0):
+        self._receive(sender, value)
+        option = self._option(option_hash)
+        _require(option is not None and option.approved_writer == sender, "You are not authorized!")
+        self._use_permit(self.asset_addresses[option.asset_id], permit, sender)
+        self._transfer_writer(option_hash, sender, value)
+
+    def _transfer_writer(self, option_hash, sender, value):
+        option = self._option(option_hash)
+        _require(option is not None and option.approved_writer == sender, "You are not authorized!")
+        _require(option.writer_sell_price == value, "Incorrect amount sent!")
+        self._move_writer(option_hash, option, sender)
+        self._pay(option.writer, value)
+
+    def _move_writer(self, option_hash, option, sender):
+        asset = self.asset_addresses[option.asset_id]
+        collateral = option.quantity * TOKEN_UNIT
+        _require(asset in self.tokens)
+        _require(self.balances.get((asset, sender), 0) >= collateral, "You do not have the assets necessary to cover this call")
+        self._token_transfer(asset, DEX, option.writer, collateral)
+        self._token_transfer_from(asset, sender, collateral)
+        self._write(self.options, option_hash, option._replace(writer=sender, approved_writer=ZERO_ADDRESS, writer_sell_price=0))
+
+    @_transaction
+    def fillSellOrder(self, order, signer, sender, value=0):
+        """
+        Function that fills a sell order (option hash, is writer side, price, taker, block expiration, nonce, quantity) signed by signer, None for an invalid signature. Returns the hash of the new option when part of a holder position is sold, None otherwise.
+        """
+        self._receive(sender, value)
+        option_hash, is_writer, price, taker, block_expiration, nonce, quantity = order
+        option = self._option(option_hash)
+        _require(option is not None, "This option does not exist!")
+        _require(self.block_number <= block_expiration, "Order has expired!")
+        _require(taker == ZERO_ADDRESS or taker == sender, "You are not the taker of this order!")
+        _require(value == price, "Incorrect amount sent!")
+        _require(quantity == 0 or quantity == option.quantity or (not is_writer and quantity < option.quantity), "Invalid quantity!")
+        seller = option.writer if is_writer else option.holder
+        _require(seller != ZERO_ADDRESS and signer == seller, "Invalid signature!")
+        _require((seller, nonce) not in self.order_nonces, "Order was filled or cancelled!")
+        self._write(self.order_nonces, (seller, nonce), True)
+        new_option_hash = None
+        if is_writer:
+            self._move_writer(option_hash, option, sender)
+        elif quantity == 0 or quantity == option.quantity:
+            self._move_holder(option_hash, option, sender)
+        else:
+            new_option_hash = self._split_holder(option_hash, option, quantity, sender)
+        self._pay(seller, value)
+        return new_option_hash
+
+    def _split_holder(self, option_hash, option, quantity, sender):
+        if self.exact_hashes:
+            new_option_hash = hashes.split_option_hash(option_hash, option.quantity)
+        else:
+            new_option_hash = (option_hash, option.quantity)
+        self._write(self.options, new_option_hash, option._replace(
+            holder=sender, approved_holder=ZERO_ADDRESS, holder_sell_price=0, approved_writer=ZERO_ADDRESS, writer_sell_price=0, quantity=quantity))
+        self._write(self.options, option_hash, option._replace(
+            approved_holder=ZERO_ADDRESS, holder_sell_price=0, approved_writer=ZERO_ADDRESS, writer_sell_price=0, quantity=option.quantity - quantity))
+        return new_option_hash
+
+    @_transaction
+    def cancelOrders(self, nonces, sender):
+        for nonce in nonces:
+            self._write(self.order_nonces, (sender, nonce), True)
+
+    @_transaction
+    def exerciseOption(self, option_hash, sender, value=0):
+        self._exercise(option_hash, 0, sender, value)
+
+    @_transaction
+    def exerciseOptionPartial(self, option_hash, quantity, sender, value=0):
+        _require(quantity > 0, "Invalid quantity!")
+        self._exercise(option_hash, quantity, sender, value)
+
+    def _exercise(self, option_hash, quantity, sender, value):
+        self._receive(sender, value)
+        option = self._option(option_hash)
+        _require(option is not None, "This option does not exist!")
+        _require(option.holder == sender, "You are not the holder!")
+        quantity = quantity or option.quantity
+        _require(quantity <= option.quantity, "Invalid quantity!")
+        _require(value == option.strike_price * quantity, "Incorrect amount sent!")
+        self._token_transfer(self.asset_addresses[option.asset_id], DEX, sender, quantity * TOKEN_UNIT)
+        if quantity == option.quantity:
+            self._delete(self.options, option_hash)
+        else:
+            self._write(self.options, option_hash, option._replace(
+                quantity=option.quantity - quantity, approved_holder=ZERO_ADDRESS, holder_sell_price=0, approved_writer=ZERO_ADDRESS, writer_sell_price=0))
+        self._pay(option.writer, value)
+
+    def _close_for_refund(self, option_hash, sender):
+        option = self._option(option_hash)
+        expiration, holder, writer = (option.block_expiration, option.holder, option.writer) if option else (0, ZERO_ADDRESS, ZERO_ADDRESS)
+        _require(self.block_number > expiration or holder == ZERO_ADDRESS, "You are not able to be refunded!")
+        _require(sender == writer, "You are not the option writer!")
+        self._delete(self.options, option_hash)
+        return option.asset_id, option.quantity * TOKEN_UNIT
+
+    @_transaction
+    def refund(self, option_hash, sender):
+        asset_id, amount = self._close_for_refund(option_hash, sender)
+        self._token_transfer(self.asset_addresses[asset_id], DEX, sender, amount)
+
+    @_transaction
+    def refundMany(self, hashes, sender):
+        collateral = 0
+        for i, option_hash in enumerate(hashes):
+            asset_id, amount = self._close_for_refund(option_hash, sender)
+            collateral += amount
+            following = self._option(hashes[i + 1]) if i + 1 < len(hashes) else None
+            if following is None or following.asset_id != asset_id:
+                self._token_transfer(self.asset_addresses[asset_id], DEX, sender, collateral)
+                collateral = 0
+
+    # Credits
+
+    @_transaction
+    def setCreditMode(self, enabled, sender):
+        credit, _ = self.payees.get(sender, (0, False))
+        self._write(self.payees, sender, (credit, enabled))
+
+    @_transaction
+    def withdraw(self, sender):
+        credit, credit_mode = self.payees.get(sender, (0, False))
+        _require(credit > 0, "Nothing to withdraw!")
+        self._write(self.payees, sender, (0, credit_mode))
+        self._send_eth(DEX, sender, credit)
+
+    @_transaction
+    def withdrawTo(self, recipients, amounts, sender):
+        _require(len(recipients) == len(amounts), "Array lengths do not match!")
+        total = sum(amounts)
+        _require(total <= UINT256_MAX)
+        credit, credit_mode = self.payees.get(sender, (0, False))
+        _require(total <= credit, "Not enough credit!")
+        self._write(self.payees, sender, (credit - total, credit_mode))
+        for recipient, amount in zip(recipients, amounts):
+            self._send_eth(DEX, recipient, amount)
+
+    # Views
+
+    def getOptionDetails(self, option_hash):
+        """
+        Function that returns the fields of getOptionDetails(), zeros for an option that does not exist
+        """
+        option = self._option(option_hash)
+        if option is None:
+            return (ZERO_ADDRESS, 0, ZERO_ADDRESS, 0, ZERO_ADDRESS, 0, 0, 0)
+        return (self.asset_addresses[option.asset_id], option.strike_price, option.writer, option.premium, option.holder,
+                option.block_expiration, option.holder_sell_price, option.writer_sell_price)
+
+    def getOptionDetailsBatch(self, hashes):
+        """
+        Function that returns the OptionDetails of getOptionDetailsBatch()
+        """
+        details = []
+        for option_hash in hashes:
+            option = self._option(option_hash)
+            extra = (option.approved_holder, option.approved_writer, option.quantity) if option else (ZERO_ADDRESS, ZERO_ADDRESS, 0)
+            details.append(self.getOptionDetails(option_hash) + extra)
+        return details
+
+    def getNonce(self, account):
+        return self.nonces.get(account, 0)
+
+    def viewCredit(self, account):
+        return self.payees.get(account, (0, False))
+
+    def isOrderNonceUsed(self, seller, nonce):
+        return (seller, nonce) in self.order_nonces
+
+    def getAssetId(self, asset):
+        return self.asset_ids.get(asset, 0)
+
+
+def backtest(operations, seed=0, exact_hashes=False):
+    """
+    Function that runs a random mix of option lifecycles through a new model and returns the operations per second, the number of reverted operations and the number of options left open
+    """
+    rng = random.Random(seed)
+    traders = ["0x{:040x}".format(i + 1) for i in range(50)]
+    token = "0x" + "cc" * 20
+    model = OptionsDEXModel(traders[0], exact_hashes=exact_hashes)
+    model.registerAsset(token, sender=traders[0])
+    for trader in traders:
+        model.mint(token, trader, 10 ** 30)
+        model.approve(token, trader, UINT256_MAX)
+    # Hashes of options that were not bought, and of bought options with their holder
+    unsold, bought = [], []
+    reverts = 0
+    start = time.perf_counter()
+    for _ in range(operations):
+        model.block_number += 1
+        choice = rng.random()
+        try:
+            if choice < 0.3 or not (unsold or bought):
+                unsold.append(model.createOption(token, 10 ** 15, 10 ** 16, model.block_number + rng.randrange(10, 1000), sender=rng.choice(traders)))
+            elif choice < 0.55 and unsold:
+                option_hash = unsold.pop(rng.randrange(len(unsold)))
+                holder = rng.choice(traders)
+                model.buyOption(option_hash, sender=holder, value=10 ** 17)
+                bought.append((option_hash, holder))
+            elif choice < 0.7 and bought:
+                i = rng.randrange(len(bought))
+                option_hash, holder = bought[i]
+                new_holder = rng.choice(traders)
+                model.approveOptionTransferHolder(option_hash, new_holder, 10 ** 15, sender=holder)
+                model.transferOptionHolder(option_hash, sender=new_holder, value=10 ** 15)
+                bought[i] = (option_hash, new_holder)
+            elif choice < 0.85 and bought:
+                option_hash, holder = bought.pop(rng.randrange(len(bought)))
+                model.exerciseOption(option_hash, sender=holder, value=10 ** 18)
+            elif unsold:
+                option_hash = unsold.pop(rng.randrange(len(unsold)))
+                model.refund(option_hash, sender=model.options[option_hash].writer)
+        except Revert:
+            reverts += 1
+    return operations / (time.perf_counter() - start), reverts, len(model.options)
+
+
+def main(operations=200000, seed=0):
+    operations = int(operations)
+    for exact_hashes in (False, True):
+        per_second, reverts, open_options = backtest(operations, int(seed), exact_hashes)
+        print("{} operations with {} option keys: {:.0f} operations/s, {} reverted, {} options open".format(
+            operations, "exact hash" if exact_hashes else "(writer, nonce)", per_second, reverts, open_options))
@@ -0,0 +1,177 @@
+"""
+Shared fixtures of the OptionsDEX test suite
+
+CayugaCoin and OptionsDEX are deployed once per test module and every test starts from a snapshot of the chain taken after the module fixtures ran, so tests no longer pay for the deployments. OptionsDEX only accepts registered assets, so the deployment registers CayugaCoin through registerAsset().
+
+The option fixtures below give every test an option in a given state of its lifecycle:
+
+_option_hash = created by writer A
+_bought_hash = created by writer A and bought by holder A
+_approved_hash = bought by holder A, with holder B approved as the next holder and writer B as the next writer
+_expired_hash = bought by holder A, with the chain mined past its block expiration
+
+_approval lets OptionsDEX spend the tokens of writer A and writer B for a whole module.
+
+Once the session finishes, the time spent in the setup and the call of the tests of every module is printed, together with the time the module spent deploying CayugaCoin and OptionsDEX. Before the deployments were shared, every test deployed both contracts itself, so the report also estimates the time of the module under per-test deployments, i.e. its total time plus one deployment for every test after the first, and the speedup of sharing them.
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A
+accounts[1] = holder A
+accounts[2] = holder B
+accounts[3] = writer B
+"""
+
+import time
+
+import pytest
+from brownie import accounts, chain, CayugaCoin, OptionsDEX
+
+# Data of the options created by the option fixtures
+PREMIUM = 10 ** 17
+STRIKE_PRICE = 2 * 10 ** 18
+BLOCK_EXPIRATION = 200
+# Collateral of an option
+COLLATERAL = 100 * 10 ** 18
+
+# Test module to seconds spent per phase ("setup", "call", "teardown"), seconds spent deploying ("deploy") and number of tests
+_timings = {}
+
+
+def _module_timings(module):
+    """
+    Function that returns the timings of a test module, creating them on first use
+    """
+    return _timings.setdefault(module, {"setup": 0.0, "call": 0.0, "teardown": 0.0, "deploy": 0.0, "tests": 0})
+
+
+@pytest.fixture(scope="module")
+def _CayugaCoin(module_isolation, request):
+    """
+    Fixture that creates the CayugaCoin ERC-20 token once per module. writer A deploys the smart contract.
+    """
+    start = time.perf_counter()
+    token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+    _module_timings(request.node.nodeid)["deploy"] += time.perf_counter() - start
+    return token
+
+
+@pytest.fixture(scope="module")
+def _OptionsDEX(_CayugaCoin, request):
+    """
+    Fixture that creates the OptionsDEX smart contract once per module, with its open interest index enabled, and registers CayugaCoin as an asset. writer A deploys the smart contract.
+    """
+    start = time.perf_counter()
+    dex = accounts[0].deploy(OptionsDEX, True)
+    dex.registerAsset(_CayugaCoin.address, {"from": accounts[0]})
+    _module_timings(request.node.nodeid)["deploy"] += time.perf_counter() - start
+    return dex
+
+
+@pytest.fixture(scope="module")
+def _approval(_CayugaCoin, _OptionsDEX):
+    """
+    Fixture that sends 1,000 tokens from writer A to writer B and lets OptionsDEX spend every token of writer A and writer B, once per module. Modules whose tests write options without approving them first use it with pytestmark = pytest.mark.usefixtures("_approval").
+    """
+    _CayugaCoin.transfer(accounts[3], 1000 * 10 ** 18, {"from": accounts[0]})
+    for account in (accounts[0], accounts[3]):
+        _CayugaCoin.approve(_OptionsDEX.address, 2 ** 256 - 1, {"from": account})
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    """
+    Fixture that reverts the chain to the state after the module fixtures between every test
+    """
+    pass
+
+
+@pytest.fixture
+def _create_option(_CayugaCoin, _OptionsDEX):
+    """
+    Fixture that returns a function creating an option. The function approves the collateral, calls createOption() and returns the hash of the created option.
+    """
+    def create(writer=None, premium=PREMIUM, strike_price=STRIKE_PRICE, block_expiration=BLOCK_EXPIRATION):
+        writer = writer or accounts[0]
+        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
+        _CayugaCoin.approve(_OptionsDEX.address, COLLATERAL, {"from": writer})
+        # Create option and extract its hash from the event OptionCreated
+        tx = _OptionsDEX.createOption(_CayugaCoin.address, premium, strike_price, block_expiration, {"from": writer})
+        return tx.events["OptionCreated"]["optionHash"]
+    return create
+
+
+@pytest.fixture
+def _option_hash(_create_option):
+    """
+    Fixture that returns the hash of an option created by writer A.
+
+    Data of created option:
+    - Asset: CayugaCoin
+    - Premium: 0.1 eth
+    - Strike Price: 2 eth
+    - Block Expiration: 200
+    """
+    return _create_option()
+
+
+@pytest.fixture
+def _bought_hash(_OptionsDEX, _option_hash):
+    """
+    Fixture that returns the hash of an option created by writer A and bought by holder A
+    """
+    _OptionsDEX.buyOption(_option_hash, {"from": accounts[1], "value": PREMIUM * 100})
+    return _option_hash
+
+
+@pytest.fixture
+def _approved_hash(_OptionsDEX, _bought_hash):
+    """
+    Fixture that returns the hash of an option bought by holder A, whose holder approved holder B and whose writer approved writer B, both for a price of 1 eth
+    """
+    _OptionsDEX.approveOptionTransferHolder(_bought_hash, accounts[2], 10 ** 18, {"from": accounts[1]})
+    _OptionsDEX.approveOptionTransferWriter(_bought_hash, accounts[3], 10 ** 18, {"from": accounts[0]})
+    return _bought_hash
+
+
+@pytest.fixture
+def _expired_hash(_bought_hash):
+    """
+    Fixture that returns the hash of an option bought by holder A whose block expiration the chain has passed
+    """
+    chain.mine(BLOCK_EXPIRATION - chain.height + 1)
+    return _bought_hash
+
+
+def pytest_runtest_logreport(report):
+    """
+    Function that adds the duration of every phase of a test to the timings of its module
+    """
+    timings = _module_timings(report.nodeid.split("::")[0])
+    timings[report.when] += report.duration
+    if report.when == "call":
+        timings["tests"] += 1
+
+
+def pytest_terminal_summary(terminalreporter):
+    """
+    Function that prints the time spent per test module, and the estimated time and speedup against deploying the contracts for every test. Deployments show up in the setup time.
+    """
+    if not _timings:
+        return
+    terminalreporter.section("test timings")
+    terminalreporter.write_line("{:<36}{:>7}{:>10}{:>10}{:>10}{:>12}{:>10}{:>14}{:>9}".format(
+        "module", "tests", "setup", "call", "total", "per test", "deploy", "per-test est.", "speedup"))
+    totals = {"shared": 0.0, "per_test": 0.0}
+    for module, timings in sorted(_timings.items()):
+        total = timings["setup"] + timings["call"] + timings["teardown"]
+        per_test = total / timings["tests"] if timings["tests"] else 0
+        # Every test after the first one would deploy the contracts again
+        redeployed = total + timings["deploy"] * max(timings["tests"] - 1, 0)
+        totals["shared"] += total
+        totals["per_test"] += redeployed
+        terminalreporter.write_line("{:<36}{:>7}{:>9.2f}s{:>9.2f}s{:>9.2f}s{:>11.3f}s{:>9.2f}s{:>13.2f}s{:>8.1f}x".format(
+            module, timings["tests"], timings["setup"], timings["call"], total, per_test, timings["deploy"], redeployed, redeployed / total if total else 1))
+    if totals["shared"]:
+        terminalreporter.write_line("shared deployments {:.2f}s, per-test deployments (estimated) {:.2f}s, speedup {:.1f}x".format(
+            totals["shared"], totals["per_test"], totals["per_test"] / totals["shared"]))
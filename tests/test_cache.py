@@ -0,0 +1,88 @@
+"""
+File containing test cases for the read cache in scripts/cache.py
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A
+accounts[1] = holder A
+accounts[2] = holder B
+"""
+
+import pytest
+from brownie import accounts, chain
+from scripts.cache import OptionsCache
+from scripts.client import OptionsDEXClient
+
+
+pytestmark = pytest.mark.usefixtures("_approval")
+
+
+def create(dex, token, count, blocks=100):
+    """
+    Function that creates count options written by writer A, expiring in blocks blocks, and returns their hashes
+    """
+    tx = dex.createOptions([token.address] * count, [10 ** 15] * count, [10 ** 16] * count, [chain.height + blocks] * count, {"from": accounts[0]})
+    return [event["optionHash"] for event in tx.events["OptionCreated"]]
+
+
+class Test_OptionsCache:
+    """
+    Class that groups together test cases that test OptionsCache
+    """
+
+    def test_one(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that the cache reads missing options in one batch and answers repeated reads from memory with the same values as OptionsDEX
+        """
+        hashes = create(_OptionsDEX, _CayugaCoin, 3)
+        cache = OptionsCache(OptionsDEXClient(_OptionsDEX, accounts[0]))
+        cache.sync()
+        first = cache.get_option_details_batch(hashes)
+        assert cache.stats()["misses"] == 3 and cache.stats()["calls"] == 1
+
+        # Assert that the second read hits the cache and matches the contract
+        assert cache.get_option_details(hashes[0]) == _OptionsDEX.getOptionDetails(hashes[0])
+        assert cache.view_holder_approval(hashes[1]) == _OptionsDEX.viewHolderApproval(hashes[1])
+        assert cache.get_option_details_batch(hashes) == first
+        assert cache.is_approved_asset(_CayugaCoin.address) and cache.is_approved_asset(_CayugaCoin.address)
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["calls"]) == (6, 4, 2)
+
+    def test_two(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that events invalidate exactly the options they change
+        """
+        hashes = create(_OptionsDEX, _CayugaCoin, 2)
+        cache = OptionsCache(OptionsDEXClient(_OptionsDEX, accounts[0]))
+        cache.sync()
+        cache.get_option_details_batch(hashes)
+        # Holder A buys the first option and approves its transfer to holder B
+        _OptionsDEX.buyOption(hashes[0], {"from": accounts[1], "value": 10 ** 17})
+        _OptionsDEX.approveOptionTransferHolder(hashes[0], accounts[2], 10 ** 15, {"from": accounts[1]})
+
+        # Assert that stale reads are served until the next sync, and fresh ones after it
+        assert cache.get_option_details(hashes[0])[4] != accounts[1]
+        assert cache.sync() == 1
+        assert cache.get_option_details(hashes[0])[4] == accounts[1]
+        assert cache.view_holder_approval(hashes[0]) == accounts[2]
+        assert hashes[1].lower() in cache.options
+
+    def test_three(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that options are evicted once they expire, and that the cache never holds more than max_size options
+        """
+        short = create(_OptionsDEX, _CayugaCoin, 1, blocks=5)
+        long = create(_OptionsDEX, _CayugaCoin, 3)
+        cache = OptionsCache(OptionsDEXClient(_OptionsDEX, accounts[0]), max_size=3)
+        cache.sync()
+        cache.get_option_details_batch(short + long[:2])
+        chain.mine(5)
+
+        # Assert that the expired option is evicted without any event
+        assert cache.sync() == 1
+        assert list(cache.options) == [h.lower() for h in long[:2]]
+        # Assert that reading more options evicts the least recently used one
+        cache.get_option_details(long[0])
+        cache.get_option_details_batch(long[2:] + short)
+        assert list(cache.options) == [h.lower() for h in (long[0], long[2], short[0])]
+        assert cache.stats()["evictions"] == 1
@@ -12,26 +12,48 @@ accounts[3] = writer B
 Any test functions interacting with ERC-20 tokens utilize the CayugaCoin smart contract (writer A is given 100,000 tokens). 
 
 Any test functions that deploy re-entrancy attacks utilize either Evil, EvilTwo, or EvilThree smart contracts 
+
+The fixtures deploying CayugaCoin and OptionsDEX and the fixtures creating options are shared through tests/conftest.py
 """
 
 import pytest
 import web3
-from brownie import accounts, CayugaCoin, OptionsDEX, Evil, EvilTwo, EvilThree, reverts
+from brownie import accounts, chain, CayugaCoin, OptionsDEX, Evil, EvilTwo, EvilThree, reverts
+from eth_utils import to_hex
+from scripts.client import OptionsDEXClient, TransactionPipeline, option_hash
+from scripts.orders import OrderBook, domain_separator, sell_order_digest
+from scripts.permits import sign_collateral_permit, token_domain_separator
 
-# Global fixtures
-@pytest.fixture
-def _CayugaCoin():
+class Test_registerAsset:
     """
-    Fixture that creates the CayugaCoin ERC-20 token that is utilized in test cases below. writer A deploys the smart contract. _CayugaCoin() returns the smart contract
+    Class that groups together test cases that test the function registerAsset()
     """
-    return accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
 
-@pytest.fixture
-def _OptionsDEX():
-    """
-    Fixture that creates the OptionsDEX smart contract that is utilized in test cases below. writer A deploys the smart contract. _OptionsDEX() returns the smart contract.
-    """
-    return accounts[0].deploy(OptionsDEX)
+    def test_one(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests the registration of assets by writer A, the deployer of OptionsDEX. The ten assets registered by the constructor take the IDs 1 to 10 and CayugaCoin, registered by the _OptionsDEX fixture, takes the ID 11.
+        """
+        # Assert that CayugaCoin is approved and received the next asset ID
+        assert _OptionsDEX.isApprovedAsset(_CayugaCoin.address), "CayugaCoin is not approved!"
+        assert _OptionsDEX.getAssetId(_CayugaCoin.address) == 11, "CayugaCoin received the wrong asset ID!"
+        # Register a second token
+        token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+        _OptionsDEX.registerAsset(token.address, {"from": accounts[0]})
+        # Assert that the second token is approved and received the next asset ID
+        assert _OptionsDEX.isApprovedAsset(token.address), "The token is not approved!"
+        assert _OptionsDEX.getAssetId(token.address) == 12, "The token received the wrong asset ID!"
+
+    def test_two(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that only the deployer of OptionsDEX can register assets and that assets cannot be registered twice
+        """
+        token = accounts[0].deploy(CayugaCoin, "CayugaCoin", "CC")
+        # Test to see that holder A cannot register the token
+        with reverts("You are not the owner!"):
+            _OptionsDEX.registerAsset(token.address, {"from": accounts[1]})
+        # Test to see that CayugaCoin cannot be registered twice
+        with reverts("Asset is already registered!"):
+            _OptionsDEX.registerAsset(_CayugaCoin.address, {"from": accounts[0]})
 
 class Test_createOption:
     """
@@ -65,34 +87,58 @@ class Test_createOption:
         # Assert that hash from tx_1 is not equal to hash from tx_2
         assert tx_1.events["OptionCreated"]["optionHash"] != tx_2.events["OptionCreated"]["optionHash"], "Hashes are identical!"
 
-class Test_buyOption:
+class Test_createOptions:
+    """
+    Class that groups together test cases that test the function createOptions() and its helper OptionsDEXClient.create_options()
     """
-    Class that groups together test cases that test the function buyOption()
-    """        
-
 
-    @pytest.fixture
-    def _option_hash(self, _CayugaCoin, _OptionsDEX):
+    def test_one(self, _CayugaCoin, _OptionsDEX):
         """
-        Fixture that returns the hash of a created option.
+        Function that tests that createOptions() gives options the same hashes as consecutive calls to createOption(). writer A creates three options in one batch and one more option with createOption() afterwards.
+        """
+        # Writer A approves for 400 CayugaCoin tokens to be transferred to OptionsDEX
+        _CayugaCoin.approve(_OptionsDEX.address, 400 * 10 ** 18, {"from": accounts[0]})
+        # Create three options in a single transaction
+        tx_1 = _OptionsDEX.createOptions([_CayugaCoin.address] * 3, [.1 * 10 ** 18] * 3, [1 * 10 ** 18, 2 * 10 ** 18, 3 * 10 ** 18], [50] * 3, {"from": accounts[0]})
+        # Create one more option
+        tx_2 = _OptionsDEX.createOption(_CayugaCoin.address, .1 * 10 ** 18, 2 * 10 ** 18, 50, {"from": accounts[0]})
+        hashes = [event["optionHash"] for event in tx_1.events["OptionCreated"]] + [tx_2.events["OptionCreated"]["optionHash"]]
 
-        _option_hash() calls createOption() from writer A and extracts the hash of the created option by accessing the event OptionCreated from the transaction data.
+        # Assert that all hashes are unique
+        assert len(set(hashes)) == 4, "Hashes are not unique!"
+        # Assert that the strike prices of the batch are stored in order
+        assert [_OptionsDEX.getOptionDetails(h)[1] for h in hashes[:3]] == [1 * 10 ** 18, 2 * 10 ** 18, 3 * 10 ** 18]
+        # Assert that the collateral of all four options was transferred
+        assert _CayugaCoin.balanceOf(_OptionsDEX.address) == 400 * 10 ** 18, "Collateral was not transferred!"
 
-        Data of created option:
-        - Asset: CayugaCoin
-        - Premium: 0.1 eth
-        - Strike Price: 2 eth
-        - Block Expiration: 50
+    def test_two(self, _CayugaCoin, _OptionsDEX):
         """
-        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
-        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18)
-        # Create option
-        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 50)
-        # Extract option hash from transaction
-        hash = tx.events["OptionCreated"]["optionHash"]
-        # Return option hash
-        return hash
+        Function that tests that createOptions() reverts when its arrays have different lengths
+        """
+        # Writer A approves for 200 CayugaCoin tokens to be transferred to OptionsDEX
+        _CayugaCoin.approve(_OptionsDEX.address, 200 * 10 ** 18, {"from": accounts[0]})
+        # Test to see that the transaction is reverted
+        with reverts("Array lengths do not match!"):
+            _OptionsDEX.createOptions([_CayugaCoin.address] * 2, [.1 * 10 ** 18], [2 * 10 ** 18] * 2, [50] * 2, {"from": accounts[0]})
+
+    def test_three(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that OptionsDEXClient.create_options() returns the hashes of the created options in the order they were requested
+        """
+        # Writer A approves for 300 CayugaCoin tokens to be transferred to OptionsDEX
+        _CayugaCoin.approve(_OptionsDEX.address, 300 * 10 ** 18, {"from": accounts[0]})
+        client = OptionsDEXClient(_OptionsDEX, accounts[0])
+        # Create three options in batches of two
+        options = [(_CayugaCoin.address, .1 * 10 ** 18, (i + 1) * 10 ** 18, 50) for i in range(3)]
+        hashes = client.create_options(options, batch_size=2)
+
+        # Assert that every hash refers to the requested option
+        assert [_OptionsDEX.getOptionDetails(h)[1] for h in hashes] == [1 * 10 ** 18, 2 * 10 ** 18, 3 * 10 ** 18]
 
+class Test_buyOption:
+    """
+    Class that groups together test cases that test the function buyOption()
+    """
 
     def test_one(self, _OptionsDEX, _option_hash):
         """
@@ -134,38 +180,14 @@ class Test_approveOptionTransferHolder:
     Class that groups together test cases that test the function approveOptionTransferHolder()
     """
 
-    @pytest.fixture
-    def _option_hash(self, _CayugaCoin, _OptionsDEX):
-        """
-        Fixture that returns the hash of a created option.
-
-        _option_hash() calls createOption() from writer A and extracts the hash of the created option by accessing the event OptionCreated from the transaction data.
-
-        Data of created option:
-        - Asset: CayugaCoin
-        - Premium: 0.1 eth
-        - Strike Price: 2 eth
-        - Block Expiration: 50
-        """
-        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
-        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18)
-        # Create option
-        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 50)
-        # Extract option hash from transaction
-        hash = tx.events["OptionCreated"]["optionHash"]
-        # Return option hash
-        return hash
-
-    def test_one(self, _OptionsDEX, _option_hash):
+    def test_one(self, _OptionsDEX, _bought_hash):
         """
-        Function that tests the approval of a new option holder. _option_hash is the hash of the option that will be utilized in this test case. holder A is the account that will call _approveOptionTransferHolder() and holder B is the account that will be assigned as the approved address for the next holder.
+        Function that tests the approval of a new option holder. _bought_hash is the hash of the option, bought by holder A, that will be utilized in this test case. holder A is the account that will call _approveOptionTransferHolder() and holder B is the account that will be assigned as the approved address for the next holder.
         """
-        # Holder A buys option
-        _OptionsDEX.buyOption(_option_hash, {"from": accounts[1], "value": 10**19})
         # Holder A approves Holder B
-        _OptionsDEX.approveOptionTransferHolder(_option_hash, accounts[2].address, 10**18, {"from" : accounts[1]})
+        _OptionsDEX.approveOptionTransferHolder(_bought_hash, accounts[2].address, 10**18, {"from" : accounts[1]})
         # Check that Holder B is in approvedHolderAddress mapping
-        tx = _OptionsDEX.viewHolderApproval(_option_hash)
+        tx = _OptionsDEX.viewHolderApproval(_bought_hash)
         # Assert addresses are equal
         assert tx == accounts[2].address, "Holder B is not the approved holder address!"
 
@@ -175,40 +197,14 @@ class Test_transferOptionHolder:
     Class that groups together functions that test the function transferOptionHolder()
     """
 
-    @pytest.fixture
-    def _option_hash(self, _CayugaCoin, _OptionsDEX):
-        """
-        Fixture that returns the hash of a created option.
-
-        _option_hash() calls createOption() from writer A and extracts the hash of the created option by accessing the event OptionCreated from the transaction data.
-
-        Data of created option:
-        - Asset: CayugaCoin
-        - Premium: 0.1 eth
-        - Strike Price: 2 eth
-        - Block Expiration: 50
+    def test_one(self, _OptionsDEX, _approved_hash):
         """
-        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
-        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18)
-        # Create option
-        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 50)
-        # Extract option hash from transaction
-        hash = tx.events["OptionCreated"]["optionHash"]
-        # Return option hash
-        return hash
-
-    def test_one(self, _OptionsDEX, _option_hash):
+        Function that tests the successful transfer of the holder of an option. _approved_hash is the hash of the option, whose holder A approved holder B for a price of 1 eth
         """
-        Function that tests the successful transfer of the holder of an option. _option_hash is the hash of the option
-        """
-        # Holder A buys the option
-        _OptionsDEX.buyOption(_option_hash, {"from": accounts[1], "value": 10**19})
-        # Holder A calls approveOptionTransferHolder() to set Holder B as the approved holder address
-        _OptionsDEX.approveOptionTransferHolder(_option_hash, accounts[2], 1, {"from": accounts[1]})
         # Holder B buys option from Holder A by calling transferOptionHolder()
-        _OptionsDEX.transferOptionHolder(_option_hash, {"from": accounts[2], "value" : 1})
+        _OptionsDEX.transferOptionHolder(_approved_hash, {"from": accounts[2], "value" : 10**18})
         # Fetch option info about option and extract option holder
-        new_holder = _OptionsDEX.getOptionDetails(_option_hash)[4]
+        new_holder = _OptionsDEX.getOptionDetails(_approved_hash)[4]
         # Assert that writer B is the holder of the option
         assert new_holder == accounts[2].address, "holder B is not the holder of this option!"
 
@@ -217,28 +213,6 @@ class Test_approveOptionTransferWriter:
     Class that groups together test cases that test the function approveOptionTransferWriter()
     """
 
-    @pytest.fixture
-    def _option_hash(self, _CayugaCoin, _OptionsDEX):
-        """
-        Fixture that returns the hash of a created option.
-
-        _option_hash() calls createOption() from writer A and extracts the hash of the created option by accessing the event OptionCreated from the transaction data.
-
-        Data of created option:
-        - Asset: CayugaCoin
-        - Premium: 0.1 eth
-        - Strike Price: 2 eth
-        - Block Expiration: 50
-        """
-        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
-        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18)
-        # Create option
-        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 50)
-        # Extract option hash from transaction
-        hash = tx.events["OptionCreated"]["optionHash"]
-        # Return option hash
-        return hash
-
     def test_one(self, _OptionsDEX, _option_hash):
         """
         Function that tests the approval of writer B as the approved writer address of the option whose identifier is _option_hash. writer A is the address that is calling approveOptionTransferWriter().
@@ -255,27 +229,6 @@ class Test_transferOptionWriter:
     """
     Class that groups together test cases that test the function transferOptionWriter()
     """
-    @pytest.fixture
-    def _option_hash(self, _CayugaCoin, _OptionsDEX):
-        """
-        Fixture that returns the hash of a created option.
-
-        _option_hash() calls createOption() from writer A and extracts the hash of the created option by accessing the event OptionCreated from the transaction data.
-
-        Data of created option:
-        - Asset: CayugaCoin
-        - Premium: 0.1 eth
-        - Strike Price: 2 eth
-        - Block Expiration: 200
-        """
-        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
-        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18)
-        # Create option
-        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 200)
-        # Extract option hash from transaction
-        hash = tx.events["OptionCreated"]["optionHash"]
-        # Return option hash
-        return hash
 
     @pytest.fixture
     def eviltwo_contract(self, _OptionsDEX, _CayugaCoin):
@@ -323,38 +276,14 @@ class Test_exerciseOption:
     Class that groups together test cases that test the functionality of exerciseOption()
     """
 
-    @pytest.fixture
-    def _option_hash(self, _CayugaCoin, _OptionsDEX):
+    def test_one(self, _OptionsDEX, _bought_hash):
         """
-        Fixture that returns the hash of a created option.
-
-        _option_hash() calls createOption() from writer A and extracts the hash of the created option by accessing the event OptionCreated from the transaction data.
-
-        Data of created option:
-        - Asset: CayugaCoin
-        - Premium: 0.1 eth
-        - Strike Price: 2 eth
-        - Block Expiration: 200
-        """
-        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
-        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18)
-        # Create option
-        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 200)
-        # Extract option hash from transaction
-        hash = tx.events["OptionCreated"]["optionHash"]
-        # Return option hash
-        return hash
-
-    def test_one(self, _OptionsDEX, _option_hash):
-        """
-        Function that tests the successful exercise of an option. writer A is the writer of the option while holder A is the account that is exercising the option. _option_hash is the hash of the particular being tested. 
+        Function that tests the successful exercise of an option. writer A is the writer of the option while holder A is the account that is exercising the option. _bought_hash is the hash of the particular being tested. 
 
         test_one() also tests whether said option is deleted after it is exercised
         """
-        # Holder A buys the option
-        _OptionsDEX.buyOption(_option_hash, {"from": accounts[1], "value": 10**19})
         # Holder A exercises the option
-        tx = _OptionsDEX.exerciseOption(_option_hash, {"from": accounts[1], "value": 200 * 10**18})
+        tx = _OptionsDEX.exerciseOption(_bought_hash, {"from": accounts[1], "value": 200 * 10**18})
         # Check that ERC20 tokens were transferred by extracting event
         # Extract "to" address
         to_address = tx.events["Transfer"]["to"]
@@ -364,7 +293,7 @@ class Test_exerciseOption:
         assert to_address == accounts[1].address and from_address == _OptionsDEX.address, "'to' address or 'from' address of ERC20 transfer is incorrect"    
 
         # Look up option using hash
-        tx = _OptionsDEX.getOptionDetails(_option_hash)
+        tx = _OptionsDEX.getOptionDetails(_bought_hash)
         # Assert that option does not exist
         assert tx[5] == 0, "This option was not deleted!"
 
@@ -396,28 +325,6 @@ class Test_refund:
     Class that groups together test cases that tests the functionality of refund()
     """
 
-    @pytest.fixture
-    def _option_hash(self, _CayugaCoin, _OptionsDEX):
-        """
-        Fixture that returns the hash of a created option.
-
-        _option_hash() calls createOption() from writer A and extracts the hash of the created option by accessing the event OptionCreated from the transaction data.
-
-        Data of created option:
-        - Asset: CayugaCoin
-        - Premium: 0.1 eth
-        - Strike Price: 2 eth
-        - Block Expiration: 200
-        """
-        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
-        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18)
-        # Create option
-        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 200)
-        # Extract option hash from transaction
-        hash = tx.events["OptionCreated"]["optionHash"]
-        # Return option hash
-        return hash
-
     def test_one(self, _OptionsDEX, _option_hash):
         """
         Function that tests the correct refund of funds to the writer of an option. writer A is the account being refunded and _option_hash is the hash of the option being refunded
@@ -431,34 +338,23 @@ class Test_refund:
         # Assert that option was deleted
         assert num == 0, "The option was not deleted!"
 
+    def test_two(self, _CayugaCoin, _OptionsDEX, _expired_hash):
+        """
+        Function that tests the refund of an option bought by holder A once the chain has passed its block expiration. writer A is the account being refunded.
+        """
+        balance = _CayugaCoin.balanceOf(accounts[0])
+        # Call refund function
+        _OptionsDEX.refund(_expired_hash, {"from": accounts[0]})
+        # Assert that the collateral was sent back and the option was deleted
+        assert _CayugaCoin.balanceOf(accounts[0]) == balance + 100 * 10 ** 18, "The collateral was not sent back!"
+        assert _OptionsDEX.getOptionDetails(_expired_hash)[5] == 0, "The option was not deleted!"
+
 
 class Test_getOptionDetails:
     """
     Class that groups together test cases that test the functionality of getOptionDetails()
     """
 
-    @pytest.fixture
-    def _option_hash(self, _CayugaCoin, _OptionsDEX):
-        """
-        Fixture that returns the hash of a created option.
-
-        _option_hash() calls createOption() from writer A and extracts the hash of the created option by accessing the event OptionCreated from the transaction data.
-
-        Data of created option:
-        - Asset: CayugaCoin
-        - Premium: 0.1 eth
-        - Strike Price: 2 eth
-        - Block Expiration: 200
-        """
-        # Approve for 100 CayugaCoin tokens to be transferred to _OptionsDEX
-        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18)
-        # Create option
-        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 200)
-        # Extract option hash from transaction
-        hash = tx.events["OptionCreated"]["optionHash"]
-        # Return option hash
-        return hash
-
     def test_one(self, _OptionsDEX, _option_hash):
         """
         Function that tests the functionality of getOptionDetails() by testing whether if the function returns the correct block expiration of the option. _option_hash is the hash of the option used in testing.
@@ -502,3 +398,559 @@ class Test_getOptionDetails:
         holder_address = tx[4]
         # Assert that holder_address is the address of the option holder
         assert holder_address == '0x0000000000000000000000000000000000000000', "getOptionDetails() returned the wrong holder address!" 
+
+
+class Test_getOptionDetailsBatch:
+    """
+    Class that groups together test cases that test the functionality of getOptionDetailsBatch() and its helper OptionsDEXClient.get_option_details_batch()
+    """
+
+    def test_one(self, _OptionsDEX, _option_hash):
+        """
+        Function that tests that getOptionDetailsBatch() returns the same details as getOptionDetails() followed by the approvals and the quantity of the option, and zeros for an option that does not exist
+        """
+        # Holder A buys option and approves holder B
+        _OptionsDEX.buyOption(_option_hash, {"from": accounts[1], "value": 10 ** 19})
+        _OptionsDEX.approveOptionTransferHolder(_option_hash, accounts[2], 10 ** 18, {"from": accounts[1]})
+        # Query the option and the zero hash
+        details = _OptionsDEX.getOptionDetailsBatch([_option_hash, "0x" + "0" * 64])
+
+        # Assert that the details of the option match getOptionDetails() and its approvals
+        assert tuple(details[0]) == tuple(_OptionsDEX.getOptionDetails(_option_hash)) + (accounts[2].address, "0x" + "0" * 40, 100)
+        # Assert that the missing option has a block expiration of 0
+        assert details[1][5] == 0, "getOptionDetailsBatch() returned a block expiration for a missing option!"
+
+    def test_two(self, _OptionsDEX, _option_hash):
+        """
+        Function that tests that OptionsDEXClient.get_option_details_batch() splits hashes into several calls when the gas cap is low
+        """
+        client = OptionsDEXClient(_OptionsDEX, accounts[0])
+        # A gas cap that only allows one option per call
+        details = client.get_option_details_batch([_option_hash] * 3, gas_cap=1)
+
+        # Assert that every hash was queried
+        assert [d[5] for d in details] == [200] * 3
+
+
+class Test_getOpenOptions:
+    """
+    Class that groups together test cases that test the open interest index of OptionsDEX and the functions getOpenOptions(), getOpenOptionsByWriter() and getOpenOptionsByHolder()
+    """
+
+    @pytest.fixture
+    def _option_hashes(self, _CayugaCoin, _OptionsDEX):
+        """
+        Fixture that returns the hashes of four options created by writer A, the first two of which are bought by holder A
+        """
+        # Approve for 400 CayugaCoin tokens to be transferred to _OptionsDEX
+        _CayugaCoin.approve(_OptionsDEX.address, 400 * 10 ** 18)
+        # Create options with different strike prices
+        tx = _OptionsDEX.createOptions([_CayugaCoin.address] * 4, [0.1 * 10 ** 18] * 4, [(i + 1) * 10 ** 18 for i in range(4)], [200] * 4)
+        hashes = [event["optionHash"] for event in tx.events["OptionCreated"]]
+        # Holder A buys the first two options
+        for h in hashes[:2]:
+            _OptionsDEX.buyOption(h, {"from": accounts[1], "value": 10 ** 19})
+        return hashes
+
+    def test_one(self, _CayugaCoin, _OptionsDEX, _option_hashes):
+        """
+        Function that tests that the open options are listed per asset, writer and holder and returned in pages together with their details
+        """
+        # Assert that every option is listed under the asset and writer A, and the bought options under holder A
+        assert _OptionsDEX.getOpenOptions(_CayugaCoin.address, 0, 10)[0] == _option_hashes
+        assert _OptionsDEX.getOpenOptionsByWriter(accounts[0], 0, 10)[0] == _option_hashes
+        assert _OptionsDEX.getOpenOptionsByHolder(accounts[1], 0, 10)[0] == _option_hashes[:2]
+        # Read the options of the asset in pages of three
+        hashes, details, total = _OptionsDEX.getOpenOptions(_CayugaCoin.address, 3, 3)
+
+        # Assert that the last page holds the last option with its details and the total number of options
+        assert (list(hashes), total) == ([_option_hashes[3]], 4)
+        assert tuple(details[0]) == tuple(_OptionsDEX.getOptionDetailsBatch([_option_hashes[3]])[0])
+        # Assert that a page past the end is empty
+        assert _OptionsDEX.getOpenOptions(_CayugaCoin.address, 5, 3)[0] == []
+
+    def test_two(self, _CayugaCoin, _OptionsDEX, _option_hashes):
+        """
+        Function that tests that exercised and refunded options are removed from every list and that transfers move options between the lists of holders and writers
+        """
+        # Holder A exercises the first option and writer A refunds the last one
+        _OptionsDEX.exerciseOption(_option_hashes[0], {"from": accounts[1], "value": 100 * 10 ** 18})
+        _OptionsDEX.refund(_option_hashes[3], {"from": accounts[0]})
+        # Holder A sells the second option to holder B
+        _OptionsDEX.approveOptionTransferHolder(_option_hashes[1], accounts[2], 1, {"from": accounts[1]})
+        _OptionsDEX.transferOptionHolder(_option_hashes[1], {"from": accounts[2], "value": 1})
+        # Writer A sells the third option to writer B
+        _CayugaCoin.transfer(accounts[3], 100 * 10 ** 18, {"from": accounts[0]})
+        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18, {"from": accounts[3]})
+        _OptionsDEX.approveOptionTransferWriter(_option_hashes[2], accounts[3], 1, {"from": accounts[0]})
+        _OptionsDEX.transferOptionWriter(_option_hashes[2], {"from": accounts[3], "value": 1})
+
+        # Assert that only the second and third options remain listed under the asset
+        assert set(_OptionsDEX.getOpenOptions(_CayugaCoin.address, 0, 10)[0]) == set(_option_hashes[1:3])
+        # Assert that the lists of writers and holders follow the transfers
+        assert _OptionsDEX.getOpenOptionsByWriter(accounts[0], 0, 10)[0] == [_option_hashes[1]]
+        assert _OptionsDEX.getOpenOptionsByWriter(accounts[3], 0, 10)[0] == [_option_hashes[2]]
+        assert _OptionsDEX.getOpenOptionsByHolder(accounts[1], 0, 10)[2] == 0
+        assert _OptionsDEX.getOpenOptionsByHolder(accounts[2], 0, 10)[0] == [_option_hashes[1]]
+
+    def test_three(self, _CayugaCoin):
+        """
+        Function that tests that an OptionsDEX deployed without the open interest index does not list options
+        """
+        dex = accounts[0].deploy(OptionsDEX, False)
+        assert not dex.isOpenInterestIndexed(), "The open interest index is enabled!"
+        with reverts("Open interest index is disabled!"):
+            dex.getOpenOptions(_CayugaCoin.address, 0, 10)
+
+
+class Test_fillSellOrder:
+    """
+    Class that groups together test cases that test the signed sell orders of OptionsDEX, the functions fillSellOrder() and cancelOrders(), and their helper OrderBook
+    """
+
+    @pytest.fixture
+    def _seller(self, _CayugaCoin, _OptionsDEX):
+        """
+        Fixture that returns a new account with a private key, funded with 100 eth and 100 CayugaCoin tokens approved to _OptionsDEX, that signs sell orders
+        """
+        seller = accounts.add()
+        accounts[0].transfer(seller, 100 * 10 ** 18)
+        _CayugaCoin.transfer(seller, 100 * 10 ** 18, {"from": accounts[0]})
+        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18, {"from": seller})
+        return seller
+
+    def test_one(self, _OptionsDEX, _option_hash, _seller):
+        """
+        Function that tests that holder B buys the holder side of an option from the seller with a single fillSellOrder() transaction, which cannot be repeated
+        """
+        book = OrderBook(_OptionsDEX)
+        # The seller buys the option and signs a sell order for 1 eth
+        _OptionsDEX.buyOption(_option_hash, {"from": _seller, "value": 10 ** 19})
+        book.add(book.sign(_seller, _option_hash, False, 10 ** 18, chain.height + 10))
+        balance = _seller.balance()
+        # Holder B fills the best order
+        signed = book.best(_option_hash, False, accounts[2])
+        book.fill(signed, accounts[2])
+
+        # Assert that holder B is the holder and the seller was paid
+        assert _OptionsDEX.getOptionDetails(_option_hash)[4] == accounts[2].address, "holder B is not the holder of this option!"
+        assert _seller.balance() == balance + 10 ** 18, "The seller was not paid!"
+        # Test to see that the order cannot be filled again
+        with reverts("Invalid signature!"):
+            book.fill(signed, accounts[1])
+
+    def test_two(self, _CayugaCoin, _OptionsDEX, _seller):
+        """
+        Function that tests that writer B buys the writer side of an option from the seller with a single fillSellOrder() transaction, which swaps the collateral
+        """
+        book = OrderBook(_OptionsDEX)
+        # The seller writes an option and signs a sell order of its writer side for 1 eth
+        tx = _OptionsDEX.createOption(_CayugaCoin.address, 0.1 * 10 ** 18, 2 * 10 ** 18, 200, {"from": _seller})
+        option_hash = tx.events["OptionCreated"]["optionHash"]
+        signed = book.sign(_seller, option_hash, True, 10 ** 18, chain.height + 10)
+        # Writer B fills the order
+        _CayugaCoin.transfer(accounts[3], 100 * 10 ** 18, {"from": accounts[0]})
+        _CayugaCoin.approve(_OptionsDEX.address, 100 * 10 ** 18, {"from": accounts[3]})
+        book.fill(signed, accounts[3])
+
+        # Assert that writer B is the writer and the seller got its collateral back
+        assert _OptionsDEX.getOptionDetails(option_hash)[2] == accounts[3].address, "writer B is not the writer of this option!"
+        assert _CayugaCoin.balanceOf(_seller) == 100 * 10 ** 18, "The collateral was not sent back!"
+
+    def test_three(self, _OptionsDEX, _option_hash, _seller):
+        """
+        Function that tests that orders can only be filled by their taker, before their expiration and until they are cancelled
+        """
+        book = OrderBook(_OptionsDEX)
+        _OptionsDEX.buyOption(_option_hash, {"from": _seller, "value": 10 ** 19})
+        restricted = book.sign(_seller, _option_hash, False, 10 ** 18, chain.height + 10, taker=accounts[2])
+        expiring = book.sign(_seller, _option_hash, False, 10 ** 18, chain.height + 1)
+        cancelled = book.sign(_seller, _option_hash, False, 10 ** 18, chain.height + 10)
+
+        # Test to see that only holder B can fill the restricted order
+        with reverts("You are not the taker of this order!"):
+            book.fill(restricted, accounts[1])
+        # Test to see that an expired order cannot be filled
+        chain.mine(2)
+        with reverts("Order has expired!"):
+            book.fill(expiring, accounts[1])
+        # Test to see that a cancelled order cannot be filled
+        book.cancel(_seller, [cancelled["order"][5]])
+        with reverts("Order was filled or cancelled!"):
+            book.fill(cancelled, accounts[1])
+        assert _OptionsDEX.isOrderNonceUsed(_seller, cancelled["order"][5]), "The nonce was not cancelled!"
+
+    def test_four(self, _OptionsDEX, _option_hash):
+        """
+        Function that tests that sell_order_digest() returns the digest computed by hashSellOrder()
+        """
+        order = (_option_hash, True, 10 ** 18, accounts[2].address, 500, 2 ** 200, 25)
+        domain = domain_separator(chain.id, _OptionsDEX.address)
+        # Assert that the domain separator and the digest match OptionsDEX
+        assert _OptionsDEX.DOMAIN_SEPARATOR() == to_hex(domain), "The domain separator is wrong!"
+        assert _OptionsDEX.hashSellOrder(order) == to_hex(sell_order_digest(domain, order)), "The digest is wrong!"
+
+
+class Test_quantity:
+    """
+    Class that groups together test cases that test options on any number of tokens, the functions createOptionWithQuantity() and exerciseOptionPartial(), and partial sales of holder positions through fillSellOrder()
+    """
+
+    @pytest.fixture
+    def _large_hash(self, _CayugaCoin, _OptionsDEX):
+        """
+        Fixture that returns the hash of an option on 1,000 tokens created by writer A and bought by holder A
+        """
+        # Approve for 1,000 CayugaCoin tokens to be transferred to _OptionsDEX
+        _CayugaCoin.approve(_OptionsDEX.address, 1000 * 10 ** 18, {"from": accounts[0]})
+        tx = _OptionsDEX.createOptionWithQuantity(_CayugaCoin.address, 10 ** 15, 2 * 10 ** 15, 200, 1000, {"from": accounts[0]})
+        option_hash = tx.events["OptionCreated"]["optionHash"]
+        # Holder A pays the premium of 1,000 tokens
+        _OptionsDEX.buyOption(option_hash, {"from": accounts[1], "value": 1000 * 10 ** 15})
+        return option_hash
+
+    def test_one(self, _CayugaCoin, _OptionsDEX, _large_hash):
+        """
+        Function that tests that a single option locks the collateral of its quantity and that holder A exercises it in two parts, the last of which deletes it
+        """
+        # Assert that the option holds 1,000 tokens of collateral
+        assert _OptionsDEX.getOptionDetailsBatch([_large_hash])[0][10] == 1000
+        assert _CayugaCoin.balanceOf(_OptionsDEX) == 1000 * 10 ** 18
+        # Holder A exercises 300 tokens
+        tx = _OptionsDEX.exerciseOptionPartial(_large_hash, 300, {"from": accounts[1], "value": 300 * 2 * 10 ** 15})
+
+        # Assert that 300 tokens were sent and 700 stay open
+        assert tx.events["Transfer"]["value"] == 300 * 10 ** 18
+        assert tx.events["OptionExercised"]["quantity"] == 300
+        assert _OptionsDEX.getOptionDetailsBatch([_large_hash])[0][10] == 700
+        # Test to see that more tokens than are left cannot be exercised
+        with reverts("Invalid quantity!"):
+            _OptionsDEX.exerciseOptionPartial(_large_hash, 701, {"from": accounts[1], "value": 701 * 2 * 10 ** 15})
+        # Holder A exercises the rest
+        _OptionsDEX.exerciseOption(_large_hash, {"from": accounts[1], "value": 700 * 2 * 10 ** 15})
+        # Assert that the option was deleted
+        assert _OptionsDEX.getOptionDetails(_large_hash)[5] == 0, "This option was not deleted!"
+        assert _CayugaCoin.balanceOf(_OptionsDEX) == 0
+
+    def test_two(self, _OptionsDEX, _large_hash):
+        """
+        Function that tests that a holder order on part of the position splits it into a new option held by holder B, which is exercised independently
+        """
+        # Holder A becomes a signing account by selling the option to the seller
+        seller = accounts.add()
+        accounts[0].transfer(seller, 10 ** 18)
+        _OptionsDEX.approveOptionTransferHolder(_large_hash, seller, 0, {"from": accounts[1]})
+        _OptionsDEX.transferOptionHolder(_large_hash, {"from": seller, "value": 0})
+        book = OrderBook(_OptionsDEX)
+        # Holder B buys 400 tokens of the position
+        tx = book.fill(book.sign(seller, _large_hash, False, 10 ** 17, chain.height + 10, quantity=400), accounts[2])
+        new_hash = tx.events["OptionSplit"]["newOptionHash"]
+        parent, child = _OptionsDEX.getOptionDetailsBatch([_large_hash, new_hash])
+
+        # Assert that the positions were split and the new option is listed under holder B
+        assert (parent[4], parent[10]) == (seller.address, 600)
+        assert (child[2], child[4], child[10]) == (accounts[0].address, accounts[2].address, 400)
+        assert _OptionsDEX.getOpenOptionsByHolder(accounts[2], 0, 10)[0] == [new_hash]
+        # Test to see that writer orders cannot sell part of an option
+        with reverts("Invalid quantity!"):
+            book.fill(book.sign(seller, _large_hash, True, 0, chain.height + 10, quantity=100), accounts[3])
+        # Holder B exercises the new option
+        _OptionsDEX.exerciseOption(new_hash, {"from": accounts[2], "value": 400 * 2 * 10 ** 15})
+        assert _OptionsDEX.getOptionDetailsBatch([_large_hash])[0][10] == 600
+
+    def test_three(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that options without tokens cannot be created and that refund() returns the collateral of the quantity
+        """
+        _CayugaCoin.approve(_OptionsDEX.address, 250 * 10 ** 18, {"from": accounts[0]})
+        # Test to see that an option on 0 tokens cannot be created
+        with reverts("Invalid quantity!"):
+            _OptionsDEX.createOptionWithQuantity(_CayugaCoin.address, 10 ** 15, 10 ** 15, 200, 0, {"from": accounts[0]})
+        tx = _OptionsDEX.createOptionWithQuantity(_CayugaCoin.address, 10 ** 15, 10 ** 15, 200, 250, {"from": accounts[0]})
+        tx = _OptionsDEX.refund(tx.events["OptionCreated"]["optionHash"], {"from": accounts[0]})
+
+        # Assert that the 250 tokens of collateral were sent back
+        assert tx.events["Transfer"]["value"] == 250 * 10 ** 18
+
+    def test_four(self, _OptionsDEX, _large_hash):
+        """
+        Function that tests that a partial exercise deletes the approved next holder and sell price, which were agreed for the whole position
+        """
+        # Holder A approves holder B to buy the whole position, then exercises 300 tokens
+        _OptionsDEX.approveOptionTransferHolder(_large_hash, accounts[2], 10 ** 17, {"from": accounts[1]})
+        _OptionsDEX.exerciseOptionPartial(_large_hash, 300, {"from": accounts[1], "value": 300 * 2 * 10 ** 15})
+
+        # Assert that the approval was deleted with the change of quantity
+        details = _OptionsDEX.getOptionDetailsBatch([_large_hash])[0]
+        assert (details[6], details[8], details[10]) == (0, "0x" + "0" * 40, 700)
+        # Test to see that holder B cannot buy the remaining 700 tokens at the price agreed for 1,000
+        with reverts("You are not authorized!"):
+            _OptionsDEX.transferOptionHolder(_large_hash, {"from": accounts[2], "value": 10 ** 17})
+
+    def test_five(self, _OptionsDEX, _large_hash):
+        """
+        Function that tests that a partial exercise deletes the approved next writer and sell price, which were agreed for the collateral of the whole position
+        """
+        # Writer A approves writer B to take over the whole option, then holder A exercises 300 tokens
+        _OptionsDEX.approveOptionTransferWriter(_large_hash, accounts[3], 10 ** 17, {"from": accounts[0]})
+        _OptionsDEX.exerciseOptionPartial(_large_hash, 300, {"from": accounts[1], "value": 300 * 2 * 10 ** 15})
+
+        # Assert that the approval was deleted with the change of quantity
+        details = _OptionsDEX.getOptionDetailsBatch([_large_hash])[0]
+        assert (details[7], details[9], details[10]) == (0, "0x" + "0" * 40, 700)
+        # Test to see that writer B cannot take over the remaining 700 tokens at the price agreed for 1,000
+        with reverts("You are not authorized!"):
+            _OptionsDEX.transferOptionWriter(_large_hash, {"from": accounts[3], "value": 10 ** 17})
+
+
+class Test_permit:
+    """
+    Class that groups together test cases that test the functions createOptionWithPermit() and transferOptionWriterWithPermit(), which approve the collateral with an EIP-2612 permit in the same transaction
+    """
+
+    @pytest.fixture
+    def _permit_writer(self, _CayugaCoin):
+        """
+        Fixture that returns an account with a private key holding ETH and 1,000 CayugaCoin tokens, which never sent approve()
+        """
+        writer = accounts.add()
+        accounts[0].transfer(writer, 10 ** 18)
+        _CayugaCoin.transfer(writer, 1000 * 10 ** 18, {"from": accounts[0]})
+        return writer
+
+    def test_one(self, _CayugaCoin, _OptionsDEX, _permit_writer):
+        """
+        Function that tests that a writer without an allowance creates an option in a single transaction, and that its permit cannot be used twice
+        """
+        # Assert that the Python signer uses the domain of CayugaCoin
+        assert token_domain_separator("CayugaCoin", chain.id, _CayugaCoin.address) == bytes(_CayugaCoin.DOMAIN_SEPARATOR())
+        permit = sign_collateral_permit(_CayugaCoin, _permit_writer, _OptionsDEX, 500 * 10 ** 18)
+        tx = _OptionsDEX.createOptionWithPermit(_CayugaCoin.address, 10 ** 15, 10 ** 15, 200, 500, permit, {"from": _permit_writer})
+
+        # Assert that the collateral was collected and the allowance spent
+        assert tx.events["OptionCreated"]["quantity"] == 500
+        assert _CayugaCoin.balanceOf(_OptionsDEX) == 500 * 10 ** 18
+        assert _CayugaCoin.allowance(_permit_writer, _OptionsDEX) == 0
+        assert _CayugaCoin.nonces(_permit_writer) == 1
+        # Test to see that a used permit is ignored and leaves no allowance
+        with reverts("ERC20: insufficient allowance"):
+            _OptionsDEX.createOptionWithPermit(_CayugaCoin.address, 10 ** 15, 10 ** 15, 200, 500, permit, {"from": _permit_writer})
+        # Test to see that options on unregistered assets are rejected before the asset is called
+        with reverts("Asset is not allowed!"):
+            _OptionsDEX.createOptionWithPermit(accounts[5], 10 ** 15, 10 ** 15, 200, 500, permit, {"from": _permit_writer})
+
+    def test_two(self, _CayugaCoin, _OptionsDEX, _option_hash, _permit_writer):
+        """
+        Function that tests that the approved next writer takes over an option with a permit, even when the permit was submitted by someone else first
+        """
+        _OptionsDEX.approveOptionTransferWriter(_option_hash, _permit_writer, 10 ** 15, {"from": accounts[0]})
+        permit = sign_collateral_permit(_CayugaCoin, _permit_writer, _OptionsDEX, 100 * 10 ** 18)
+        # Test to see that only the approved next writer can use the function
+        with reverts("You are not authorized!"):
+            _OptionsDEX.transferOptionWriterWithPermit(_option_hash, permit, {"from": accounts[3], "value": 10 ** 15})
+        # Holder A submits the permit seen in the mempool first
+        _CayugaCoin.permit(_permit_writer, _OptionsDEX, *permit, {"from": accounts[1]})
+        balance = _CayugaCoin.balanceOf(accounts[0])
+        _OptionsDEX.transferOptionWriterWithPermit(_option_hash, permit, {"from": _permit_writer, "value": 10 ** 15})
+
+        # Assert that the permit writer is the writer and that writer A got its collateral back
+        assert _OptionsDEX.getOptionDetails(_option_hash)[2] == _permit_writer.address
+        assert _CayugaCoin.balanceOf(accounts[0]) == balance + 100 * 10 ** 18
+        assert _CayugaCoin.balanceOf(_permit_writer) == 900 * 10 ** 18
+
+    def test_three(self, _CayugaCoin, _OptionsDEX, _permit_writer):
+        """
+        Function that tests that permits signed for another spender, for too few tokens or past their deadline do not approve OptionsDEX
+        """
+        for permit in (
+            sign_collateral_permit(_CayugaCoin, _permit_writer, accounts[2], 100 * 10 ** 18),
+            sign_collateral_permit(_CayugaCoin, _permit_writer, _OptionsDEX, 99 * 10 ** 18),
+            sign_collateral_permit(_CayugaCoin, _permit_writer, _OptionsDEX, 100 * 10 ** 18, deadline=chain.time() - 1),
+        ):
+            with reverts("ERC20: insufficient allowance"):
+                _OptionsDEX.createOptionWithPermit(_CayugaCoin.address, 10 ** 15, 10 ** 15, 200, 100, permit, {"from": _permit_writer})
+        # Test to see that the token rejects the expired permit itself
+        with reverts("ERC20Permit: expired deadline"):
+            _CayugaCoin.permit(_permit_writer, _OptionsDEX, *permit, {"from": _permit_writer})
+
+
+class Test_withdraw:
+    """
+    Class that groups together test cases that test the credit mode of OptionsDEX and the functions withdraw() and withdrawTo()
+    """
+
+    @pytest.fixture
+    def _option_hash(self, _OptionsDEX, _create_option):
+        """
+        Fixture that returns the hash of an option created by writer A, who collects proceeds in credit mode, and bought by holder A.
+
+        Data of created option:
+        - Asset: CayugaCoin
+        - Premium: 0.1 eth
+        - Strike Price: 2 eth
+        - Block Expiration: 200
+        """
+        # Writer A enables credit mode
+        _OptionsDEX.setCreditMode(True, {"from": accounts[0]})
+        # Create option
+        hash = _create_option()
+        # Holder A buys option
+        _OptionsDEX.buyOption(hash, {"from": accounts[1], "value": 10 ** 19})
+        return hash
+
+    def test_one(self, _OptionsDEX, _option_hash):
+        """
+        Function that tests that the premium paid by holder A is credited to writer A and sent to writer A by withdraw()
+        """
+        # Assert that the premium was credited
+        assert _OptionsDEX.viewCredit(accounts[0]) == (10 ** 19, True), "The premium was not credited!"
+        # Withdraw credit
+        balance = accounts[0].balance()
+        _OptionsDEX.withdraw({"from": accounts[0]})
+        # Assert that the credit was sent to writer A
+        assert accounts[0].balance() == balance + 10 ** 19, "The credit was not withdrawn!"
+        assert _OptionsDEX.viewCredit(accounts[0])[0] == 0, "The credit was not cleared!"
+
+    def test_two(self, _OptionsDEX, _option_hash):
+        """
+        Function that tests that withdrawTo() splits the credit of writer A between holder B and writer B, and cannot send more than the credit
+        """
+        balances = [accounts[2].balance(), accounts[3].balance()]
+        # Test to see that more than the credit cannot be withdrawn
+        with reverts("Not enough credit!"):
+            _OptionsDEX.withdrawTo([accounts[2], accounts[3]], [10 ** 19, 1], {"from": accounts[0]})
+        # Send part of the credit to holder B and writer B
+        _OptionsDEX.withdrawTo([accounts[2], accounts[3]], [10 ** 18, 2 * 10 ** 18], {"from": accounts[0]})
+
+        # Assert that the recipients were paid and the remaining credit is kept
+        assert [accounts[2].balance(), accounts[3].balance()] == [balances[0] + 10 ** 18, balances[1] + 2 * 10 ** 18]
+        assert _OptionsDEX.viewCredit(accounts[0])[0] == 7 * 10 ** 18, "The credit was not reduced!"
+
+    def test_three(self, _OptionsDEX):
+        """
+        Function that tests that an account without credit cannot withdraw
+        """
+        with reverts("Nothing to withdraw!"):
+            _OptionsDEX.withdraw({"from": accounts[1]})
+
+
+class Test_refundMany:
+    """
+    Class that groups together test cases that test the function refundMany()
+    """
+
+    @pytest.fixture
+    def _option_hashes(self, _CayugaCoin, _OptionsDEX):
+        """
+        Fixture that returns the hashes of three options created by writer A, the first of which is bought by holder A.
+
+        Data of created options:
+        - Asset: CayugaCoin
+        - Premium: 0.1 eth
+        - Strike Price: 2 eth
+        - Block Expiration: 200
+        """
+        # Approve for 300 CayugaCoin tokens to be transferred to _OptionsDEX
+        _CayugaCoin.approve(_OptionsDEX.address, 300 * 10 ** 18)
+        # Create options
+        tx = _OptionsDEX.createOptions([_CayugaCoin.address] * 3, [0.1 * 10 ** 18] * 3, [2 * 10 ** 18] * 3, [200] * 3)
+        hashes = [event["optionHash"] for event in tx.events["OptionCreated"]]
+        # Holder A buys the first option
+        _OptionsDEX.buyOption(hashes[0], {"from": accounts[1], "value": 10 ** 19})
+        return hashes
+
+    def test_one(self, _CayugaCoin, _OptionsDEX, _option_hashes):
+        """
+        Function that tests that refundMany() deletes the unsold options of writer A and sends their collateral back in a single transfer
+        """
+        balance = _CayugaCoin.balanceOf(accounts[0])
+        # Refund the unsold options
+        tx = _OptionsDEX.refundMany(_option_hashes[1:], {"from": accounts[0]})
+
+        # Assert that the collateral was sent back in one transfer
+        assert len(tx.events["Transfer"]) == 1, "The collateral was not sent back in one transfer!"
+        assert _CayugaCoin.balanceOf(accounts[0]) == balance + 200 * 10 ** 18, "The collateral was not sent back!"
+        # Assert that the options were deleted
+        assert [_OptionsDEX.getOptionDetails(h)[5] for h in _option_hashes[1:]] == [0, 0], "The options were not deleted!"
+
+    def test_two(self, _OptionsDEX, _option_hashes):
+        """
+        Function that tests that refundMany() reverts as a whole when one option was bought and has not expired
+        """
+        with reverts("You are not able to be refunded!"):
+            _OptionsDEX.refundMany(_option_hashes, {"from": accounts[0]})
+
+
+class Test_option_hash:
+    """
+    Class that groups together test cases that test the function getNonce() and the precomputation of option hashes by option_hash()
+    """
+
+    def test_one(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that option_hash() returns the hashes OptionsDEX gives options created by createOption() and createOptions() from writer A and writer B
+        """
+        # Give writer B tokens and approve _OptionsDEX for both writers
+        _CayugaCoin.transfer(accounts[3], 200 * 10 ** 18, {"from": accounts[0]})
+        _CayugaCoin.approve(_OptionsDEX.address, 300 * 10 ** 18, {"from": accounts[0]})
+        _CayugaCoin.approve(_OptionsDEX.address, 200 * 10 ** 18, {"from": accounts[3]})
+        for writer in [accounts[0], accounts[3]]:
+            nonce = _OptionsDEX.getNonce(writer)
+            # Create one option with createOption() and one with createOptions()
+            tx_1 = _OptionsDEX.createOption(_CayugaCoin.address, 10 ** 17, 2 * 10 ** 18, 200, {"from": writer})
+            tx_2 = _OptionsDEX.createOptions([_CayugaCoin.address], [3 * 10 ** 17], [10 ** 18], [2 ** 64 - 1], {"from": writer})
+
+            # Assert that the precomputed hashes match the hashes of the created options
+            assert tx_1.events["OptionCreated"]["optionHash"] == option_hash(_CayugaCoin.address, 10 ** 17, 2 * 10 ** 18, 200, writer.address, nonce)
+            assert tx_2.events["OptionCreated"]["optionHash"] == option_hash(_CayugaCoin.address, 3 * 10 ** 17, 10 ** 18, 2 ** 64 - 1, writer.address, nonce + 1)
+        # Assert that writer A created one more option in between
+        assert _OptionsDEX.getNonce(accounts[0]) == 2 and _OptionsDEX.getNonce(accounts[3]) == 2
+
+    def test_two(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that OptionsDEXClient.next_option_hash() follows the nonce of writer A and that getNonce() is not advanced by a reverted creation
+        """
+        _CayugaCoin.approve(_OptionsDEX.address, 200 * 10 ** 18, {"from": accounts[0]})
+        client = OptionsDEXClient(_OptionsDEX, accounts[0])
+        # Reserve the hash of an option and create it
+        expected = client.next_option_hash(_CayugaCoin.address, 10 ** 17, 2 * 10 ** 18, 200)
+        tx = _OptionsDEX.createOption(_CayugaCoin.address, 10 ** 17, 2 * 10 ** 18, 200, {"from": accounts[0]})
+        assert tx.events["OptionCreated"]["optionHash"] == expected, "The precomputed hash is wrong!"
+
+        # Test to see that a reverted creation does not use a nonce
+        with reverts("Invalid premium!"):
+            _OptionsDEX.createOption(_CayugaCoin.address, 0, 2 * 10 ** 18, 200, {"from": accounts[0]})
+        assert _OptionsDEX.getNonce(accounts[0]) == 1, "The nonce was advanced by a reverted creation!"
+
+
+class Test_TransactionPipeline:
+    """
+    Class that groups together test cases that test the pipelined transactions of OptionsDEXClient
+    """
+
+    def test_one(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that options created, bought and exercised through a TransactionPipeline are confirmed with consecutive nonces. The options are bought using their precomputed hashes without waiting for their creation.
+        """
+        # Writer A approves for 300 CayugaCoin tokens to be transferred to OptionsDEX
+        _CayugaCoin.approve(_OptionsDEX.address, 300 * 10 ** 18, {"from": accounts[0]})
+        pipeline = TransactionPipeline(max_in_flight=2)
+        writer = OptionsDEXClient(_OptionsDEX, accounts[0], pipeline)
+        holder = OptionsDEXClient(_OptionsDEX, accounts[1], pipeline)
+        nonce = accounts[0].nonce
+
+        # Create and buy three options without waiting between them
+        hashes, futures = zip(*[writer.submit_create_option(_CayugaCoin.address, 10 ** 17, 10 ** 18, 200) for _ in range(3)])
+        bought = [holder.submit_buy_option(h, 10 ** 17) for h in hashes]
+        created = [f.result() for f in futures]
+        [f.result() for f in bought]
+        # Exercise the options
+        exercised = [f.result() for f in [holder.submit_exercise_option(h, 10 ** 18) for h in hashes]]
+        pipeline.shutdown()
+
+        # Assert that the creations used consecutive nonces and the precomputed hashes
+        assert [tx.nonce for tx in created] == [nonce, nonce + 1, nonce + 2]
+        assert [tx.events["OptionCreated"]["optionHash"] for tx in created] == list(hashes), "The precomputed hashes are wrong!"
+        # Assert that every exercise succeeded and deleted its option
+        assert all(tx.status == 1 for tx in exercised), "An exercise failed!"
+        assert [_OptionsDEX.getOptionDetails(h)[5] for h in hashes] == [0, 0, 0]
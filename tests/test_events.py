@@ -0,0 +1,110 @@
+"""
+File containing test cases for the events of OptionsDEX and their decoder in scripts/events.py
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A
+accounts[1] = holder A
+accounts[2] = holder B
+accounts[3] = writer B
+"""
+
+import pytest
+from brownie import accounts, web3
+from scripts.events import OptionsState, decode_log, encode_log
+from scripts.orders import OrderBook
+
+
+pytestmark = pytest.mark.usefixtures("_approval")
+
+
+def replay(dex):
+    """
+    Function that folds every log of dex into a new OptionsState and returns it
+    """
+    state = OptionsState()
+    state.replay(web3.eth.get_logs({"address": dex.address, "fromBlock": dex.tx.block_number, "toBlock": "latest"}))
+    return state
+
+
+def lower(details):
+    """
+    Function that lowercases the addresses of OptionDetails returned by OptionsDEX
+    """
+    return tuple(value.lower() if isinstance(value, str) else value for value in details)
+
+
+class Test_events:
+    """
+    Class that groups together test cases that test the events of OptionsDEX and OptionsState
+    """
+
+    def test_one(self, _CayugaCoin, _OptionsDEX, _create_option, _approved_hash):
+        """
+        Function that tests that the state folded from the logs matches getOptionDetailsBatch() through every transition of the lifecycle of options
+        """
+        # Options created, bought with approvals, refunded and exercised
+        unsold = _create_option()
+        refunded = _create_option()
+        exercised = _create_option()
+        _OptionsDEX.refund(refunded, {"from": accounts[0]})
+        _OptionsDEX.buyOption(exercised, {"from": accounts[1], "value": 10 ** 19})
+        _OptionsDEX.exerciseOption(exercised, {"from": accounts[1], "value": 2 * 10 ** 20})
+        hashes = [unsold, refunded, exercised, _approved_hash]
+        # Compare once with pending approvals and once after both sides were transferred
+        for transfer in (True, False):
+            state = replay(_OptionsDEX)
+            expected = [lower(details) for details in _OptionsDEX.getOptionDetailsBatch(hashes)]
+
+            # Assert that the folded state matches the contract, deleted options included
+            assert [state.details(h) for h in hashes] == expected
+            assert set(state.options) == {unsold, _approved_hash}
+            if transfer:
+                _OptionsDEX.transferOptionHolder(_approved_hash, {"from": accounts[2], "value": 10 ** 18})
+                _OptionsDEX.transferOptionWriter(_approved_hash, {"from": accounts[3], "value": 10 ** 18})
+
+    def test_two(self, _CayugaCoin, _OptionsDEX, _bought_hash):
+        """
+        Function that tests that the events carry the fields they change
+        """
+        tx = _OptionsDEX.exerciseOption(_bought_hash, {"from": accounts[1], "value": 2 * 10 ** 20})
+        cancel = _OptionsDEX.cancelOrders([3, 300], {"from": accounts[2]})
+
+        # Assert that the exercise carries both parties and the strike payment
+        event = tx.events["OptionExercised"]
+        assert (event["optionHash"], event["holder"], event["writer"], event["strikePayment"]) == (_bought_hash, accounts[1], accounts[0], 2 * 10 ** 20)
+        # Assert that every cancelled nonce is emitted
+        assert [e["nonce"] for e in cancel.events["OrderCancelled"]] == [3, 300]
+        assert replay(_OptionsDEX).cancelled_orders == {(accounts[2].address.lower(), 3), (accounts[2].address.lower(), 300)}
+
+    def test_three(self):
+        """
+        Function that tests that decode_log() inverts encode_log() and skips foreign logs
+        """
+        fields = {"optionHash": "0x" + "ab" * 32, "from": "0x" + "01" * 20, "to": "0x" + "02" * 20, "price": 10 ** 18}
+        decoded = decode_log(encode_log("HolderTransferred", 7, 1, **fields))
+
+        # Assert that every field is decoded
+        assert decoded == dict(fields, event="HolderTransferred", blockNumber=7, logIndex=1)
+        # Assert that a log of another contract is skipped
+        assert decode_log({"topics": ["0x" + "00" * 32], "data": "0x"}) is None
+
+    def test_four(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that the state folded from the logs follows partial exercises and partial sales of holder positions
+        """
+        # The seller buys an option on 500 tokens from writer A
+        seller = accounts.add()
+        accounts[0].transfer(seller, 10 ** 18)
+        tx = _OptionsDEX.createOptionWithQuantity(_CayugaCoin.address, 10 ** 15, 10 ** 15, 200, 500, {"from": accounts[0]})
+        option_hash = tx.events["OptionCreated"]["optionHash"]
+        _OptionsDEX.buyOption(option_hash, {"from": seller, "value": 500 * 10 ** 15})
+        # Holder A buys 200 tokens of the position and exercises 50 of them
+        book = OrderBook(_OptionsDEX)
+        tx = book.fill(book.sign(seller, option_hash, False, 10 ** 16, 10 ** 6, quantity=200), accounts[1])
+        new_hash = tx.events["OptionSplit"]["newOptionHash"]
+        _OptionsDEX.exerciseOptionPartial(new_hash, 50, {"from": accounts[1], "value": 50 * 10 ** 15})
+        hashes = [option_hash, new_hash]
+
+        # Assert that the folded state matches the contract
+        assert [replay(_OptionsDEX).details(h) for h in hashes] == [lower(details) for details in _OptionsDEX.getOptionDetailsBatch(hashes)]
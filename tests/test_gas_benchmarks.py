@@ -0,0 +1,273 @@
+"""
+File containing the gas and latency benchmark suite for the entry points of the smart contract OptionsDEX
+
+Every test below drives one lifecycle path of an option against the local development chain, using CayugaCoin as the underlying asset. The gas used and the wall-clock time of each call are recorded, compared against the baseline stored in tests/gas_baseline.json and printed as a report once the module finishes.
+
+The suite is configured through environment variables:
+
+GAS_TOLERANCE = fraction by which the gas of a function may exceed its baseline before the test fails (default 0.05, i.e. 5%)
+UPDATE_GAS_BASELINE = when set to 1, the measured gas of every function is written back to tests/gas_baseline.json instead of being checked
+
+While tests/gas_baseline.json is empty, as in a checkout where the suite never ran on a development chain, the benchmarks are skipped and the measured gas is written to it, to be committed as the first baseline. Once the baseline has entries, functions without one fail their check, so the baseline must be regenerated and committed with every contract change that adds or renames a benchmark. CayugaCoin, OptionsDEX and the option fixtures come from tests/conftest.py. Run the suite with `brownie test tests/test_gas_benchmarks.py -s` to see the report.
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A
+accounts[1] = holder A
+accounts[2] = holder B
+accounts[3] = writer B
+"""
+
+import json
+import os
+import time
+
+import pytest
+from brownie import accounts, chain
+from scripts.orders import OrderBook
+
+# Path of the stored gas baseline
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "gas_baseline.json")
+# Allowed relative increase of gas over the baseline
+GAS_TOLERANCE = float(os.environ.get("GAS_TOLERANCE", "0.05"))
+# Whether the baseline should be rewritten with the measured values
+UPDATE_BASELINE = os.environ.get("UPDATE_GAS_BASELINE") == "1"
+
+# Option parameters shared by every benchmark
+PREMIUM = 10 ** 17
+STRIKE_PRICE = 2 * 10 ** 18
+# Number of options created by the batch benchmarks
+BATCH_SIZE = 10
+
+
+class GasReport:
+    """
+    Class that collects the gas used and the wall-clock time of every measured call and checks them against the stored baseline
+    """
+
+    def __init__(self, baseline):
+        # Function name to gas used in the baseline
+        self.baseline = baseline
+        # Function name to list of (gas used, seconds) measurements
+        self.measurements = {}
+
+    def measure(self, name, fn, *args):
+        """
+        Function that calls fn with args, records the gas used and the wall-clock time of the resulting transaction under name and returns the transaction
+        """
+        # Time the call, which returns once the transaction is mined
+        start = time.perf_counter()
+        tx = fn(*args)
+        elapsed = time.perf_counter() - start
+        # Record measurement
+        self.measurements.setdefault(name, []).append((tx.gas_used, elapsed))
+        return tx
+
+    def gas(self, name):
+        """
+        Function that returns the highest gas used by all calls recorded under name
+        """
+        return max(gas for gas, _ in self.measurements[name])
+
+    def check(self, name):
+        """
+        Function that asserts that the gas used by calls recorded under name does not exceed the baseline by more than GAS_TOLERANCE
+        """
+        # The baseline is being rewritten
+        if UPDATE_BASELINE:
+            return
+        # No baseline was ever recorded, the measurements become the first one
+        if not self.baseline:
+            pytest.skip("tests/gas_baseline.json is empty, {} used {} gas and the measured baseline is written to it, commit it".format(name, self.gas(name)))
+        # Functions without a baseline fail, so that the gate cannot be skipped by an incomplete baseline
+        assert name in self.baseline, "{} has no gas baseline, run the suite with UPDATE_GAS_BASELINE=1 and commit tests/gas_baseline.json".format(name)
+        limit = self.baseline[name] * (1 + GAS_TOLERANCE)
+        assert self.gas(name) <= limit, "{} used {} gas, baseline is {} (tolerance {:.0%})".format(
+            name, self.gas(name), self.baseline[name], GAS_TOLERANCE)
+
+    def summary(self):
+        """
+        Function that returns the report as a list of lines
+        """
+        lines = ["{:<32}{:>10}{:>10}{:>9}{:>12}".format("function", "gas", "baseline", "delta", "time (ms)")]
+        for name in sorted(self.measurements):
+            gas = self.gas(name)
+            # Average wall-clock time in milliseconds
+            ms = 1000 * sum(t for _, t in self.measurements[name]) / len(self.measurements[name])
+            base = self.baseline.get(name)
+            delta = "{:+.1%}".format(gas / base - 1) if base else "-"
+            lines.append("{:<32}{:>10}{:>10}{:>9}{:>12.1f}".format(name, gas, base or "-", delta, ms))
+        return lines
+
+
+@pytest.fixture(scope="module")
+def gas_report():
+    """
+    Fixture that loads the gas baseline and returns the GasReport shared by every benchmark in this module. Once the module finishes, the report is printed and, if UPDATE_GAS_BASELINE is set or the baseline file was empty, written back to the baseline file.
+    """
+    # Load baseline
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    # Record the first baseline, rather than failing every benchmark of a checkout that never measured one
+    record = UPDATE_BASELINE or not baseline
+    report = GasReport(baseline)
+    yield report
+    # Print report
+    print("\n" + "\n".join(report.summary()))
+    # Rewrite baseline
+    if record:
+        baseline.update({name: report.gas(name) for name in report.measurements})
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+            f.write("\n")
+
+
+pytestmark = pytest.mark.usefixtures("_approval")
+
+
+def test_createOption(gas_report, _CayugaCoin, _OptionsDEX):
+    """
+    Function that benchmarks the creation of an option by writer A
+    """
+    # Create two options so that the cost of the first write to an account nonce is also covered
+    for _ in range(2):
+        gas_report.measure("createOption", _OptionsDEX.createOption, _CayugaCoin.address, PREMIUM, STRIKE_PRICE, chain.height + 100, {"from": accounts[0]})
+    gas_report.check("createOption")
+
+
+def test_createOptions(gas_report, _CayugaCoin, _OptionsDEX):
+    """
+    Function that benchmarks the creation of BATCH_SIZE options by writer A in a single createOptions() transaction against BATCH_SIZE createOption() transactions
+    """
+    expiration = chain.height + 100
+    # Create options one by one
+    singles = [_OptionsDEX.createOption(_CayugaCoin.address, PREMIUM, STRIKE_PRICE, expiration, {"from": accounts[0]}) for _ in range(BATCH_SIZE)]
+    # Create options in a single batch
+    name = "createOptions ({} options)".format(BATCH_SIZE)
+    gas_report.measure(name, _OptionsDEX.createOptions, [_CayugaCoin.address] * BATCH_SIZE, [PREMIUM] * BATCH_SIZE, [STRIKE_PRICE] * BATCH_SIZE, [expiration] * BATCH_SIZE, {"from": accounts[0]})
+    print("\n{} x createOption: {} gas, {}: {} gas".format(BATCH_SIZE, sum(tx.gas_used for tx in singles), name, gas_report.gas(name)))
+    # Assert that the batch is cheaper than the individual transactions
+    assert gas_report.gas(name) < sum(tx.gas_used for tx in singles)
+    gas_report.check(name)
+
+
+def test_buyOption(gas_report, _OptionsDEX, _option_hash):
+    """
+    Function that benchmarks the purchase of an option by holder A
+    """
+    gas_report.measure("buyOption", _OptionsDEX.buyOption, _option_hash, {"from": accounts[1], "value": PREMIUM * 100})
+    gas_report.check("buyOption")
+
+
+def test_buyOption_credit_mode(gas_report, _OptionsDEX, _option_hash):
+    """
+    Function that benchmarks the purchase of an option by holder A when writer A collects proceeds in credit mode, followed by the withdrawal of the credit
+    """
+    _OptionsDEX.setCreditMode(True, {"from": accounts[0]})
+    gas_report.measure("buyOption (credit mode)", _OptionsDEX.buyOption, _option_hash, {"from": accounts[1], "value": PREMIUM * 100})
+    gas_report.measure("withdraw", _OptionsDEX.withdraw, {"from": accounts[0]})
+    gas_report.check("buyOption (credit mode)")
+    gas_report.check("withdraw")
+
+
+def test_transferOptionHolder(gas_report, _OptionsDEX, _bought_hash):
+    """
+    Function that benchmarks holder A approving holder B as the next holder and holder B buying the option
+    """
+    gas_report.measure("approveOptionTransferHolder", _OptionsDEX.approveOptionTransferHolder, _bought_hash, accounts[2], 10 ** 18, {"from": accounts[1]})
+    gas_report.measure("transferOptionHolder", _OptionsDEX.transferOptionHolder, _bought_hash, {"from": accounts[2], "value": 10 ** 18})
+    gas_report.check("approveOptionTransferHolder")
+    gas_report.check("transferOptionHolder")
+
+
+def test_transferOptionWriter(gas_report, _OptionsDEX, _bought_hash):
+    """
+    Function that benchmarks writer A approving writer B as the next writer and writer B taking over the option
+    """
+    gas_report.measure("approveOptionTransferWriter", _OptionsDEX.approveOptionTransferWriter, _bought_hash, accounts[3], 10 ** 18, {"from": accounts[0]})
+    gas_report.measure("transferOptionWriter", _OptionsDEX.transferOptionWriter, _bought_hash, {"from": accounts[3], "value": 10 ** 18})
+    gas_report.check("approveOptionTransferWriter")
+    gas_report.check("transferOptionWriter")
+
+
+def test_fillSellOrder(gas_report, _OptionsDEX, _bought_hash, _create_option):
+    """
+    Function that benchmarks holder B buying the holder side of an option from a signed sell order against the approveOptionTransferHolder() and transferOptionHolder() handshake
+    """
+    # Sell the option of holder A through the handshake
+    handshake = [
+        _OptionsDEX.approveOptionTransferHolder(_bought_hash, accounts[2], 10 ** 18, {"from": accounts[1]}),
+        _OptionsDEX.transferOptionHolder(_bought_hash, {"from": accounts[2], "value": 10 ** 18}),
+    ]
+    # Sell an option of a seller with a private key through a signed order
+    seller = accounts.add()
+    accounts[0].transfer(seller, 10 ** 19)
+    option_hash = _create_option()
+    _OptionsDEX.buyOption(option_hash, {"from": seller, "value": PREMIUM * 100})
+    book = OrderBook(_OptionsDEX)
+    signed = book.sign(seller, option_hash, False, 10 ** 18, chain.height + 10)
+    gas_report.measure("fillSellOrder (holder)", book.fill, signed, accounts[2])
+    print("\napprove + transfer: {} gas, fillSellOrder: {} gas".format(sum(tx.gas_used for tx in handshake), gas_report.gas("fillSellOrder (holder)")))
+    gas_report.check("fillSellOrder (holder)")
+
+
+def test_exerciseOption(gas_report, _OptionsDEX, _bought_hash):
+    """
+    Function that benchmarks holder A exercising an option
+    """
+    gas_report.measure("exerciseOption", _OptionsDEX.exerciseOption, _bought_hash, {"from": accounts[1], "value": STRIKE_PRICE * 100})
+    gas_report.check("exerciseOption")
+
+
+def test_quantity(gas_report, _CayugaCoin, _OptionsDEX):
+    """
+    Function that benchmarks writer A creating an option on 1,000 tokens and holder A exercising half of it, against the BATCH_SIZE options of 100 tokens the same position needs without a quantity
+    """
+    _CayugaCoin.approve(_OptionsDEX.address, 2000 * 10 ** 18, {"from": accounts[0]})
+    expiration = chain.height + 100
+    # Create the position as options of 100 tokens in a single batch
+    batch = _OptionsDEX.createOptions([_CayugaCoin.address] * BATCH_SIZE, [PREMIUM] * BATCH_SIZE, [STRIKE_PRICE] * BATCH_SIZE, [expiration] * BATCH_SIZE, {"from": accounts[0]})
+    # Create the position as a single option, with the premium and strike price per token
+    tx = gas_report.measure("createOptionWithQuantity", _OptionsDEX.createOptionWithQuantity, _CayugaCoin.address, PREMIUM // 100, STRIKE_PRICE // 100, expiration, 100 * BATCH_SIZE, {"from": accounts[0]})
+    option_hash = tx.events["OptionCreated"]["optionHash"]
+    _OptionsDEX.buyOption(option_hash, {"from": accounts[1], "value": PREMIUM * BATCH_SIZE})
+    gas_report.measure("exerciseOptionPartial", _OptionsDEX.exerciseOptionPartial, option_hash, 50 * BATCH_SIZE, {"from": accounts[1], "value": STRIKE_PRICE * BATCH_SIZE // 2})
+    print("\n{} tokens: createOptions ({} options) {} gas, createOptionWithQuantity {} gas".format(100 * BATCH_SIZE, BATCH_SIZE, batch.gas_used, gas_report.gas("createOptionWithQuantity")))
+    # Assert that a single option is cheaper than the batch
+    assert gas_report.gas("createOptionWithQuantity") < batch.gas_used
+    gas_report.check("createOptionWithQuantity")
+    gas_report.check("exerciseOptionPartial")
+
+
+def test_refund_unsold(gas_report, _OptionsDEX, _option_hash):
+    """
+    Function that benchmarks writer A refunding an option that was never bought
+    """
+    gas_report.measure("refund (unsold)", _OptionsDEX.refund, _option_hash, {"from": accounts[0]})
+    gas_report.check("refund (unsold)")
+
+
+def test_refund_expired(gas_report, _OptionsDEX, _expired_hash):
+    """
+    Function that benchmarks writer A refunding a bought option after its expiration
+    """
+    gas_report.measure("refund (expired)", _OptionsDEX.refund, _expired_hash, {"from": accounts[0]})
+    gas_report.check("refund (expired)")
+
+
+def test_refundMany(gas_report, _CayugaCoin, _OptionsDEX):
+    """
+    Function that benchmarks writer A refunding BATCH_SIZE unsold options in a single refundMany() transaction against BATCH_SIZE refund() transactions
+    """
+    expiration = chain.height + 100
+    tx = _OptionsDEX.createOptions([_CayugaCoin.address] * 2 * BATCH_SIZE, [PREMIUM] * 2 * BATCH_SIZE, [STRIKE_PRICE] * 2 * BATCH_SIZE, [expiration] * 2 * BATCH_SIZE, {"from": accounts[0]})
+    hashes = [event["optionHash"] for event in tx.events["OptionCreated"]]
+    # Refund half of the options one by one
+    singles = [_OptionsDEX.refund(h, {"from": accounts[0]}) for h in hashes[:BATCH_SIZE]]
+    # Refund the other half in a single batch
+    name = "refundMany ({} options)".format(BATCH_SIZE)
+    gas_report.measure(name, _OptionsDEX.refundMany, hashes[BATCH_SIZE:], {"from": accounts[0]})
+    print("\n{} x refund: {} gas, {}: {} gas".format(BATCH_SIZE, sum(tx.gas_used for tx in singles), name, gas_report.gas(name)))
+    # Assert that the batch is cheaper than the individual transactions
+    assert gas_report.gas(name) < sum(tx.gas_used for tx in singles)
+    gas_report.check(name)
@@ -0,0 +1,155 @@
+"""
+File containing test cases for the off-chain OptionsDEX indexer in scripts/indexer.py
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A
+accounts[1] = holder A
+accounts[2] = holder B
+"""
+
+import pytest
+from brownie import accounts, chain
+from scripts.indexer import OptionsIndexer
+from scripts.orders import OrderBook
+
+
+pytestmark = pytest.mark.usefixtures("_approval")
+
+
+@pytest.fixture
+def _indexer(_OptionsDEX, tmp_path):
+    """
+    Fixture that returns an indexer of _OptionsDEX backed by a database in a temporary directory
+    """
+    return OptionsIndexer(_OptionsDEX, str(tmp_path / "options.db"), from_block=_OptionsDEX.tx.block_number, chunk_size=5)
+
+
+def create_option(dex, token, expiration=200):
+    """
+    Function that creates an option written by writer A and returns its hash
+    """
+    tx = dex.createOption(token.address, 0.1 * 10 ** 18, 2 * 10 ** 18, expiration, {"from": accounts[0]})
+    return tx.events["OptionCreated"]["optionHash"]
+
+
+def create_bought_option(dex, token, quantity=1000):
+    """
+    Function that creates an option on quantity tokens written by writer A, lets holder A buy it and returns its hash
+    """
+    tx = dex.createOptionWithQuantity(token.address, 10 ** 15, 2 * 10 ** 15, 200, quantity, {"from": accounts[0]})
+    option_hash = tx.events["OptionCreated"]["optionHash"]
+    dex.buyOption(option_hash, {"from": accounts[1], "value": quantity * 10 ** 15})
+    return option_hash
+
+
+class Test_sync:
+    """
+    Class that groups together test cases that test OptionsIndexer.sync()
+    """
+
+    def test_one(self, _CayugaCoin, _OptionsDEX, _indexer):
+        """
+        Function that tests that created and bought options are indexed and can be queried by holder
+        """
+        # Create two options and let holder A buy the first
+        bought = create_option(_OptionsDEX, _CayugaCoin)
+        unsold = create_option(_OptionsDEX, _CayugaCoin)
+        _OptionsDEX.buyOption(bought, {"from": accounts[1], "value": 10 ** 19})
+        _indexer.sync()
+
+        # Assert that both options are indexed
+        assert {row["option_hash"] for row in _indexer.open_options(asset=_CayugaCoin.address)} == {bought, unsold}
+        # Assert that only the bought option is held by holder A
+        assert [row["option_hash"] for row in _indexer.open_options(holder=accounts[1])] == [bought]
+
+    def test_two(self, _CayugaCoin, _OptionsDEX, _indexer, tmp_path):
+        """
+        Function that tests that a new indexer on the same database resumes from the checkpoint of the previous one
+        """
+        create_option(_OptionsDEX, _CayugaCoin)
+        _indexer.sync()
+        checkpoint = _indexer.checkpoint()
+        create_option(_OptionsDEX, _CayugaCoin)
+
+        # Restart the indexer
+        restarted = OptionsIndexer(_OptionsDEX, str(tmp_path / "options.db"), from_block=_OptionsDEX.tx.block_number)
+        # Assert that the restarted indexer resumes from the checkpoint and only fetches the new option
+        assert restarted.checkpoint() == checkpoint
+        assert restarted.sync() == 1
+        assert len(restarted.open_options()) == 2
+
+    def test_three(self, _CayugaCoin, _OptionsDEX, _indexer):
+        """
+        Function that tests that an option created in blocks that were reorganised away is removed from the index
+        """
+        create_option(_OptionsDEX, _CayugaCoin)
+        _indexer.sync()
+        create_option(_OptionsDEX, _CayugaCoin)
+        _indexer.sync()
+        # Replace the block of the second option by empty blocks
+        chain.undo()
+        chain.mine(3)
+        _indexer.sync()
+
+        # Assert that only the first option remains
+        assert len(_indexer.open_options()) == 1
+
+    def test_four(self, _CayugaCoin, _OptionsDEX, _indexer):
+        """
+        Function that tests that a partial exercise reorganised away is not applied twice when another exercise replaces it
+        """
+        option_hash = create_bought_option(_OptionsDEX, _CayugaCoin)
+        _indexer.sync()
+        _OptionsDEX.exerciseOptionPartial(option_hash, 300, {"from": accounts[1], "value": 300 * 2 * 10 ** 15})
+        _indexer.sync()
+        # Replace the exercise of 300 tokens by an exercise of 200 tokens
+        chain.undo()
+        _OptionsDEX.exerciseOptionPartial(option_hash, 200, {"from": accounts[1], "value": 200 * 2 * 10 ** 15})
+        _indexer.sync()
+
+        # Assert that the index matches OptionsDEX
+        assert [row["quantity"] for row in _indexer.open_options()] == [800] == [_OptionsDEX.getOptionDetailsBatch([option_hash])[0][10]]
+
+    def test_five(self, _CayugaCoin, _OptionsDEX, _indexer):
+        """
+        Function that tests that a partial sale reorganised away is rolled back on both options when a smaller sale replaces it
+        """
+        option_hash = create_bought_option(_OptionsDEX, _CayugaCoin)
+        # Holder A becomes a signing account by selling the option to the seller
+        seller = accounts.add()
+        accounts[0].transfer(seller, 10 ** 18)
+        _OptionsDEX.approveOptionTransferHolder(option_hash, seller, 0, {"from": accounts[1]})
+        _OptionsDEX.transferOptionHolder(option_hash, {"from": seller, "value": 0})
+        book = OrderBook(_OptionsDEX)
+        _indexer.sync()
+        # Holder B buys 400 tokens of the position
+        book.fill(book.sign(seller, option_hash, False, 0, chain.height + 10, quantity=400), accounts[2])
+        _indexer.sync()
+        # Replace the sale of 400 tokens by a sale of 100 tokens
+        chain.undo()
+        tx = book.fill(book.sign(seller, option_hash, False, 0, chain.height + 10, quantity=100), accounts[2])
+        _indexer.sync()
+
+        # Assert that the seller keeps 900 tokens and holder B holds the 100 tokens split off
+        assert [row["quantity"] for row in _indexer.open_options(holder=seller)] == [900]
+        rows = _indexer.open_options(holder=accounts[2])
+        assert [(row["option_hash"], row["quantity"]) for row in rows] == [(tx.events["OptionSplit"]["newOptionHash"], 100)]
+
+    def test_six(self, _CayugaCoin, _OptionsDEX, _indexer):
+        """
+        Function that tests that an option whose refund was reorganised away is indexed again
+        """
+        option_hash = create_option(_OptionsDEX, _CayugaCoin)
+        _indexer.sync()
+        _OptionsDEX.refund(option_hash, {"from": accounts[0]})
+        _indexer.sync()
+        assert _indexer.open_options() == []
+        # Replace the block of the refund by empty blocks
+        chain.undo()
+        chain.mine(3)
+        _indexer.sync()
+
+        # Assert that the option is indexed again with its details
+        rows = _indexer.open_options()
+        assert [(row["option_hash"], row["writer"], row["quantity"]) for row in rows] == [(option_hash, accounts[0].address.lower(), 1)]
@@ -0,0 +1,73 @@
+"""
+File containing test cases for the expiry keeper in scripts/keeper.py
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A
+accounts[1] = holder A
+"""
+
+import pytest
+from brownie import accounts, chain
+from scripts.keeper import ExpiryKeeper
+
+
+pytestmark = pytest.mark.usefixtures("_approval")
+
+
+class Test_sweep:
+    """
+    Class that groups together test cases that test ExpiryKeeper.sweep()
+    """
+
+    def test_one(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that the keeper refunds bought options once the chain passes their expiration, in a single transaction, and skips options that were exercised
+        """
+        expirations = [chain.height + 10, chain.height + 10, chain.height + 10, chain.height + 50]
+        tx = _OptionsDEX.createOptions([_CayugaCoin.address] * 4, [10 ** 17] * 4, [10 ** 18] * 4, expirations, {"from": accounts[0]})
+        hashes = [event["optionHash"] for event in tx.events["OptionCreated"]]
+        keeper = ExpiryKeeper(_OptionsDEX, accounts[0])
+        for option_hash, expiration in zip(hashes, expirations):
+            # Holder A buys every option, so none can be refunded before expiring
+            _OptionsDEX.buyOption(option_hash, {"from": accounts[1], "value": 10 ** 19})
+            keeper.track(option_hash, expiration)
+        # Holder A exercises the first option
+        _OptionsDEX.exerciseOption(hashes[0], {"from": accounts[1], "value": 10 ** 20})
+
+        # Assert that nothing is refunded before the options expire
+        assert keeper.sweep(chain.height) == []
+        chain.mine(10)
+        txs = keeper.sweep(chain.height)
+
+        # Assert that the two remaining expired options were refunded together
+        assert len(txs) == 1
+        assert [_OptionsDEX.getOptionDetails(h)[5] for h in hashes] == [0, 0, 0, expirations[3]]
+
+    def test_two(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that an option exercised between the check and the refund of a batch does not stop the keeper, which refunds the rest of the batch one by one
+        """
+        expiration = chain.height + 10
+        tx = _OptionsDEX.createOptions([_CayugaCoin.address] * 3, [10 ** 17] * 3, [10 ** 18] * 3, [expiration] * 3, {"from": accounts[0]})
+        hashes = [event["optionHash"] for event in tx.events["OptionCreated"]]
+        keeper = ExpiryKeeper(_OptionsDEX, accounts[0])
+        for option_hash in hashes:
+            _OptionsDEX.buyOption(option_hash, {"from": accounts[1], "value": 10 ** 19})
+            keeper.track(option_hash, expiration)
+        chain.mine(10)
+        # Holder A exercises the first option, which is still allowed after its expiration, right after the keeper checked the batch
+        read = keeper.client.get_option_details_batch
+
+        def racing_read(batch, gas_cap=None):
+            details = read(batch, gas_cap)
+            if _OptionsDEX.getOptionDetails(hashes[0])[5] != 0:
+                _OptionsDEX.exerciseOption(hashes[0], {"from": accounts[1], "value": 10 ** 20})
+            return details
+        keeper.client.get_option_details_batch = racing_read
+        txs = keeper.sweep(chain.height)
+
+        # Assert that the other two options were refunded one by one and nothing is left to retry
+        assert [tx.fn_name for tx in txs] == ["refund", "refund"]
+        assert [_OptionsDEX.getOptionDetails(h)[5] for h in hashes] == [0, 0, 0]
+        assert keeper.heap == []
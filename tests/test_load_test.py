@@ -0,0 +1,26 @@
+"""
+File containing test cases for the load test harness in scripts/load_test.py
+"""
+
+import json
+
+from scripts.load_test import LoadTest
+
+
+class Test_LoadTest:
+    """
+    Class that groups together test cases that test LoadTest
+    """
+
+    def test_one(self):
+        """
+        Function that tests that a short run over every operation only performs valid operations and produces a JSON-serializable report
+        """
+        load_test = LoadTest(4, seed=1, mix={"create": 1, "buy": 1, "transferHolder": 1, "transferWriter": 1, "exercise": 1, "refund": 1})
+        load_test.setup()
+        seconds = load_test.run(40)
+        report = json.loads(json.dumps(load_test.report(seconds)))
+
+        # Assert that options were created and no operation reverted
+        assert report["functions"]["createOption"]["calls"] > 0, "No option was created!"
+        assert all(f["failures"] == 0 for f in report["functions"].values()), "An operation reverted!"
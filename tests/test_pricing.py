@@ -0,0 +1,60 @@
+"""
+File containing test cases for the pricing engine in scripts/pricing.py
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A
+accounts[1] = holder A
+"""
+
+import pytest
+from brownie import accounts, chain
+from scripts.client import OptionsDEXClient
+from scripts.pricing import SECONDS_PER_YEAR, ZERO_ADDRESS, OptionBook, PricingEngine
+
+
+pytestmark = pytest.mark.usefixtures("_approval")
+
+
+class Test_PricingEngine:
+    """
+    Class that groups together test cases that test PricingEngine
+    """
+
+    def test_one(self):
+        """
+        Function that tests the premium and Greeks against the textbook values of a one year at-the-money call (spot 100, volatility 20%, rate 5%)
+        """
+        engine = PricingEngine(block_time=1.0, rate=0.05)
+        engine.set_market("0x" + "aa" * 20, spot=100 * 10 ** 18, volatility=0.2)
+        book = OptionBook(["0x01", "0x02"], ["0x" + "aa" * 20] * 2, [100 * 10 ** 18] * 2, [1, 1], [SECONDS_PER_YEAR, 0], [ZERO_ADDRESS] * 2)
+        result = engine.price(book, 0)
+
+        # Assert the premium and delta of the live option
+        assert abs(result["premium"][0] / 10 ** 18 - 10.4506) < 1e-4
+        assert abs(result["delta"][0] - 0.6368) < 1e-4
+        # Assert that the expired at-the-money option is worth nothing
+        assert result["premium"][1] == 0
+
+    def test_two(self, _CayugaCoin, _OptionsDEX):
+        """
+        Function that tests that quotes are created through createOptions() and that unsold options whose premium moved are repriced through refundMany() and createOptions()
+        """
+        client = OptionsDEXClient(_OptionsDEX, accounts[0])
+        engine = PricingEngine(block_time=2.0)
+        engine.set_market(_CayugaCoin.address, spot=2 * 10 ** 18, volatility=0.8)
+        quotes = engine.quote(_CayugaCoin.address, [10 ** 18, 2 * 10 ** 18, 3 * 10 ** 18], [10 ** 6] * 3, chain.height)
+        hashes = client.create_options(quotes)
+        _OptionsDEX.buyOption(hashes[0], {"from": accounts[1], "value": quotes[0][1] * 100})
+
+        # Assert that the created options carry the quoted premiums
+        assert [d[3] for d in client.get_option_details_batch(hashes)] == [q[1] for q in quotes]
+        # The spot price doubles
+        engine.set_market(_CayugaCoin.address, spot=4 * 10 ** 18)
+        book = OptionBook.from_details(hashes, client.get_option_details_batch(hashes))
+        refunds, options = engine.repricing_plan(book, chain.height)
+        # Assert that only the unsold options are repriced
+        assert refunds == hashes[1:]
+        _OptionsDEX.refundMany(refunds, {"from": accounts[0]})
+        repriced = client.create_options(options)
+        assert [d[3] for d in client.get_option_details_batch(repriced)] == [o[1] for o in options]
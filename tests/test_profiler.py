@@ -0,0 +1,31 @@
+"""
+File containing test cases for the gas profiler in scripts/profiler.py
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A
+accounts[1] = holder A
+"""
+
+from brownie import accounts
+from scripts.profiler import format_profile, profile_transaction
+
+
+class Test_profile_transaction:
+    """
+    Class that groups together test cases that test profile_transaction()
+    """
+
+    def test_one(self, _OptionsDEX, _bought_hash):
+        """
+        Function that tests that the gas of exerciseOption() is attributed to source lines, storage accesses and its token and ETH transfers
+        """
+        tx = _OptionsDEX.exerciseOption(_bought_hash, {"from": accounts[1], "value": 200 * 10 ** 18})
+        profile = profile_transaction(tx)
+
+        # Assert that every step of OptionsDEX is attributed to a line
+        assert sum(line["gas"] for line in profile["lines"]) == profile["execution_gas"]
+        # Assert that the collateral transfer and the payment of writer A are found
+        assert set(profile["calls"]) == {"CayugaCoin.transfer", "ETH transfer"}
+        assert profile["storage_reads"]["count"] > 0 and profile["storage_writes"]["count"] > 0
+        assert format_profile(profile).startswith("exerciseOption")
@@ -0,0 +1,232 @@
+"""
+File containing the differential test of the reference model in scripts/simulator.py against the deployed OptionsDEX
+
+A stateful hypothesis test sends random sequences of operations to both the model and the contract, with valid and invalid parameters, and fails as soon as one of them reverts while the other does not, their revert reasons differ, or their state (options, approvals, nonces, sell order nonces, credits, token and ETH balances of OptionsDEX) diverges.
+
+The list below is a list matching holders/writers to their respective accounts:
+
+accounts[0] = writer A, the deployer of OptionsDEX
+accounts[1] = holder A
+accounts[2] = holder B
+_signer = an account with a private key, which signs sell orders
+"""
+
+import pytest
+from brownie import accounts, chain
+from brownie.exceptions import VirtualMachineError
+from brownie.test import strategy
+from scripts.orders import sign_sell_order
+from scripts.permits import sign_collateral_permit
+from scripts.simulator import DEX, UINT256_MAX, OptionsDEXModel, Revert
+
+# Hash of an option that never exists
+MISSING_HASH = "0x" + "11" * 32
+
+
+@pytest.fixture(scope="module")
+def _signer(_CayugaCoin, _OptionsDEX):
+    """
+    Fixture that funds the accounts of the test with ETH and 1,000 CayugaCoin tokens approved to OptionsDEX, and returns the account that signs sell orders
+    """
+    signer = accounts.add()
+    accounts[0].transfer(signer, 100 * 10 ** 18)
+    for account in (accounts[1], accounts[2], signer):
+        _CayugaCoin.transfer(account, 1000 * 10 ** 18, {"from": accounts[0]})
+    for account in (accounts[0], accounts[1], accounts[2], signer):
+        _CayugaCoin.approve(_OptionsDEX.address, UINT256_MAX, {"from": account})
+    return signer
+
+
+def normalize(value):
+    """
+    Function that lowercases the addresses and hashes of a value returned by the model or the contract, so that both compare equal
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(v) for v in value)
+    return value.lower() if isinstance(value, str) else value
+
+
+class Differential:
+    """
+    Class of the rules of the state machine that compares OptionsDEXModel with the deployed OptionsDEX
+    """
+
+    account = strategy("uint8", max_value=3)
+    index = strategy("uint8")
+    premium = strategy("uint8", max_value=3)
+    offset = strategy("int8", min_value=-1, max_value=30)
+    count = strategy("uint8", max_value=3)
+    price = strategy("uint8", max_value=2)
+    flag = strategy("bool")
+    nonce = strategy("uint8", max_value=3)
+    blocks = strategy("uint8", min_value=1, max_value=20)
+    quantity = strategy("uint8", max_value=120)
+
+    def __init__(cls, dex, token, signer):
+        cls.dex = dex
+        cls.token = token
+        cls.accounts = [accounts[0], accounts[1], accounts[2], signer]
+
+    def setup(self):
+        # Model of the chain after the module fixtures
+        self.model = OptionsDEXModel(accounts[0].address)
+        self.model.registerAsset(self.token.address, sender=accounts[0].address)
+        for account in self.accounts:
+            self.model.mint(self.token.address, account.address, self.token.balanceOf(account))
+            self.model.approve(self.token.address, account.address, UINT256_MAX)
+        # Hashes of every option created
+        self.hashes = []
+
+    def call(self, name, *args, sender, value=None, dex_args=None):
+        """
+        Function that sends the same call to the model and OptionsDEX (with dex_args instead of args if given), asserts that both succeed or revert with the same reason, and returns the result of the model
+        """
+        self.model.block_number = chain.height + 1
+        kwargs = {"sender": sender.address}
+        params = {"from": sender}
+        if value is not None:
+            kwargs["value"] = params["value"] = value
+        if dex_args is None:
+            dex_args = args
+        try:
+            result = getattr(self.model, name)(*args, **kwargs)
+        except Revert as revert:
+            with pytest.raises(VirtualMachineError) as error:
+                getattr(self.dex, name)(*dex_args, params)
+            # Reverts without reason are not compared
+            if revert.reason is not None:
+                assert error.value.revert_msg == revert.reason, "{} reverted with a different reason".format(name)
+            return None
+        getattr(self.dex, name)(*dex_args, params)
+        return result
+
+    def option(self, index):
+        """
+        Function that returns the hash of a created option, or a hash that never exists
+        """
+        options = self.hashes + [MISSING_HASH]
+        return options[index % len(options)]
+
+    def amount(self, option_hash, field, wrong, quantity=None):
+        """
+        Function that returns a field of an option times quantity (the quantity of the option by default), or a wrong amount
+        """
+        details = self.model.getOptionDetailsBatch([option_hash])[0]
+        return details[field] * (quantity or details[10]) + (1 if wrong else 0)
+
+    def rule_create(self, writer="account", premium="premium", strike="premium", offset="offset"):
+        option_hash = self.call("createOption", self.token.address, premium * 10 ** 15, strike * 10 ** 15, chain.height + offset, sender=self.accounts[writer])
+        if option_hash:
+            self.hashes.append(option_hash)
+
+    def rule_create_quantity(self, writer="account", premium="premium", quantity="quantity"):
+        option_hash = self.call("createOptionWithQuantity", self.token.address, premium * 10 ** 15, 10 ** 16, chain.height + 10, quantity, sender=self.accounts[writer])
+        if option_hash:
+            self.hashes.append(option_hash)
+
+    def permit(self, value, valid):
+        """
+        Function that signs a permit of the signer for value tokens, expired unless valid, and returns it together with the allowance it grants in the model
+        """
+        deadline = chain.time() + (3600 if valid else -3600)
+        return sign_collateral_permit(self.token, self.accounts[3], self.dex, value, deadline), value if valid else None
+
+    def rule_create_permit(self, premium="premium", quantity="quantity", valid="flag"):
+        permit, allowance = self.permit(quantity * 10 ** 18, valid)
+        args = (self.token.address, premium * 10 ** 15, 10 ** 16, chain.height + 10, quantity)
+        option_hash = self.call("createOptionWithPermit", *args, allowance, sender=self.accounts[3], dex_args=args + (permit,))
+        if option_hash:
+            self.hashes.append(option_hash)
+
+    def rule_create_many(self, writer="account", count="count", offset="offset"):
+        hashes = self.call("createOptions", [self.token.address] * count, [10 ** 15] * count, [10 ** 16] * count, [chain.height + offset] * count, sender=self.accounts[writer])
+        self.hashes += hashes or []
+
+    def rule_buy(self, index="index", buyer="account", wrong="flag"):
+        option_hash = self.option(index)
+        self.call("buyOption", option_hash, sender=self.accounts[buyer], value=self.amount(option_hash, 3, wrong))
+
+    def rule_approve_holder(self, index="index", holder="account", new_holder="account", price="price"):
+        self.call("approveOptionTransferHolder", self.option(index), self.accounts[new_holder].address, price * 10 ** 15, sender=self.accounts[holder])
+
+    def rule_transfer_holder(self, index="index", buyer="account", wrong="flag"):
+        option_hash = self.option(index)
+        self.call("transferOptionHolder", option_hash, sender=self.accounts[buyer], value=self.model.getOptionDetails(option_hash)[6] + wrong)
+
+    def rule_approve_writer(self, index="index", writer="account", new_writer="account", price="price"):
+        self.call("approveOptionTransferWriter", self.option(index), self.accounts[new_writer].address, price * 10 ** 15, sender=self.accounts[writer])
+
+    def rule_transfer_writer(self, index="index", buyer="account", wrong="flag"):
+        option_hash = self.option(index)
+        self.call("transferOptionWriter", option_hash, sender=self.accounts[buyer], value=self.model.getOptionDetails(option_hash)[7] + wrong)
+
+    def rule_transfer_writer_permit(self, index="index", wrong="flag", valid="flag"):
+        option_hash = self.option(index)
+        permit, allowance = self.permit(self.model.getOptionDetailsBatch([option_hash])[0][10] * 10 ** 18, valid)
+        value = self.model.getOptionDetails(option_hash)[7] + wrong
+        self.call("transferOptionWriterWithPermit", option_hash, allowance, sender=self.accounts[3], value=value, dex_args=(option_hash, permit))
+
+    def rule_fill(self, index="index", is_writer="flag", buyer="account", nonce="nonce", price="price", quantity="quantity"):
+        signer = self.accounts[3]
+        order = (self.option(index), is_writer, price * 10 ** 15, "0x" + "0" * 40, chain.height + 5, nonce, quantity)
+        v, r, s = sign_sell_order(bytes(self.dex.DOMAIN_SEPARATOR()), signer.private_key, order)
+        self.model.block_number = chain.height + 1
+        try:
+            new_option_hash = self.model.fillSellOrder(order, signer.address, sender=self.accounts[buyer].address, value=order[2])
+        except Revert as revert:
+            with pytest.raises(VirtualMachineError) as error:
+                self.dex.fillSellOrder(order, v, r, s, {"from": self.accounts[buyer], "value": order[2]})
+            if revert.reason is not None:
+                assert error.value.revert_msg == revert.reason, "fillSellOrder reverted with a different reason"
+            return
+        tx = self.dex.fillSellOrder(order, v, r, s, {"from": self.accounts[buyer], "value": order[2]})
+        # Options split off by a partial sale of a holder position
+        if new_option_hash:
+            assert tx.events["OptionSplit"]["newOptionHash"] == new_option_hash, "The split options diverged!"
+            self.hashes.append(new_option_hash)
+
+    def rule_cancel(self, seller="account", nonce="nonce"):
+        self.call("cancelOrders", [nonce], sender=self.accounts[seller])
+
+    def rule_exercise(self, index="index", holder="account", wrong="flag"):
+        option_hash = self.option(index)
+        self.call("exerciseOption", option_hash, sender=self.accounts[holder], value=self.amount(option_hash, 1, wrong))
+
+    def rule_exercise_partial(self, index="index", holder="account", quantity="quantity", wrong="flag"):
+        option_hash = self.option(index)
+        self.call("exerciseOptionPartial", option_hash, quantity, sender=self.accounts[holder], value=self.amount(option_hash, 1, wrong, quantity))
+
+    def rule_refund(self, index="index", writer="account"):
+        self.call("refund", self.option(index), sender=self.accounts[writer])
+
+    def rule_refund_many(self, first="index", second="index", writer="account"):
+        self.call("refundMany", [self.option(first), self.option(second)], sender=self.accounts[writer])
+
+    def rule_credit_mode(self, account="account", enabled="flag"):
+        self.call("setCreditMode", enabled, sender=self.accounts[account])
+
+    def rule_withdraw(self, account="account"):
+        self.call("withdraw", sender=self.accounts[account])
+
+    def rule_mine(self, blocks="blocks"):
+        chain.mine(blocks)
+
+    def invariant(self):
+        # Options, including deleted ones
+        hashes = self.hashes + [MISSING_HASH]
+        assert normalize(self.model.getOptionDetailsBatch(hashes)) == normalize(self.dex.getOptionDetailsBatch(hashes)), "The options diverged!"
+        for account in self.accounts:
+            address = account.address
+            assert self.model.getNonce(address) == self.dex.getNonce(address), "The nonces diverged!"
+            assert normalize(self.model.viewCredit(address)) == normalize(self.dex.viewCredit(address)), "The credits diverged!"
+            assert [self.model.isOrderNonceUsed(address, n) for n in range(4)] == [self.dex.isOrderNonceUsed(address, n) for n in range(4)]
+            assert self.model.token_balance(self.token.address, address) == self.token.balanceOf(account), "The token balances diverged!"
+        assert self.model.token_balance(self.token.address, DEX) == self.token.balanceOf(self.dex), "The collateral diverged!"
+        assert self.model.eth_balance(DEX) == self.dex.balance(), "The ETH of OptionsDEX diverged!"
+
+
+def test_differential(_CayugaCoin, _OptionsDEX, _signer, state_machine):
+    """
+    Function that runs random sequences of operations against the model and OptionsDEX
+    """
+    state_machine(Differential, _OptionsDEX, _CayugaCoin, _signer, settings={"max_examples": 25, "stateful_step_count": 30})